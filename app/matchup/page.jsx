@@ -5,7 +5,8 @@ import {
   getFantasyTeams,
   getFantasyWeekOptions,
   getFantasyWeekPlayerSchedule,
-  getFantasyLineup
+  getFantasyLineup,
+  getFantasyMatchupOdds
 } from "../../lib/queries";
 import { revalidatePath } from "next/cache";
 import { redirect } from "next/navigation";
@@ -165,6 +166,11 @@ export default async function MatchupPage({ searchParams }) {
   const existingLineup = selectedWeekNumber
     ? await getFantasyLineup({ season, week: selectedWeekNumber, teamId })
     : null;
+  const matchupOdds = selectedWeekNumber
+    ? await getFantasyMatchupOdds({ season, week: selectedWeekNumber, teamId })
+    : null;
+  const winPercent =
+    matchupOdds?.win_probability != null ? Math.round(Number(matchupOdds.win_probability) * 100) : null;
   const weekSchedule = selectedWeek
     ? await getFantasyWeekPlayerSchedule({
         teamId,
@@ -227,6 +233,13 @@ export default async function MatchupPage({ searchParams }) {
               <p className="section-subtitle">
                 Use the roster table below to verify starters and tiebreakers.
               </p>
+              {winPercent !== null ? (
+                <p className="section-subtitle">
+                  {`Win odds ${winPercent}%, projected ${Number(matchupOdds.projected_points).toFixed(1)} pts `}
+                  {`(${Number(matchupOdds.points_p10).toFixed(0)}-${Number(matchupOdds.points_p90).toFixed(0)})`}
+                  {matchupOdds.lineup_source === "projected" ? " using a projected lineup" : ""}
+                </p>
+              ) : null}
             </div>
           </div>
 
@@ -101,6 +101,9 @@ CREATE TABLE IF NOT EXISTS fantasy_rosters (
   PRIMARY KEY (season, fantasy_team_id, player_id)
 );
 
+ALTER TABLE fantasy_rosters
+  ADD COLUMN IF NOT EXISTS pick_number INTEGER;
+
 CREATE TABLE IF NOT EXISTS fantasy_roster_moves (
   id SERIAL PRIMARY KEY,
   season INTEGER NOT NULL,
@@ -153,12 +156,69 @@ CREATE TABLE IF NOT EXISTS sync_log (
   details TEXT
 );
 
+CREATE TABLE IF NOT EXISTS player_projections (
+  player_id INTEGER NOT NULL REFERENCES players(player_id),
+  game_id INTEGER NOT NULL,
+  game_date DATE,
+  season INTEGER,
+  team_id INTEGER REFERENCES teams(team_id),
+  games_played INTEGER,
+  projected_pts NUMERIC,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (player_id, game_id)
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_lineup_suggestions (
+  season INTEGER NOT NULL,
+  week INTEGER NOT NULL,
+  fantasy_team_id INTEGER NOT NULL REFERENCES fantasy_teams(fantasy_team_id),
+  center_id INTEGER REFERENCES players(player_id),
+  forward1_id INTEGER REFERENCES players(player_id),
+  forward2_id INTEGER REFERENCES players(player_id),
+  guard1_id INTEGER REFERENCES players(player_id),
+  guard2_id INTEGER REFERENCES players(player_id),
+  t1_id INTEGER REFERENCES players(player_id),
+  t2_id INTEGER REFERENCES players(player_id),
+  projected_points NUMERIC,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (season, week, fantasy_team_id)
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_matchup_odds (
+  season INTEGER NOT NULL,
+  week INTEGER NOT NULL,
+  fantasy_team_id INTEGER NOT NULL REFERENCES fantasy_teams(fantasy_team_id),
+  opponent_fantasy_team_id INTEGER NOT NULL REFERENCES fantasy_teams(fantasy_team_id),
+  projected_points NUMERIC,
+  points_p10 NUMERIC,
+  points_p90 NUMERIC,
+  win_probability NUMERIC,
+  simulations INTEGER,
+  lineup_source TEXT,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (season, week, fantasy_team_id)
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_free_agents (
+  season INTEGER NOT NULL,
+  player_id INTEGER NOT NULL REFERENCES players(player_id),
+  position TEXT,
+  projected_ros NUMERIC,
+  recent_form NUMERIC,
+  games_remaining INTEGER,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (season, player_id)
+);
+
 CREATE INDEX IF NOT EXISTS idx_players_team ON players(team_id);
 CREATE INDEX IF NOT EXISTS idx_team_rosters_team ON team_rosters(team_id);
 CREATE INDEX IF NOT EXISTS idx_player_games_player ON player_games(player_id);
 CREATE INDEX IF NOT EXISTS idx_player_games_date ON player_games(game_date);
 CREATE INDEX IF NOT EXISTS idx_games_date ON games(game_date);
 CREATE INDEX IF NOT EXISTS idx_fantasy_weeks_season ON fantasy_weeks(season, start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_player_projections_date ON player_projections(game_date, player_id);
+CREATE INDEX IF NOT EXISTS idx_fantasy_free_agents_projected ON fantasy_free_agents(season, position, projected_ros DESC);
+CREATE INDEX IF NOT EXISTS idx_fantasy_free_agents_form ON fantasy_free_agents(season, position, recent_form DESC);
 
 CREATE OR REPLACE FUNCTION roster_snapshot(include_dnp BOOLEAN DEFAULT FALSE, row_limit INTEGER DEFAULT 50)
 RETURNS TABLE (
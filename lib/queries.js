@@ -453,6 +453,41 @@ export async function getFantasyLineup({ season, week, teamId } = {}) {
   return result.rows[0] || null;
 }
 
+export async function getFantasyMatchupOdds({ season, week, teamId } = {}) {
+  if (!season || !week || !teamId) {
+    return null;
+  }
+
+  if (useSupabase && supabase) {
+    const { data, error } = await supabase
+      .from("fantasy_matchup_odds")
+      .select("*")
+      .eq("season", season)
+      .eq("week", week)
+      .eq("fantasy_team_id", teamId)
+      .limit(1)
+      .maybeSingle();
+    if (error) {
+      console.warn("Supabase fantasy_matchup_odds error", error.message);
+      return null;
+    }
+    return data || null;
+  }
+
+  const result = await query(
+    `
+    SELECT *
+    FROM fantasy_matchup_odds
+    WHERE season = $1
+      AND week = $2
+      AND fantasy_team_id = $3
+    LIMIT 1;
+    `,
+    [season, week, teamId]
+  );
+  return result.rows[0] || null;
+}
+
 export async function getFantasyLineupScores({ season, week } = {}) {
   if (!season || !week) {
     return [];
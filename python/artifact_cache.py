@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+ARTIFACT_CACHE_VERSION = 1
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(module_files):
+    """Digest of the source files that implement a step."""
+    digest = hashlib.sha256()
+    for path in sorted(str(path) for path in module_files):
+        digest.update(Path(path).name.encode("utf-8"))
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Skips pipeline steps whose inputs, parameters and code are unchanged.
+
+    Each step records a fingerprint of its input files, its parameters, the
+    digest of its source modules and the files it wrote. Files are compared
+    by size and mtime first and only re-hashed when those moved, so a file
+    rewritten with the same contents still counts as unchanged. The manifest
+    is a JSON file; ``decisions`` lists (step, ran, reason) for this run.
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = Path(manifest_file)
+        self.steps = {}
+        self.decisions = []
+        if self.manifest_file.exists():
+            try:
+                with self.manifest_file.open("r", encoding="utf-8") as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                manifest = {}
+            if manifest.get("version") == ARTIFACT_CACHE_VERSION:
+                self.steps = manifest.get("steps", {})
+
+    def _fingerprint(self, path, previous=None):
+        path = Path(path)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if (
+            previous
+            and previous.get("size") == fingerprint["size"]
+            and previous.get("mtime_ns") == fingerprint["mtime_ns"]
+        ):
+            fingerprint["sha256"] = previous["sha256"]
+        else:
+            fingerprint["sha256"] = file_digest(path)
+        return fingerprint
+
+    @staticmethod
+    def _same_file(old, new):
+        return old is not None and new is not None and old.get("sha256") == new.get("sha256")
+
+    def _stale_reason(self, step, inputs, params, code, outputs):
+        record = self.steps.get(step)
+        if record is None:
+            return "no previous run recorded"
+        if record.get("code") != code:
+            return "code changed"
+        old_params = record.get("params", {})
+        for name in sorted(set(params) | set(old_params)):
+            if params.get(name) != old_params.get(name):
+                return f"parameter {name} changed ({old_params.get(name)!r} -> {params.get(name)!r})"
+        old_inputs = record.get("inputs", {})
+        for path in inputs:
+            if not self._same_file(old_inputs.get(str(path)), self._fingerprint(path, old_inputs.get(str(path)))):
+                return f"input {path} changed"
+        if set(map(str, inputs)) != set(old_inputs):
+            return "input files changed"
+        old_outputs = record.get("outputs", {})
+        for path in outputs:
+            if not Path(path).exists():
+                return f"output {path} missing"
+            if not self._same_file(old_outputs.get(str(path)), self._fingerprint(path, old_outputs.get(str(path)))):
+                return f"output {path} modified since it was built"
+        return None
+
+    def run(self, step, build, inputs=(), params=None, code_files=(), outputs=()):
+        """Call ``build()`` unless the step is current; returns (ran, result).
+
+        ``result`` is None when the step was skipped.
+        """
+        params = params or {}
+        code = code_version(code_files)
+        reason = self._stale_reason(step, inputs, params, code, outputs)
+        if reason is None:
+            self.decisions.append((step, False, "inputs, parameters and code unchanged"))
+            print(f"{step}: skipped (inputs, parameters and code unchanged)")
+            return False, None
+
+        print(f"{step}: running ({reason})")
+        old_inputs = self.steps.get(step, {}).get("inputs", {})
+        input_fingerprints = {
+            str(path): self._fingerprint(path, old_inputs.get(str(path))) for path in inputs
+        }
+        result = build()
+        self.decisions.append((step, True, reason))
+        if not all(Path(path).exists() for path in outputs):
+            # A failed build is not recorded, so the next run tries again.
+            self.steps.pop(step, None)
+        else:
+            self.steps[step] = {
+                "code": code,
+                "params": params,
+                "inputs": input_fingerprints,
+                "outputs": {str(path): self._fingerprint(path) for path in outputs},
+            }
+        self.save()
+        return True, result
+
+    def save(self):
+        temp_path = self.manifest_file.with_name(f"{self.manifest_file.name}.{os.getpid()}.tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump({"version": ARTIFACT_CACHE_VERSION, "steps": self.steps}, file, indent=2)
+        temp_path.replace(self.manifest_file)
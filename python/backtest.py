@@ -0,0 +1,237 @@
+import argparse
+import csv
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from ml_model import build_player_pts_dataset
+from online_ridge import RidgeSufficientStats
+from sample_store import recency_weights
+
+
+BACKTEST_HEADER = [
+    "Alpha",
+    "Min Games",
+    "Min Minutes",
+    "Half-Life Days",
+    "Split",
+    "Scope",
+    "Test Start",
+    "Test End",
+    "Train Samples",
+    "Test Samples",
+    "MAE",
+    "RMSE",
+    "R2",
+]
+
+ARRAY_NAMES = ["features", "points", "minutes", "days"]
+
+# Loaded once per worker process by _init_worker.
+_ARRAYS = {}
+
+
+def _parse_list(text, cast):
+    return [cast(part) for part in text.split(",") if part.strip()]
+
+
+def walk_forward_splits(np, days, n_splits=4, test_ratio=0.4):
+    """Rolling-origin (train_end_day, test_end_day) pairs over the newest ``test_ratio``.
+
+    Fold k trains on every day before its cut and tests on the days up to
+    the next cut. Cuts fall on whole days, at equal sample-count steps.
+    """
+    sorted_days = np.sort(days)
+    total = len(sorted_days)
+    cuts = []
+    for k in range(n_splits + 1):
+        position = int(total * (1 - test_ratio + test_ratio * k / n_splits))
+        cuts.append(int(sorted_days[min(position, total - 1)]))
+    cuts[-1] = int(sorted_days[-1]) + 1
+    splits = []
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        if start < end and start > int(sorted_days[0]):
+            splits.append((start, end))
+    return splits
+
+
+def _metrics(np, actual, predicted):
+    errors = predicted - actual
+    mae = float(np.abs(errors).mean())
+    rmse = float(np.sqrt((errors**2).mean()))
+    total = float(((actual - actual.mean()) ** 2).sum())
+    r2 = 1 - float((errors**2).sum()) / total if total else float("nan")
+    return mae, rmse, r2
+
+
+def _init_worker(arrays_dir):
+    import numpy as np
+
+    _ARRAYS["np"] = np
+    for name in ARRAY_NAMES:
+        _ARRAYS[name] = np.load(Path(arrays_dir) / f"{name}.npy", mmap_mode="r")
+
+
+def _evaluate_params(params, splits):
+    """Fit and score one parameter set on every split; returns report rows."""
+    np = _ARRAYS["np"]
+    features = _ARRAYS["features"]
+    days = _ARRAYS["days"]
+    points = _ARRAYS["points"]
+    minutes = _ARRAYS["minutes"]
+    alpha, min_games, min_minutes, half_life = params
+
+    eligible = (features[:, 0] >= min_games) & (minutes >= min_minutes)
+    rows = []
+    for split_number, (test_start, test_end) in enumerate(splits, start=1):
+        train_idx = np.flatnonzero(eligible & (days < test_start))
+        test_idx = np.flatnonzero(eligible & (days >= test_start) & (days < test_end))
+        if len(train_idx) < 2 or not len(test_idx):
+            continue
+
+        train_days = days[train_idx]
+        weights = recency_weights(np, train_days, half_life) if half_life else None
+        stats = RidgeSufficientStats(np, features.shape[1])
+        stats.add(features[train_idx], points[train_idx], weights)
+        mean, _var, scale, coef, intercept = stats.solve(alpha)
+        predicted = ((features[test_idx] - mean) / scale) @ coef + intercept
+        actual = points[test_idx]
+
+        base = [alpha, min_games, min_minutes, half_life, split_number]
+        test_days = days[test_idx]
+        scopes = [("all", np.ones(len(test_idx), dtype=bool))]
+        years = np.array([date.fromordinal(int(day)).year for day in test_days])
+        for year in np.unique(years).tolist():
+            scopes.append((str(year), years == year))
+        for scope, mask in scopes:
+            rows.append(
+                base
+                + [
+                    scope,
+                    date.fromordinal(int(test_days[mask].min())).isoformat(),
+                    date.fromordinal(int(test_days[mask].max())).isoformat(),
+                    len(train_idx),
+                    int(mask.sum()),
+                    *_metrics(np, actual[mask], predicted[mask]),
+                ]
+            )
+    return rows
+
+
+def run_backtest(
+    player_stats_file,
+    report_file,
+    alphas=(1.0,),
+    min_games_values=(3,),
+    min_minutes_values=(5,),
+    half_lives=(365,),
+    n_splits=4,
+    test_ratio=0.4,
+    workers=1,
+    dataset_file=None,
+):
+    """Walk-forward evaluation of a parameter grid on one dataset build.
+
+    The dataset is built once with the loosest min_games/min_minutes in the
+    grid; each parameter set then filters it. Features are shared with the
+    workers as memory-mapped .npy files. Writes one report row per
+    parameter set, split and scope (all test samples, then each year) and
+    returns the rows.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for backtesting. Run: python -m pip install numpy")
+        return []
+
+    with tempfile.TemporaryDirectory() as arrays_dir:
+        store = build_player_pts_dataset(
+            player_stats_file,
+            dataset_file or str(Path(arrays_dir) / "dataset.csv"),
+            min_minutes=min(min_minutes_values),
+            min_games=min(min_games_values),
+            as_arrays=True,
+        )
+        if store is None or len(store) < 2:
+            print("Not enough samples to backtest.")
+            return []
+        arrays = {
+            "features": store.features,
+            "points": store.target("PTS"),
+            "minutes": store.aux_column("MIN"),
+            "days": store.days,
+        }
+        for name in ARRAY_NAMES:
+            np.save(Path(arrays_dir) / f"{name}.npy", arrays[name])
+
+        splits = walk_forward_splits(np, store.days, n_splits=n_splits, test_ratio=test_ratio)
+        grid = list(itertools.product(alphas, min_games_values, min_minutes_values, half_lives))
+        print(f"Backtesting {len(grid)} parameter sets on {len(splits)} splits.")
+
+        rows = []
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(arrays_dir,)
+            ) as executor:
+                for result in executor.map(_evaluate_params, grid, itertools.repeat(splits)):
+                    rows.extend(result)
+        else:
+            _init_worker(arrays_dir)
+            for params in grid:
+                rows.extend(_evaluate_params(params, splits))
+            _ARRAYS.clear()
+
+    with open(report_file, "w", newline="", encoding="utf-8") as out_file:
+        writer = csv.writer(out_file)
+        writer.writerow(BACKTEST_HEADER)
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} backtest rows to {report_file}")
+
+    summary = {}
+    for row in rows:
+        if row[5] == "all":
+            summary.setdefault(tuple(row[:4]), []).append(row[11])
+    if summary:
+        best = min(summary, key=lambda params: sum(summary[params]) / len(summary[params]))
+        mean_rmse = sum(summary[best]) / len(summary[best])
+        print(
+            f"Best: alpha {best[0]}, min_games {best[1]}, min_minutes {best[2]}, "
+            f"half-life {best[3]} (mean RMSE {mean_rmse:.3f})"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the points model")
+    parser.add_argument("player_stats_file")
+    parser.add_argument("--report-file", default="backtest_report.csv")
+    parser.add_argument("--alphas", default="1.0", help="Comma-separated Ridge alphas.")
+    parser.add_argument("--min-games", default="3", help="Comma-separated min_games values.")
+    parser.add_argument("--min-minutes", default="5", help="Comma-separated min_minutes values.")
+    parser.add_argument(
+        "--half-lives",
+        default="365",
+        help="Comma-separated recency half-lives in days (0 disables weighting).",
+    )
+    parser.add_argument("--splits", type=int, default=4)
+    parser.add_argument("--test-ratio", type=float, default=0.4)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    run_backtest(
+        args.player_stats_file,
+        args.report_file,
+        alphas=_parse_list(args.alphas, float),
+        min_games_values=_parse_list(args.min_games, int),
+        min_minutes_values=_parse_list(args.min_minutes, float),
+        half_lives=_parse_list(args.half_lives, float),
+        n_splits=args.splits,
+        test_ratio=args.test_ratio,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
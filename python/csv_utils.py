@@ -1,4 +1,6 @@
 import csv
+import os
+import zlib
 from pathlib import Path
 
 
@@ -13,6 +15,23 @@ def ensure_csv_header(path, header, encoding="utf-8"):
     return True
 
 
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def file_prefix_crc(path, size):
+    """crc32 of the first ``size`` bytes of ``path``, or None if it is shorter."""
+    crc = 0
+    remaining = size
+    with Path(path).open("rb") as file:
+        while remaining > 0:
+            chunk = file.read(min(remaining, READ_CHUNK_BYTES))
+            if not chunk:
+                return None
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+    return crc
+
+
 def load_existing_keys(path, key_indices, expected_header=None, encoding="utf-8"):
     csv_path = Path(path)
     keys = set()
@@ -32,3 +51,78 @@ def load_existing_keys(path, key_indices, expected_header=None, encoding="utf-8"
                 continue
             keys.add(tuple(row[i] for i in key_indices))
     return keys
+
+
+DEFAULT_FLUSH_ROWS = 20000
+
+
+class BufferedCsvWriter:
+    def __init__(self, manager, handle):
+        self.manager = manager
+        self.handle = handle
+        self.writer = csv.writer(handle)
+        self.rows = []
+
+    def writerow(self, row):
+        self.rows.append(list(row))
+        self.manager.row_buffered()
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def drain(self):
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+        self.handle.flush()
+
+
+class CsvWriterManager:
+    """Keep output CSVs open for a whole run and write rows in large batches."""
+
+    def __init__(self, flush_rows=DEFAULT_FLUSH_ROWS, fsync=False):
+        self.flush_rows = max(1, flush_rows)
+        self.fsync = fsync
+        self.buffered_rows = 0
+        self.writers = {}
+
+    def writer(self, path, header=None, encoding="utf-8"):
+        key = str(Path(path))
+        writer = self.writers.get(key)
+        if writer is None:
+            if header:
+                ensure_csv_header(path, header, encoding=encoding)
+            handle = open(path, "a", newline="", encoding=encoding)
+            writer = BufferedCsvWriter(self, handle)
+            self.writers[key] = writer
+        return writer
+
+    def row_buffered(self):
+        self.buffered_rows += 1
+        if self.buffered_rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self, fsync=None):
+        if fsync is None:
+            fsync = self.fsync
+        for writer in self.writers.values():
+            writer.drain()
+            if fsync:
+                os.fsync(writer.handle.fileno())
+        self.buffered_rows = 0
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            for writer in self.writers.values():
+                writer.handle.close()
+            self.writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
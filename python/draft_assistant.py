@@ -0,0 +1,266 @@
+import argparse
+import time
+
+from espn_config import FANTASY_TEAMS
+from lineup_optimizer import eligible_positions
+from position_models import POSITION_GROUPS
+from ranked_pool import RankedPool
+
+
+# League settings: 8 teams, starters C/F/F/G/G, T1/T2 take any position.
+STARTER_SLOTS = {"C": 1, "F": 2, "G": 2}
+FLEX_SLOTS = 2
+DEFAULT_BENCH_SLOTS = 3
+
+
+def draft_pick_order(team_order, rounds, snake=True):
+    """Team ID for every pick; snake drafts reverse the order each round."""
+    order = []
+    for round_number in range(rounds):
+        teams = list(team_order)
+        if snake and round_number % 2:
+            teams.reverse()
+        order.extend(teams)
+    return order
+
+
+class DraftAssistant:
+    """Value-over-replacement draft board that updates pick by pick.
+
+    A position's replacement level is the value of the best player left
+    once every open league starter slot at that position is filled, i.e.
+    the (open slots + 1)-th best remaining player. The pool is a RankedPool
+    (one max-heap per position), so a pick removes one player and re-reads
+    its positions' replacement levels instead of re-sorting the board.
+    Players with compound positions (e.g. "F/C") sit in the heap of every
+    position they are eligible at, keyed (player_id, position), and a pick
+    removes all of their entries.
+    """
+
+    def __init__(
+        self,
+        players,
+        team_order,
+        starter_slots=STARTER_SLOTS,
+        flex_slots=FLEX_SLOTS,
+        bench_slots=DEFAULT_BENCH_SLOTS,
+        snake=True,
+    ):
+        self.starter_slots = dict(starter_slots)
+        self.pool = RankedPool()
+        self.positions = {}
+        for player_id, position, value in players:
+            positions = [slot for slot in self.starter_slots if slot in eligible_positions(position)]
+            if positions:
+                for slot in positions:
+                    self.pool.add((player_id, slot), slot, float(value or 0.0))
+                self.positions[player_id] = positions
+
+        self.team_open = {
+            team: {**self.starter_slots, "T": flex_slots, "B": bench_slots} for team in team_order
+        }
+        self.league_open = {
+            position: slots * len(team_order) for position, slots in self.starter_slots.items()
+        }
+        rounds = sum(self.starter_slots.values()) + flex_slots + bench_slots
+        self.order = draft_pick_order(team_order, rounds, snake=snake)
+        self.pick_number = 0
+        self.picks = []
+        self.replacement = {position: self._replacement_level(position) for position in self.starter_slots}
+
+    def _replacement_level(self, position):
+        top = self.pool.top(position, self.league_open[position] + 1)
+        if len(top) > self.league_open[position]:
+            return top[-1][1]
+        return 0.0
+
+    def on_the_clock(self):
+        if self.pick_number < len(self.order):
+            return self.order[self.pick_number]
+        return None
+
+    def vor(self, player_id):
+        """Best value over replacement across the player's positions, or None once picked."""
+        best = None
+        for position in self.positions.get(player_id, ()):
+            entry = self.pool.entries.get((player_id, position))
+            if entry is not None:
+                vor = entry[1] - self.replacement[position]
+                best = vor if best is None else max(best, vor)
+        return best
+
+    def _candidate_positions(self, team):
+        if team is None:
+            return list(self.starter_slots)
+        open_slots = self.team_open[team]
+        needed = [position for position in self.starter_slots if open_slots[position] > 0]
+        if open_slots["T"] > 0 or open_slots["B"] > 0:
+            return list(self.starter_slots)
+        return needed
+
+    def recommend(self, team=None, k=1):
+        """Best ``k`` (player_id, position, value, vor) for ``team`` (default: on the clock).
+
+        Only positions the team can still roster are considered; a player
+        eligible at several is listed once, at the position with the best VOR.
+        Within a position value order is VOR order, so the best ``k`` of each
+        heap always hold the best ``k`` players overall.
+        """
+        if team is None:
+            team = self.on_the_clock()
+        best = {}
+        for position in self._candidate_positions(team):
+            for (player_id, _slot), value in self.pool.top(position, k):
+                candidate = (player_id, position, value, value - self.replacement[position])
+                if player_id not in best or candidate[3] > best[player_id][3]:
+                    best[player_id] = candidate
+        candidates = sorted(best.values(), key=lambda candidate: (-candidate[3], -candidate[2]))
+        return candidates[:k]
+
+    def pick(self, player_id, team=None):
+        """Record a pick and return the slot it filled ("C"/"F"/"G", "T" or "B").
+
+        A player eligible at several positions fills the first of them (in
+        C, F, G order) the team still has open.
+        """
+        if team is None:
+            team = self.on_the_clock()
+        positions = self.positions.get(player_id, [])
+        for position in positions:
+            self.pool.remove((player_id, position))
+        open_slots = self.team_open.setdefault(team, {**self.starter_slots, "T": 0, "B": 0})
+        open_positions = [position for position in positions if open_slots.get(position, 0) > 0]
+        if open_positions:
+            slot = open_positions[0]
+            self.league_open[slot] -= 1
+        elif open_slots["T"] > 0:
+            slot = "T"
+        else:
+            slot = "B"
+        open_slots[slot] = open_slots.get(slot, 0) - 1
+        for position in positions:
+            self.replacement[position] = self._replacement_level(position)
+        self.picks.append((self.pick_number + 1, team, player_id, slot))
+        self.pick_number += 1
+        return slot
+
+
+def load_draft_assistant(cur, season, bench_slots=DEFAULT_BENCH_SLOTS, snake=True):
+    """DraftAssistant for ``season`` with existing fantasy_rosters rows applied as picks.
+
+    Player values are the mean of their upcoming player_projections, else
+    season points per game (games with minutes). Draft order comes from
+    fantasy_team_seasons, falling back to FANTASY_TEAMS.
+    """
+    cur.execute(
+        """
+        WITH ppg AS (
+          SELECT player_id, AVG(pts) AS ppg
+          FROM player_games
+          WHERE season = %(season)s AND minutes > 0
+          GROUP BY player_id
+        ),
+        projected AS (
+          SELECT player_id, AVG(projected_pts) AS projected
+          FROM player_projections
+          WHERE season = %(season)s
+          GROUP BY player_id
+        )
+        SELECT p.player_id, p.position, COALESCE(pr.projected, ppg.ppg, 0)
+        FROM players p
+        LEFT JOIN ppg ON ppg.player_id = p.player_id
+        LEFT JOIN projected pr ON pr.player_id = p.player_id
+        WHERE ppg.player_id IS NOT NULL OR pr.player_id IS NOT NULL;
+        """,
+        {"season": season},
+    )
+    players = [(player_id, position, float(value)) for player_id, position, value in cur.fetchall()]
+
+    cur.execute(
+        """
+        SELECT fantasy_team_id
+        FROM fantasy_team_seasons
+        WHERE season = %s AND draft_order IS NOT NULL
+        ORDER BY draft_order;
+        """,
+        (season,),
+    )
+    team_order = [row[0] for row in cur.fetchall()] or [team["id"] for team in FANTASY_TEAMS]
+
+    # Replayed in pick order; rows without a pick number follow in draft order.
+    cur.execute(
+        """
+        SELECT fr.fantasy_team_id, fr.player_id, fr.player_position
+        FROM fantasy_rosters fr
+        LEFT JOIN fantasy_team_seasons fts
+          ON fts.season = fr.season AND fts.fantasy_team_id = fr.fantasy_team_id
+        WHERE fr.season = %s
+        ORDER BY fr.pick_number NULLS LAST, fts.draft_order NULLS LAST, fr.fantasy_team_id, fr.player_id;
+        """,
+        (season,),
+    )
+    rostered = cur.fetchall()
+    # The fantasy position recorded on the roster wins over the ESPN one.
+    fantasy_positions = {player_id: position for _team, player_id, position in rostered if position}
+    players = [
+        (player_id, fantasy_positions.get(player_id, position), value)
+        for player_id, position, value in players
+    ]
+    assistant = DraftAssistant(players, team_order, bench_slots=bench_slots, snake=snake)
+    for team_id, player_id, _position in rostered:
+        assistant.pick(player_id, team=team_id)
+    return assistant
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value-over-replacement draft assistant")
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--top", type=int, default=10, help="Recommendations to show for the team on the clock.")
+    parser.add_argument("--bench-slots", type=int, default=DEFAULT_BENCH_SLOTS)
+    parser.add_argument("--linear", action="store_true", help="Same draft order every round instead of snake.")
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Auto-draft the rest of the draft from the recommendations and report update times.",
+    )
+    args = parser.parse_args()
+
+    from espn_ingest import db_connect, load_env_local
+
+    load_env_local()
+    conn = db_connect()
+    try:
+        with conn.cursor() as cur:
+            assistant = load_draft_assistant(
+                cur, args.season, bench_slots=args.bench_slots, snake=not args.linear
+            )
+    finally:
+        conn.close()
+
+    team = assistant.on_the_clock()
+    if team is None:
+        print(f"Draft complete after {assistant.pick_number} picks.")
+        return
+    print(f"Pick {assistant.pick_number + 1}: team {team} on the clock.")
+    print("Replacement levels: " + ", ".join(
+        f"{position} {assistant.replacement[position]:.1f}" for position in POSITION_GROUPS
+    ))
+    for player_id, position, value, vor in assistant.recommend(k=args.top):
+        print(f"  {player_id} {position} value {value:.1f} VOR {vor:+.1f}")
+
+    if args.mock:
+        update_seconds = []
+        while assistant.on_the_clock() is not None:
+            started = time.perf_counter()
+            recommendation = assistant.recommend()
+            if not recommendation:
+                break
+            assistant.pick(recommendation[0][0])
+            update_seconds.append(time.perf_counter() - started)
+        if update_seconds:
+            mean_ms = sum(update_seconds) / len(update_seconds) * 1000
+            print(f"Mock-drafted {len(update_seconds)} picks, {mean_ms:.3f} ms per recommend + pick.")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,7 +34,7 @@ def load_env_local():
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Sync ESPN CBB data into Postgres or Supabase REST.")
-    parser.add_argument("command", choices=["roster", "schedule", "stats", "all", "seed-fantasy"], help="Run type")
+    parser.add_argument("command", choices=["roster", "schedule", "stats", "all", "seed-fantasy", "predict", "simulate", "optimize", "free-agents"], help="Run type")
     parser.add_argument("--season", type=int, default=datetime.now().year, help="Season year tag")
     parser.add_argument("--sleep", type=float, default=DEFAULT_SLEEP_SECONDS, help="Delay between requests")
     parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="HTTP timeout in seconds")
@@ -53,6 +53,51 @@ def parse_args():
         action="store_true",
         help="Only sync final games when building schedules",
     )
+    parser.add_argument("--week", type=int, default=None, help="Fantasy week for simulate/optimize (defaults to the current week)")
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        default=20000,
+        help="Monte Carlo draws per matchup for simulate",
+    )
+    parser.add_argument(
+        "--refresh-odds",
+        action="store_true",
+        help="stats/all: re-simulate the week's matchup odds after syncing",
+    )
+    parser.add_argument(
+        "--refresh-free-agents",
+        action="store_true",
+        help="stats/all: rescore changed free agents after syncing",
+    )
+    parser.add_argument(
+        "--apply-lineups",
+        action="store_true",
+        help="optimize: also save suggestions as lineups for teams without one",
+    )
+    parser.add_argument("--position", default=None, help="free-agents: only this position (C, F or G)")
+    parser.add_argument("--top", type=int, default=10, help="free-agents: players to list")
+    parser.add_argument(
+        "--rank-by",
+        choices=["projected_ros", "recent_form"],
+        default="projected_ros",
+        help="free-agents: rest-of-season projection or recent form",
+    )
+    parser.add_argument(
+        "--model-file",
+        default=None,
+        help="Points model saved by ml_model.train_player_pts_model (predict only)",
+    )
+    parser.add_argument(
+        "--rolling-windows",
+        default="",
+        help="Rolling windows the model was trained with, e.g. 3,5,10 (predict only)",
+    )
+    parser.add_argument(
+        "--ewma-half-lives",
+        default="",
+        help="EWMA half-lives the model was trained with, e.g. 2,5 (predict only)",
+    )
     return parser.parse_args()
 
 
@@ -1116,6 +1161,47 @@ def seed_fantasy_supabase(client, season, draft_order):
     print("Fantasy teams seeded.")
 
 
+def run_predict_command(conn, args):
+    from projections import run_predict
+    from rolling_features import RollingFeatureSet, parse_number_list
+
+    model_file = args.model_file
+    if not model_file or not os.path.exists(model_file):
+        print("predict needs --model-file pointing at a trained points model.")
+        return
+    rolling = None
+    rolling_windows = parse_number_list(args.rolling_windows, cast=int)
+    ewma_half_lives = parse_number_list(args.ewma_half_lives)
+    if rolling_windows or ewma_half_lives:
+        rolling = RollingFeatureSet(rolling_windows, ewma_half_lives)
+    run_predict(conn, args.season, model_file, rolling=rolling)
+
+
+def table_exists(conn, table):
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (table,))
+        return cur.fetchone()[0] is not None
+
+
+def run_post_sync_step(conn, label, table, step):
+    """Run an optional refresh after a stats sync; returns False if skipped or failed.
+
+    Databases created before ``table`` was added to db/schema.sql skip the
+    step, and errors are printed and rolled back rather than raised so the
+    already committed sync still succeeds.
+    """
+    try:
+        if not table_exists(conn, table):
+            print(f"Skipping {label} refresh: {table} does not exist (run with --apply-schema).")
+            return False
+        step()
+    except Exception as exc:
+        conn.rollback()
+        print(f"{label.capitalize()} refresh failed: {exc}")
+        return False
+    return True
+
+
 def main():
     args = parse_args()
     load_env_local()
@@ -1128,6 +1214,10 @@ def main():
         if args.apply_schema:
             print("Apply db/schema.sql in the Supabase SQL editor before running.")
 
+        if args.command in ("predict", "simulate", "optimize", "free-agents"):
+            print(f"{args.command} writes through Postgres; set DATABASE_URL and run without --use-supabase.")
+            return
+
         if args.command == "seed-fantasy":
             seed_fantasy_supabase(client, args.season, args.draft_order)
             return
@@ -1159,6 +1249,28 @@ def main():
             seed_fantasy(conn, args.season, args.draft_order)
             return
 
+        if args.command == "predict":
+            run_predict_command(conn, args)
+            return
+
+        if args.command == "simulate":
+            from matchup_sim import run_simulate
+
+            run_simulate(conn, args.season, week=args.week, n_sims=args.simulations)
+            return
+
+        if args.command == "optimize":
+            from lineup_optimizer import run_optimize
+
+            run_optimize(conn, args.season, week=args.week, apply_lineups=args.apply_lineups)
+            return
+
+        if args.command == "free-agents":
+            from free_agents import run_free_agents
+
+            run_free_agents(conn, args.season, position=args.position, top=args.top, by=args.rank_by)
+            return
+
         if args.command in ("roster", "all"):
             run_roster(conn, args.season, args.sleep, args.timeout)
 
@@ -1175,6 +1287,24 @@ def main():
                 since_date=args.since,
                 force=args.force,
             )
+            # New box scores move the week's odds and free-agent scores. The
+            # stats are committed by now, so these refreshes only log failures.
+            if args.refresh_odds:
+
+                def refresh_odds():
+                    from matchup_sim import run_simulate
+
+                    run_simulate(conn, args.season, n_sims=args.simulations)
+
+                run_post_sync_step(conn, "matchup odds", "fantasy_matchup_odds", refresh_odds)
+            if args.refresh_free_agents:
+
+                def refresh_pool():
+                    from free_agents import refresh_free_agents
+
+                    refresh_free_agents(conn, args.season)
+
+                run_post_sync_step(conn, "free agents", "fantasy_free_agents", refresh_pool)
     finally:
         conn.close()
 
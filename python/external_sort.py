@@ -0,0 +1,78 @@
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+
+
+DEFAULT_SORT_BUFFER_ROWS = 200000
+
+# Rows pickled per chunk in a run file; a merge holds one chunk per run.
+RUN_CHUNK_ROWS = 1024
+
+# Runs merged at once; more runs are first merged into larger runs.
+MAX_MERGE_RUNS = 64
+
+
+def _write_run(items, temp_dir):
+    handle = tempfile.TemporaryFile(dir=temp_dir)
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, RUN_CHUNK_ROWS))
+        if not chunk:
+            break
+        pickle.dump(chunk, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    handle.seek(0)
+    return handle
+
+
+def _read_run(handle):
+    while True:
+        try:
+            chunk = pickle.load(handle)
+        except EOFError:
+            return
+        yield from chunk
+
+
+def external_sort(items, key, buffer_rows=DEFAULT_SORT_BUFFER_ROWS, temp_dir=None):
+    """Yield ``items`` sorted by ``key`` with at most ``buffer_rows`` in memory.
+
+    Items are sorted in runs of ``buffer_rows`` that are spilled to temporary
+    files and then k-way merged. Like ``sorted``, equal keys keep their input
+    order, and input that fits in one buffer never touches disk.
+    """
+    if buffer_rows < 1:
+        raise ValueError("buffer_rows must be at least 1.")
+
+    runs = []
+    try:
+        buffer = []
+        for item in items:
+            buffer.append(item)
+            if len(buffer) >= buffer_rows:
+                buffer.sort(key=key)
+                runs.append(_write_run(buffer, temp_dir))
+                buffer = []
+        buffer.sort(key=key)
+        if not runs:
+            yield from buffer
+            return
+        if buffer:
+            runs.append(_write_run(buffer, temp_dir))
+        buffer = None
+
+        # Merging consecutive groups keeps earlier input ahead of later input.
+        while len(runs) > MAX_MERGE_RUNS:
+            merged_runs = []
+            for start in range(0, len(runs), MAX_MERGE_RUNS):
+                group = runs[start:start + MAX_MERGE_RUNS]
+                merged_runs.append(
+                    _write_run(heapq.merge(*map(_read_run, group), key=key), temp_dir)
+                )
+                for handle in group:
+                    handle.close()
+            runs = merged_runs
+        yield from heapq.merge(*map(_read_run, runs), key=key)
+    finally:
+        for handle in runs:
+            handle.close()
@@ -1,8 +1,19 @@
 import csv
+import heapq
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import zip_longest
 from pathlib import Path
 
-from csv_utils import ensure_csv_header
+from csv_utils import ensure_csv_header, file_prefix_crc
+from external_sort import external_sort
+from game_shards import shard_for, shard_path
+from ml_model import PreGameFeatures, estimate_sample_count
+from sample_store import DEFAULT_CAPACITY, SampleStore
+from rolling_features import RollingFeatureSet, usage_proxy
+from stats_cache import load_player_stats
 
 
 FEATURES_HEADER = [
@@ -69,172 +80,962 @@ def _safe_div(numerator, denominator):
     return numerator / denominator if denominator else 0.0
 
 
-def build_player_features(player_stats_file, output_file, min_minutes=5):
+def features_header(rolling=None):
+    if rolling is None:
+        return FEATURES_HEADER
+    return FEATURES_HEADER + rolling.header()
+
+
+def build_player_features(
+    player_stats_file,
+    output_file,
+    min_minutes=5,
+    engine="auto",
+    incremental=False,
+    rolling=None,
+    sort_buffer_rows=None,
+    stats_cache=False,
+    workers=1,
+):
+    """Write per-game feature rows with season-to-date averages.
+
+    ``rolling`` is an optional rolling_features.RollingFeatureSet; its
+    last-N-game and EWMA columns are appended after the averages and, like
+    them, include the current game. With ``sort_buffer_rows`` the stats are
+    streamed through a bounded-memory external sort (python engine only).
+    ``stats_cache`` has the numpy engine read the typed column cache from
+    stats_cache instead of re-parsing the CSV. ``workers`` > 1 splits the
+    players across a process pool.
+
+    Full builds write rows grouped by player and date. ``incremental`` runs
+    append the rows for new games at the end of the file instead, so the
+    same rows come out in a different order; readers must not assume each
+    player's rows are contiguous.
+    """
     stats_path = Path(player_stats_file)
     if not stats_path.exists() or stats_path.stat().st_size == 0:
         print(f"No player stats found at {player_stats_file}")
         return 0
 
-    rows = []
-    with stats_path.open("r", newline="", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            minutes = _to_float(row.get("MIN", 0))
-            if minutes < min_minutes:
-                continue
-            date_text = row.get("Date", "")
-            try:
-                date_obj = datetime.strptime(date_text, "%m/%d/%y").date()
-            except Exception:
-                continue
-            rows.append((row.get("Player ID", ""), date_obj, row.get("Game ID", ""), row))
-
-    rows.sort(key=lambda item: (item[0], item[1], item[2]))
+    state_path = feature_state_path(output_file)
+    if incremental:
+        written, reason = _update_player_features(
+            stats_path, output_file, min_minutes, rolling
+        )
+        if reason is None:
+            print(f"Appended {written} feature rows to {output_file}")
+            return written
+        print(f"Rebuilding all feature rows: {reason}")
+    elif state_path.exists():
+        state_path.unlink()
+
+    # Taken before reading: a row appended mid-build lands past the saved
+    # offset, and the next incremental run sees it as already applied and
+    # rebuilds instead of silently missing it.
+    source_size = stats_path.stat().st_size
+    if rolling is not None:
+        rolling.reset()
+    np = None
+    if sort_buffer_rows and engine == "numpy":
+        print("Streaming sort reads rows one at a time; using the python engine.")
+    if engine in ("auto", "numpy") and not sort_buffer_rows:
+        try:
+            import numpy as np
+        except ImportError:
+            if engine == "numpy":
+                print("numpy is required for the vectorized engine. Run: python -m pip install numpy")
+                return 0
+
+    if workers > 1:
+        result = _build_player_features_parallel(
+            stats_path,
+            output_file,
+            min_minutes,
+            workers,
+            np is not None,
+            rolling,
+            sort_buffer_rows,
+            stats_cache,
+        )
+    else:
+        result = _build_all_features(
+            np, stats_path, output_file, min_minutes, rolling, sort_buffer_rows, stats_cache
+        )
+
+    written, totals, last_keys = result
+    if incremental:
+        _save_feature_state(
+            output_file, stats_path, source_size, min_minutes, totals, last_keys, rolling
+        )
+    print(f"Wrote {written} feature rows to {output_file}")
+    return written
+
+
+def _build_all_features(
+    np,
+    stats_path,
+    output_file,
+    min_minutes,
+    rolling=None,
+    sort_buffer_rows=None,
+    stats_cache=False,
+    shard=None,
+):
+    """Rebuild ``output_file``; returns (rows_written, totals, last_keys).
+
+    ``np`` selects the numpy engine (None for the python loop). ``shard`` is
+    an optional (index, count) pair restricting a numpy build to the players
+    that game_shards.shard_for assigns to that index; the parallel build
+    uses it with the stats cache, whose columns load without parsing.
+    """
+    if np is not None:
+        return _build_player_features_numpy(
+            np, stats_path, output_file, min_minutes, rolling, stats_cache, shard
+        )
 
     output_path = Path(output_file)
     if output_path.exists():
         output_path.unlink()
-    ensure_csv_header(output_file, FEATURES_HEADER)
+    ensure_csv_header(output_file, features_header(rolling))
+
+    totals = {}
+    last_keys = {}
+    with stats_path.open("r", newline="", encoding="utf-8") as file, open(
+        output_file, "a", newline="", encoding="utf-8"
+    ) as out_file:
+        rows = _iter_feature_input_rows(csv.DictReader(file), min_minutes)
+        if sort_buffer_rows:
+            rows = external_sort(rows, key=_sort_key, buffer_rows=sort_buffer_rows)
+        else:
+            rows = sorted(rows, key=_sort_key)
+        writer = csv.writer(out_file)
+        written = _write_feature_rows(writer, rows, totals, last_keys, rolling)
+    return written, totals, last_keys
+
+
+def _build_feature_shard(
+    stats_file,
+    output_file,
+    min_minutes,
+    use_numpy,
+    rolling_config,
+    sort_buffer_rows,
+    stats_cache,
+    shard,
+):
+    np = None
+    if use_numpy:
+        import numpy as np
+    rolling = RollingFeatureSet(**rolling_config) if rolling_config else None
+    written, totals, last_keys = _build_all_features(
+        np,
+        Path(stats_file),
+        output_file,
+        min_minutes,
+        rolling,
+        sort_buffer_rows,
+        stats_cache,
+        shard,
+    )
+    return written, totals, last_keys, rolling.to_state() if rolling is not None else None
 
+
+def _partition_stats_by_player(stats_path, input_files):
+    """Split the stats CSV into one file per player shard, parsing it once.
+
+    Workers then read only their own players instead of each parsing the
+    whole file and discarding the rest.
+    """
+    handles = [open(path, "w", newline="", encoding="utf-8") for path in input_files]
+    try:
+        writers = [csv.writer(handle) for handle in handles]
+        with stats_path.open("r", newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = next(reader, None) or []
+            for writer in writers:
+                writer.writerow(header)
+            player_idx = header.index("Player ID") if "Player ID" in header else None
+            if player_idx is None:
+                return
+            count = len(writers)
+            for row in reader:
+                if len(row) > player_idx:
+                    writers[shard_for(row[player_idx], count)].writerow(row)
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _merge_feature_shards(output_file, shard_files, header):
+    """Concatenate per-shard feature files in (player, date, game) order.
+
+    Each shard is already sorted and holds whole players, so merging on the
+    Player ID column alone reproduces the single-process order.
+    """
+    handles = [open(path, "r", newline="", encoding="utf-8") for path in shard_files]
+    try:
+        readers = []
+        for handle in handles:
+            reader = csv.reader(handle)
+            next(reader, None)
+            readers.append(reader)
+        with open(output_file, "w", newline="", encoding="utf-8") as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(header)
+            writer.writerows(heapq.merge(*readers, key=lambda row: row[2]))
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _build_player_features_parallel(
+    stats_path,
+    output_file,
+    min_minutes,
+    workers,
+    use_numpy,
+    rolling=None,
+    sort_buffer_rows=None,
+    stats_cache=False,
+):
+    shard_files = [shard_path(output_file, shard) for shard in range(workers)]
+    input_files = []
+    rolling_config = rolling.config() if rolling is not None else None
+    written = 0
     totals = {}
+    last_keys = {}
+    try:
+        if use_numpy and stats_cache:
+            # Built once here rather than raced by every worker; each worker
+            # loads the typed columns and keeps its own players.
+            load_player_stats(stats_path)
+            jobs = [(str(stats_path), (shard, workers)) for shard in range(workers)]
+        else:
+            input_files = [shard_path(f"{output_file}.input", shard) for shard in range(workers)]
+            _partition_stats_by_player(stats_path, input_files)
+            jobs = [(input_files[shard], None) for shard in range(workers)]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _build_feature_shard,
+                    jobs[shard][0],
+                    shard_files[shard],
+                    min_minutes,
+                    use_numpy,
+                    rolling_config,
+                    sort_buffer_rows,
+                    stats_cache and use_numpy,
+                    jobs[shard][1],
+                )
+                for shard in range(workers)
+            ]
+            for future in futures:
+                shard_written, shard_totals, shard_last_keys, rolling_state = future.result()
+                written += shard_written
+                totals.update(shard_totals)
+                last_keys.update(shard_last_keys)
+                if rolling is not None:
+                    rolling.merge_state(rolling_state)
+
+        _merge_feature_shards(output_file, shard_files, features_header(rolling))
+    finally:
+        for path in shard_files + input_files:
+            Path(path).unlink(missing_ok=True)
+    return written, totals, last_keys
+
+
+def _sort_key(item):
+    return item[0], item[1], item[2]
+
+
+def _iter_feature_input_rows(reader, min_minutes):
+    for row in reader:
+        minutes = _to_float(row.get("MIN", 0))
+        if minutes < min_minutes:
+            continue
+        date_text = row.get("Date", "")
+        try:
+            date_obj = datetime.strptime(date_text, "%m/%d/%y").date()
+        except Exception:
+            continue
+        yield row.get("Player ID", ""), date_obj, row.get("Game ID", ""), row
+
+
+def _new_player_totals():
+    return {
+        "games": 0,
+        "pts": 0.0,
+        "min": 0.0,
+        "fga": 0.0,
+        "fgm": 0.0,
+        "tpa": 0.0,
+        "tpm": 0.0,
+        "fta": 0.0,
+        "ftm": 0.0,
+    }
+
+
+def _write_feature_rows(writer, rows, totals, last_keys=None, rolling=None):
+    """Write feature rows for (player_id, date, game_id, row) tuples in order.
+
+    ``totals`` holds each player's running sums and is updated in place, so
+    it can be seeded from a saved state to continue where a build stopped.
+    """
     written = 0
+    for player_id, _date, _game_id, row in rows:
+        minutes = _to_float(row.get("MIN", 0))
+        pts = _to_float(row.get("PTS", 0))
+        fgm = _to_float(row.get("FGM", 0))
+        fga = _to_float(row.get("FGA", 0))
+        tpm = _to_float(row.get("3PTM", 0))
+        tpa = _to_float(row.get("3PTA", 0))
+        ftm = _to_float(row.get("FTM", 0))
+        fta = _to_float(row.get("FTA", 0))
+        oreb = _to_float(row.get("OREB", 0))
+        dreb = _to_float(row.get("DREB", 0))
+        reb = _to_float(row.get("REB", 0))
+        ast = _to_float(row.get("AST", 0))
+        to = _to_float(row.get("TO", 0))
+        stl = _to_float(row.get("STL", 0))
+        blocks = _to_float(row.get("Blocks", 0))
+        pf = _to_float(row.get("PF", 0))
+
+        twom = fgm - tpm
+        twoa = fga - tpa
+        fg_pct = _safe_div(fgm, fga)
+        two_pct = _safe_div(twom, twoa)
+        three_pct = _safe_div(tpm, tpa)
+        ft_pct = _safe_div(ftm, fta)
+        efg = _safe_div(fgm + 0.5 * tpm, fga)
+        ts = _safe_div(pts, 2 * (fga + 0.44 * fta))
+        ftr = _safe_div(fta, fga)
+        three_par = _safe_div(tpa, fga)
+        scoring_attempts = fga + 0.44 * fta
+        pts_per_fga = _safe_div(pts, fga)
+        pts_per_shot = _safe_div(pts, scoring_attempts)
+        pts_per_min = _safe_div(pts, minutes)
+        pts_per_40 = pts_per_min * 40 if minutes else 0.0
+
+        player_totals = totals.get(player_id)
+        if player_totals is None:
+            player_totals = totals[player_id] = _new_player_totals()
+        player_totals["games"] += 1
+        player_totals["pts"] += pts
+        player_totals["min"] += minutes
+        player_totals["fga"] += fga
+        player_totals["fgm"] += fgm
+        player_totals["tpa"] += tpa
+        player_totals["tpm"] += tpm
+        player_totals["fta"] += fta
+        player_totals["ftm"] += ftm
+
+        games_played = player_totals["games"]
+        avg_pts = _safe_div(player_totals["pts"], games_played)
+        avg_min = _safe_div(player_totals["min"], games_played)
+        avg_fga = _safe_div(player_totals["fga"], games_played)
+        avg_tpa = _safe_div(player_totals["tpa"], games_played)
+        avg_fta = _safe_div(player_totals["fta"], games_played)
+        avg_pts_per_40 = (
+            _safe_div(player_totals["pts"], player_totals["min"]) * 40
+            if player_totals["min"]
+            else 0.0
+        )
+        avg_fg_pct = _safe_div(player_totals["fgm"], player_totals["fga"])
+        avg_3p_pct = _safe_div(player_totals["tpm"], player_totals["tpa"])
+        avg_ft_pct = _safe_div(player_totals["ftm"], player_totals["fta"])
+        avg_efg = _safe_div(
+            player_totals["fgm"] + 0.5 * player_totals["tpm"],
+            player_totals["fga"],
+        )
+        avg_ts = _safe_div(
+            player_totals["pts"],
+            2 * (player_totals["fga"] + 0.44 * player_totals["fta"]),
+        )
+
+        feature_row = [
+            row.get("Date", ""),
+            row.get("Game ID", ""),
+            row.get("Player ID", ""),
+            row.get("Player Name", ""),
+            row.get("TEAM ID", ""),
+            row.get("Team Name", ""),
+            minutes,
+            pts,
+            fgm,
+            fga,
+            tpm,
+            tpa,
+            ftm,
+            fta,
+            oreb,
+            dreb,
+            reb,
+            ast,
+            to,
+            stl,
+            blocks,
+            pf,
+            twom,
+            twoa,
+            fg_pct,
+            two_pct,
+            three_pct,
+            ft_pct,
+            efg,
+            ts,
+            ftr,
+            three_par,
+            scoring_attempts,
+            pts_per_fga,
+            pts_per_shot,
+            pts_per_min,
+            pts_per_40,
+            games_played,
+            avg_pts,
+            avg_min,
+            avg_fga,
+            avg_tpa,
+            avg_fta,
+            avg_pts_per_40,
+            avg_fg_pct,
+            avg_3p_pct,
+            avg_ft_pct,
+            avg_efg,
+            avg_ts,
+        ]
+        if rolling is not None:
+            rolling.update(player_id, [pts, minutes, usage_proxy(fga, fta, to)])
+            feature_row.extend(rolling.features(player_id))
+        writer.writerow(feature_row)
+        written += 1
+        if last_keys is not None:
+            last_keys[player_id] = (_date.toordinal(), _game_id)
+    return written
+
+
+DATASET_TARGETS = ["PTS", "REB", "AST"]
+
+# League lineups score a player's points (see fantasy_lineup_scores), so an
+# FPTS target with these weights is PTS again and is not a default target;
+# pass "FPTS" with other ``fantasy_weights`` for a league that scores more.
+FANTASY_POINT_WEIGHTS = {"PTS": 1.0}
+
+
+def _target_value(row, target, fantasy_weights):
+    if target == "FPTS":
+        return sum(
+            weight * _to_float(row.get(field, 0)) for field, weight in fantasy_weights.items()
+        )
+    return _to_float(row.get(target, 0))
+
+
+def build_player_datasets(
+    player_stats_file,
+    features_file,
+    dataset_file,
+    min_minutes=5,
+    min_games=3,
+    targets=DATASET_TARGETS,
+    rolling=None,
+    sort_buffer_rows=None,
+    fantasy_weights=None,
+    as_arrays=False,
+    samples_file=None,
+):
+    """Write the feature CSV and a multi-target ML dataset in one sorted pass.
+
+    The feature file matches build_player_features (python engine). Dataset
+    rows carry one "Target <name>" column per target and the pre-game
+    features from ml_model.PreGameFeatures, as build_player_pts_dataset
+    does for PTS; an "FPTS" target is the ``fantasy_weights`` sum of stats
+    (league fantasy points are PTS). Returns (feature_rows_written,
+    samples) where each sample has "date", "meta", "features" and a
+    "targets" dict, or with ``as_arrays`` a sample_store.SampleStore (saved
+    to ``samples_file``).
+    """
+    stats_path = Path(player_stats_file)
+    if not stats_path.exists() or stats_path.stat().st_size == 0:
+        print(f"No player stats found at {player_stats_file}")
+        return 0, None if as_arrays else []
+
+    fantasy_weights = fantasy_weights or FANTASY_POINT_WEIGHTS
+    if rolling is not None:
+        rolling.reset()
+    # The dataset needs pre-game form over every game, the feature file
+    # form that includes the current qualifying game, so each gets its own.
+    pregame = PreGameFeatures(
+        RollingFeatureSet(**rolling.config()) if rolling is not None else None
+    )
+
+    for path in (Path(features_file), Path(dataset_file), feature_state_path(features_file)):
+        if path.exists():
+            path.unlink()
+    ensure_csv_header(features_file, features_header(rolling))
+
+    samples = []
+    with stats_path.open("r", newline="", encoding="utf-8") as file, open(
+        features_file, "a", newline="", encoding="utf-8"
+    ) as features_out, open(dataset_file, "w", newline="", encoding="utf-8") as dataset_out:
+        dataset_writer = csv.writer(dataset_out)
+        dataset_writer.writerow(
+            FEATURES_HEADER[:6] + [f"Target {target}" for target in targets] + pregame.header()
+        )
+
+        # Every dated row feeds the dataset; the min-minutes cut is applied below.
+        rows = _iter_feature_input_rows(csv.DictReader(file), float("-inf"))
+        if sort_buffer_rows:
+            rows = external_sort(rows, key=_sort_key, buffer_rows=sort_buffer_rows)
+        else:
+            rows = sorted(rows, key=_sort_key)
+        store = None
+        if as_arrays:
+            import numpy as np
+
+            if isinstance(rows, list):
+                capacity = estimate_sample_count(rows, min_minutes, min_games)
+            else:
+                capacity = DEFAULT_CAPACITY
+            store = SampleStore(np, pregame.header(), targets, capacity=capacity)
+
+        def feature_rows():
+            for item in rows:
+                player_id, date_obj, _game_id, row = item
+                minutes = _to_float(row.get("MIN", 0))
+                if player_id:
+                    if pregame.games_played(player_id) >= min_games and minutes >= min_minutes:
+                        feature_row = pregame.features(player_id)
+                        target_values = [
+                            _target_value(row, target, fantasy_weights) for target in targets
+                        ]
+                        meta = [
+                            row.get("Date", ""),
+                            row.get("Game ID", ""),
+                            row.get("Player ID", ""),
+                            row.get("Player Name", ""),
+                            row.get("TEAM ID", ""),
+                            row.get("Team Name", ""),
+                        ]
+                        dataset_writer.writerow(meta + target_values + feature_row)
+                        if store is not None:
+                            store.append(date_obj.toordinal(), meta, feature_row, target_values)
+                        else:
+                            samples.append(
+                                {
+                                    "date": date_obj,
+                                    "meta": meta,
+                                    "features": feature_row,
+                                    "targets": dict(zip(targets, target_values)),
+                                }
+                            )
+                    pregame.update(player_id, row)
+                if not minutes < min_minutes:
+                    yield item
+
+        written = _write_feature_rows(
+            csv.writer(features_out), feature_rows(), {}, None, rolling
+        )
+
+    print(f"Wrote {written} feature rows to {features_file}")
+    if store is not None:
+        store.finish()
+        print(f"Wrote {len(store)} ML rows ({', '.join(targets)}) to {dataset_file}")
+        if samples_file:
+            store.save(samples_file)
+            print(f"Saved sample arrays to {samples_file}")
+        return written, store
+    print(f"Wrote {len(samples)} ML rows ({', '.join(targets)}) to {dataset_file}")
+    return written, samples
+
+
+STATS_TEXT_FIELDS = ["Date", "Game ID", "Player ID", "Player Name", "TEAM ID", "Team Name"]
+
+STATS_NUMERIC_FIELDS = [
+    "MIN",
+    "PTS",
+    "FGM",
+    "FGA",
+    "3PTM",
+    "3PTA",
+    "FTM",
+    "FTA",
+    "OREB",
+    "DREB",
+    "REB",
+    "AST",
+    "TO",
+    "STL",
+    "Blocks",
+    "PF",
+]
+
+RUNNING_TOTAL_FIELDS = ["PTS", "MIN", "FGA", "FGM", "3PTA", "3PTM", "FTA", "FTM"]
+
+STATE_TOTAL_KEYS = {
+    "PTS": "pts",
+    "MIN": "min",
+    "FGA": "fga",
+    "FGM": "fgm",
+    "3PTA": "tpa",
+    "3PTM": "tpm",
+    "FTA": "fta",
+    "FTM": "ftm",
+}
+
+
+def _parse_date_cached(date_text, cache):
+    try:
+        return cache[date_text]
+    except KeyError:
+        try:
+            value = datetime.strptime(date_text, "%m/%d/%y").date().toordinal()
+        except Exception:
+            value = -1
+        cache[date_text] = value
+        return value
+
+
+def _float_column(np, values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_float(value) for value in values], dtype=np.float64)
+
+
+def _np_safe_div(np, numerator, denominator):
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros_like(numerator, dtype=np.float64),
+        where=denominator != 0,
+    )
+
+
+def _grouped_cumsum(np, values, group_starts, group_ids):
+    """Running sum of ``values`` restarting at each group start.
+
+    Integral inputs (the usual box-score case) use one global cumsum, which is
+    exact in float64; anything else sums each group on its own so the results
+    match the sequential per-player loop bit for bit.
+    """
+    if values.size == 0:
+        return values.copy()
+    integral = np.all(np.isfinite(values)) and np.all(values == np.floor(values))
+    if integral and np.abs(values).sum() < 2**53:
+        totals = np.cumsum(values)
+        offsets = np.concatenate(([0.0], totals))[group_starts]
+        return totals - offsets[group_ids]
+    out = np.empty_like(values)
+    bounds = list(group_starts) + [values.size]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        out[start:end] = np.cumsum(values[start:end])
+    return out
+
+
+def _format_float_column(np, values):
+    """Format floats exactly as csv.writer would (repr), once per distinct value."""
+    if values.size == 0:
+        return []
+    unique, inverse = np.unique(values, return_inverse=True)
+    text = np.array([repr(value) for value in unique.tolist()], dtype=object)[inverse]
+    negative_zero = (values == 0) & np.signbit(values)
+    if negative_zero.any():
+        text[negative_zero] = "-0.0"
+    return text.tolist()
+
+
+def _read_stats_columns(stats_path):
+    with stats_path.open("r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None) or []
+        positions = {name: idx for idx, name in enumerate(header)}
+        transposed = list(zip_longest(*(row for row in reader if row), fillvalue=""))
+
+    row_count = len(transposed[0]) if transposed else 0
+    columns = {}
+    for field in STATS_TEXT_FIELDS + STATS_NUMERIC_FIELDS:
+        idx = positions.get(field)
+        if idx is None or idx >= len(transposed):
+            columns[field] = [""] * row_count
+        else:
+            columns[field] = transposed[idx]
+    return columns
+
+
+def _read_cached_stats_columns(np, stats_path):
+    cached = load_player_stats(stats_path)
+    columns = {field: cached.text(field) for field in STATS_TEXT_FIELDS}
+    for field in STATS_NUMERIC_FIELDS:
+        columns[field] = cached.values(field).astype(np.float64)
+    return columns, cached.days().astype(np.int64)
+
+
+def _build_player_features_numpy(
+    np, stats_path, output_file, min_minutes, rolling=None, stats_cache=False, shard=None
+):
+    """Array version of the feature loop; writes the same bytes as the loop."""
+    if stats_cache:
+        columns, dates = _read_cached_stats_columns(np, stats_path)
+    else:
+        columns = _read_stats_columns(stats_path)
+        date_cache = {}
+        dates = np.array(
+            [_parse_date_cached(text, date_cache) for text in columns["Date"]],
+            dtype=np.int64,
+        )
+    minutes = _float_column(np, columns["MIN"])
+    keep = ~(minutes < min_minutes) & (dates >= 0)
+    player_ids = np.array(columns["Player ID"], dtype=str)
+    if shard is not None:
+        unique_ids, inverse = np.unique(player_ids, return_inverse=True)
+        in_shard = np.array(
+            [shard_for(player_id, shard[1]) == shard[0] for player_id in unique_ids.tolist()],
+            dtype=bool,
+        )
+        keep &= in_shard[inverse]
+
+    player_ids = player_ids[keep]
+    game_ids = np.array(columns["Game ID"], dtype=str)[keep]
+    date_ordinals = dates[keep]
+    order = np.lexsort((game_ids, date_ordinals, player_ids))
+    kept_rows = np.flatnonzero(keep)[order]
+
+    stats = {
+        field: _float_column(np, columns[field])[kept_rows]
+        for field in STATS_NUMERIC_FIELDS
+    }
+    text = {
+        field: [columns[field][idx] for idx in kept_rows.tolist()]
+        for field in STATS_TEXT_FIELDS
+    }
+    player_ids = player_ids[order]
+
+    count = kept_rows.size
+    if count == 0:
+        # Header-only output; empty totals still make a valid incremental state.
+        output_path = Path(output_file)
+        if output_path.exists():
+            output_path.unlink()
+        ensure_csv_header(output_file, features_header(rolling))
+        return 0, {}, {}
+    is_start = np.ones(count, dtype=bool)
+    is_start[1:] = player_ids[1:] != player_ids[:-1]
+    group_starts = np.flatnonzero(is_start)
+    group_ids = np.cumsum(is_start) - 1
+    games_played = np.arange(count) - group_starts[group_ids] + 1
+
+    minutes = stats["MIN"]
+    pts = stats["PTS"]
+    fgm = stats["FGM"]
+    fga = stats["FGA"]
+    tpm = stats["3PTM"]
+    tpa = stats["3PTA"]
+    ftm = stats["FTM"]
+    fta = stats["FTA"]
+
+    twom = fgm - tpm
+    twoa = fga - tpa
+    scoring_attempts = fga + 0.44 * fta
+    pts_per_min = _np_safe_div(np, pts, minutes)
+    derived = [
+        twom,
+        twoa,
+        _np_safe_div(np, fgm, fga),
+        _np_safe_div(np, twom, twoa),
+        _np_safe_div(np, tpm, tpa),
+        _np_safe_div(np, ftm, fta),
+        _np_safe_div(np, fgm + 0.5 * tpm, fga),
+        _np_safe_div(np, pts, 2 * (fga + 0.44 * fta)),
+        _np_safe_div(np, fta, fga),
+        _np_safe_div(np, tpa, fga),
+        scoring_attempts,
+        _np_safe_div(np, pts, fga),
+        _np_safe_div(np, pts, scoring_attempts),
+        pts_per_min,
+        np.where(minutes != 0, pts_per_min * 40, 0.0),
+    ]
+
+    totals = {
+        field: _grouped_cumsum(np, stats[field], group_starts, group_ids)
+        for field in RUNNING_TOTAL_FIELDS
+    }
+    games = games_played.astype(np.float64)
+    averages = [
+        totals["PTS"] / games,
+        totals["MIN"] / games,
+        totals["FGA"] / games,
+        totals["3PTA"] / games,
+        totals["FTA"] / games,
+        np.where(totals["MIN"] != 0, _np_safe_div(np, totals["PTS"], totals["MIN"]) * 40, 0.0),
+        _np_safe_div(np, totals["FGM"], totals["FGA"]),
+        _np_safe_div(np, totals["3PTM"], totals["3PTA"]),
+        _np_safe_div(np, totals["FTM"], totals["FTA"]),
+        _np_safe_div(np, totals["FGM"] + 0.5 * totals["3PTM"], totals["FGA"]),
+        _np_safe_div(np, totals["PTS"], 2 * (totals["FGA"] + 0.44 * totals["FTA"])),
+    ]
+
+    group_ends = np.append(group_starts[1:], count) - 1
+    end_ids = player_ids[group_ends].tolist()
+    end_games = games_played[group_ends].tolist()
+    end_dates = date_ordinals[order][group_ends].tolist()
+    end_game_ids = game_ids[order][group_ends].tolist()
+    end_totals = {
+        STATE_TOTAL_KEYS[field]: totals[field][group_ends].tolist()
+        for field in RUNNING_TOTAL_FIELDS
+    }
+    player_totals = {}
+    last_keys = {}
+    for idx, player_id in enumerate(end_ids):
+        player_totals[player_id] = {"games": end_games[idx]}
+        for key, values in end_totals.items():
+            player_totals[player_id][key] = values[idx]
+        last_keys[player_id] = (end_dates[idx], end_game_ids[idx])
+
+    output_columns = [text[field] for field in STATS_TEXT_FIELDS]
+    output_columns += [_format_float_column(np, stats[field]) for field in STATS_NUMERIC_FIELDS]
+    output_columns += [_format_float_column(np, values) for values in derived]
+    output_columns.append(games_played.tolist())
+    output_columns += [_format_float_column(np, values) for values in averages]
+    if rolling is not None:
+        output_columns += _rolling_columns(np, rolling, player_ids, stats)
+
+    output_path = Path(output_file)
+    if output_path.exists():
+        output_path.unlink()
+    ensure_csv_header(output_file, features_header(rolling))
     with open(output_file, "a", newline="", encoding="utf-8") as out_file:
         writer = csv.writer(out_file)
-        for player_id, _date, _game_id, row in rows:
-            minutes = _to_float(row.get("MIN", 0))
-            pts = _to_float(row.get("PTS", 0))
-            fgm = _to_float(row.get("FGM", 0))
-            fga = _to_float(row.get("FGA", 0))
-            tpm = _to_float(row.get("3PTM", 0))
-            tpa = _to_float(row.get("3PTA", 0))
-            ftm = _to_float(row.get("FTM", 0))
-            fta = _to_float(row.get("FTA", 0))
-            oreb = _to_float(row.get("OREB", 0))
-            dreb = _to_float(row.get("DREB", 0))
-            reb = _to_float(row.get("REB", 0))
-            ast = _to_float(row.get("AST", 0))
-            to = _to_float(row.get("TO", 0))
-            stl = _to_float(row.get("STL", 0))
-            blocks = _to_float(row.get("Blocks", 0))
-            pf = _to_float(row.get("PF", 0))
-
-            twom = fgm - tpm
-            twoa = fga - tpa
-            fg_pct = _safe_div(fgm, fga)
-            two_pct = _safe_div(twom, twoa)
-            three_pct = _safe_div(tpm, tpa)
-            ft_pct = _safe_div(ftm, fta)
-            efg = _safe_div(fgm + 0.5 * tpm, fga)
-            ts = _safe_div(pts, 2 * (fga + 0.44 * fta))
-            ftr = _safe_div(fta, fga)
-            three_par = _safe_div(tpa, fga)
-            scoring_attempts = fga + 0.44 * fta
-            pts_per_fga = _safe_div(pts, fga)
-            pts_per_shot = _safe_div(pts, scoring_attempts)
-            pts_per_min = _safe_div(pts, minutes)
-            pts_per_40 = pts_per_min * 40 if minutes else 0.0
-
-            player_totals = totals.setdefault(
-                player_id,
-                {
-                    "games": 0,
-                    "pts": 0.0,
-                    "min": 0.0,
-                    "fga": 0.0,
-                    "fgm": 0.0,
-                    "tpa": 0.0,
-                    "tpm": 0.0,
-                    "fta": 0.0,
-                    "ftm": 0.0,
-                },
-            )
-            player_totals["games"] += 1
-            player_totals["pts"] += pts
-            player_totals["min"] += minutes
-            player_totals["fga"] += fga
-            player_totals["fgm"] += fgm
-            player_totals["tpa"] += tpa
-            player_totals["tpm"] += tpm
-            player_totals["fta"] += fta
-            player_totals["ftm"] += ftm
-
-            games_played = player_totals["games"]
-            avg_pts = _safe_div(player_totals["pts"], games_played)
-            avg_min = _safe_div(player_totals["min"], games_played)
-            avg_fga = _safe_div(player_totals["fga"], games_played)
-            avg_tpa = _safe_div(player_totals["tpa"], games_played)
-            avg_fta = _safe_div(player_totals["fta"], games_played)
-            avg_pts_per_40 = (
-                _safe_div(player_totals["pts"], player_totals["min"]) * 40
-                if player_totals["min"]
-                else 0.0
-            )
-            avg_fg_pct = _safe_div(player_totals["fgm"], player_totals["fga"])
-            avg_3p_pct = _safe_div(player_totals["tpm"], player_totals["tpa"])
-            avg_ft_pct = _safe_div(player_totals["ftm"], player_totals["fta"])
-            avg_efg = _safe_div(
-                player_totals["fgm"] + 0.5 * player_totals["tpm"],
-                player_totals["fga"],
-            )
-            avg_ts = _safe_div(
-                player_totals["pts"],
-                2 * (player_totals["fga"] + 0.44 * player_totals["fta"]),
-            )
-
-            writer.writerow(
-                [
-                    row.get("Date", ""),
-                    row.get("Game ID", ""),
-                    row.get("Player ID", ""),
-                    row.get("Player Name", ""),
-                    row.get("TEAM ID", ""),
-                    row.get("Team Name", ""),
-                    minutes,
-                    pts,
-                    fgm,
-                    fga,
-                    tpm,
-                    tpa,
-                    ftm,
-                    fta,
-                    oreb,
-                    dreb,
-                    reb,
-                    ast,
-                    to,
-                    stl,
-                    blocks,
-                    pf,
-                    twom,
-                    twoa,
-                    fg_pct,
-                    two_pct,
-                    three_pct,
-                    ft_pct,
-                    efg,
-                    ts,
-                    ftr,
-                    three_par,
-                    scoring_attempts,
-                    pts_per_fga,
-                    pts_per_shot,
-                    pts_per_min,
-                    pts_per_40,
-                    games_played,
-                    avg_pts,
-                    avg_min,
-                    avg_fga,
-                    avg_tpa,
-                    avg_fta,
-                    avg_pts_per_40,
-                    avg_fg_pct,
-                    avg_3p_pct,
-                    avg_ft_pct,
-                    avg_efg,
-                    avg_ts,
-                ]
-            )
-            written += 1
+        writer.writerows(zip(*output_columns))
+    return count, player_totals, last_keys
 
-    print(f"Wrote {written} feature rows to {output_file}")
-    return written
+
+def _rolling_columns(np, rolling, player_ids, stats):
+    """Rolling/EWMA columns for the sorted rows.
+
+    Each value depends on the one before it, so this walks the rows in order
+    (O(1) per row) instead of vectorizing, and matches the loop exactly.
+    """
+    usage = (stats["FGA"] + 0.44 * stats["FTA"] + stats["TO"]).tolist()
+    rows = []
+    for player_id, pts, minutes, usg in zip(
+        player_ids.tolist(), stats["PTS"].tolist(), stats["MIN"].tolist(), usage
+    ):
+        rolling.update(player_id, [pts, minutes, usg])
+        rows.append(rolling.features(player_id))
+    if not rows:
+        return [[] for _ in rolling.header()]
+    values = np.array(rows, dtype=np.float64)
+    return [_format_float_column(np, values[:, idx]) for idx in range(values.shape[1])]
+
+
+FEATURE_STATE_VERSION = 2
+STATE_FIELDS = ["games", "pts", "min", "fga", "fgm", "tpa", "tpm", "fta", "ftm"]
+
+
+def feature_state_path(output_file):
+    return Path(f"{output_file}.state.json")
+
+
+def _source_fingerprint(stats_path, size):
+    """crc32 of the stats bytes below ``size``.
+
+    The stats CSV is append-only, so any change in the part already
+    consumed means it was rewritten (corrected rows, a re-scrape) and the
+    saved totals are stale. Corrections can land anywhere in the file, so
+    the whole prefix is hashed rather than its ends.
+    """
+    return {"size": size, "crc": file_prefix_crc(stats_path, size)}
+
+
+def _save_feature_state(
+    output_file, stats_path, source_size, min_minutes, totals, last_keys, rolling=None
+):
+    players = {}
+    for player_id, player_totals in totals.items():
+        last_date, last_game_id = last_keys[player_id]
+        players[player_id] = [player_totals[field] for field in STATE_FIELDS] + [
+            last_date,
+            last_game_id,
+        ]
+    state = {
+        "version": FEATURE_STATE_VERSION,
+        "min_minutes": min_minutes,
+        "source": _source_fingerprint(stats_path, source_size),
+        "output_size": Path(output_file).stat().st_size,
+        "players": players,
+        "rolling": rolling.to_state() if rolling is not None else None,
+    }
+    state_path = feature_state_path(output_file)
+    temp_path = state_path.with_name(state_path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(state, file)
+    temp_path.replace(state_path)
+
+
+def _load_feature_state(output_file):
+    state_path = feature_state_path(output_file)
+    if not state_path.exists():
+        return None
+    try:
+        with state_path.open("r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _update_player_features(stats_path, output_file, min_minutes, rolling=None):
+    """Append feature rows for stats rows added since the saved state.
+
+    Returns (rows_written, None), or (None, reason) when a full rebuild is
+    needed: no usable state, a rewritten stats file, or a game that sorts at
+    or before a player's last processed game.
+    """
+    state = _load_feature_state(output_file)
+    if state is None or state.get("version") != FEATURE_STATE_VERSION:
+        return None, "no saved feature state"
+    if state.get("min_minutes") != min_minutes:
+        return None, "min_minutes changed"
+    saved_rolling = state.get("rolling")
+    if rolling is None:
+        if saved_rolling is not None:
+            return None, "rolling features changed"
+    elif not rolling.load_state(saved_rolling):
+        return None, "rolling features changed"
+    output_path = Path(output_file)
+    if not output_path.exists() or output_path.stat().st_size != state.get("output_size"):
+        return None, "feature file changed since the last build"
+
+    source = state["source"]
+    size = stats_path.stat().st_size
+    if size < source["size"] or _source_fingerprint(stats_path, source["size"]) != source:
+        return None, "player stats file was rewritten"
+    if size == source["size"]:
+        return 0, None
+
+    with stats_path.open("r", newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    with stats_path.open("rb") as file:
+        file.seek(source["size"])
+        new_text = file.read(size - source["size"]).decode("utf-8")
+    reader = csv.DictReader(io.StringIO(new_text, newline=""), fieldnames=header)
+    rows = sorted(_iter_feature_input_rows(reader, min_minutes), key=_sort_key)
+
+    totals = {}
+    last_keys = {}
+    for player_id, values in state["players"].items():
+        totals[player_id] = dict(zip(STATE_FIELDS, values[: len(STATE_FIELDS)]))
+        last_keys[player_id] = (values[-2], values[-1])
+
+    for player_id, date_obj, game_id, _row in rows:
+        last_key = last_keys.get(player_id)
+        if last_key is not None and (date_obj.toordinal(), game_id) <= tuple(last_key):
+            return None, f"late or corrected game {game_id} for player {player_id}"
+
+    with open(output_file, "a", newline="", encoding="utf-8") as out_file:
+        writer = csv.writer(out_file)
+        written = _write_feature_rows(writer, rows, totals, last_keys, rolling)
+
+    _save_feature_state(
+        output_file, stats_path, size, min_minutes, totals, last_keys, rolling
+    )
+    return written, None
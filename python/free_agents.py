@@ -0,0 +1,281 @@
+import heapq
+import json
+from datetime import date, datetime, timezone
+
+from position_models import POSITION_GROUPS, normalize_position
+
+
+# Scores a free agent is ranked by: rest-of-season projected points and
+# points per game over their last RECENT_FORM_GAMES games with minutes.
+# Each has a (season, position, score DESC) index on fantasy_free_agents.
+FREE_AGENT_SCORES = ["projected_ros", "recent_form"]
+RECENT_FORM_GAMES = 5
+
+
+def score_free_agents(cur, season, player_ids=None, today=None):
+    """player_id -> (position, projected_ros, recent_form, games_remaining) for unrostered players.
+
+    Covers ``player_ids`` (default: everyone) who are not on a fantasy_rosters
+    row this season and have played or have games left. Remaining games
+    come from the schedule for the player's active team roster; each is
+    projected from player_projections when present, else the player's
+    season points per game.
+    """
+    cur.execute(
+        """
+        WITH target AS (
+          SELECT p.player_id, p.position, p.team_id
+          FROM players p
+          WHERE (%(all_players)s OR p.player_id = ANY(%(player_ids)s))
+            AND NOT EXISTS (
+              SELECT 1 FROM fantasy_rosters fr
+              WHERE fr.season = %(season)s AND fr.player_id = p.player_id
+            )
+        ),
+        played AS (
+          SELECT pg.player_id, pg.pts,
+                 ROW_NUMBER() OVER (PARTITION BY pg.player_id ORDER BY pg.game_date DESC, pg.game_id DESC) AS recency
+          FROM player_games pg
+          JOIN target t ON t.player_id = pg.player_id
+          WHERE pg.season = %(season)s AND pg.minutes > 0
+        ),
+        form AS (
+          SELECT player_id,
+                 AVG(pts) AS season_ppg,
+                 AVG(pts) FILTER (WHERE recency <= %(recent_games)s) AS recent_form
+          FROM played
+          GROUP BY player_id
+        ),
+        upcoming AS (
+          SELECT t.player_id,
+                 COUNT(*) AS games_remaining,
+                 SUM(COALESCE(pp.projected_pts, f.season_ppg, 0)) AS projected_ros
+          FROM target t
+          JOIN team_rosters tr
+            ON tr.player_id = t.player_id
+           AND tr.season = %(season)s
+           AND COALESCE(tr.is_active, TRUE)
+          JOIN games g ON tr.team_id IN (g.home_team_id, g.away_team_id)
+          LEFT JOIN player_projections pp ON pp.player_id = t.player_id AND pp.game_id = g.game_id
+          LEFT JOIN form f ON f.player_id = t.player_id
+          WHERE g.season = %(season)s
+            AND g.game_date >= %(today)s
+            AND NOT EXISTS (SELECT 1 FROM player_games x WHERE x.game_id = g.game_id)
+          GROUP BY t.player_id
+        )
+        SELECT t.player_id, t.position,
+               COALESCE(u.projected_ros, 0), COALESCE(f.recent_form, 0), COALESCE(u.games_remaining, 0)
+        FROM target t
+        LEFT JOIN form f ON f.player_id = t.player_id
+        LEFT JOIN upcoming u ON u.player_id = t.player_id
+        WHERE f.player_id IS NOT NULL OR u.player_id IS NOT NULL;
+        """,
+        {
+            "season": season,
+            "all_players": player_ids is None,
+            "player_ids": list(player_ids or []),
+            "recent_games": RECENT_FORM_GAMES,
+            "today": today or date.today(),
+        },
+    )
+    return {
+        player_id: (position, float(projected_ros), float(recent_form), games_remaining)
+        for player_id, position, projected_ros, recent_form, games_remaining in cur.fetchall()
+    }
+
+
+def fetch_refresh_state(cur):
+    """Details of the last free-agent refresh from sync_log, or {}."""
+    cur.execute("SELECT details FROM sync_log WHERE run_type = 'free_agents';")
+    row = cur.fetchone()
+    if not row or not row[0]:
+        return {}
+    try:
+        return json.loads(row[0])
+    except ValueError:
+        return {}
+
+
+def fetch_rostered_ids(cur, season):
+    cur.execute("SELECT player_id FROM fantasy_rosters WHERE season = %s;", (season,))
+    return {row[0] for row in cur.fetchall()}
+
+
+def changed_player_ids(cur, season, state, today):
+    """Players whose scores may have changed since ``state``.
+
+    That is players on teams with games since the last refresh day (new box
+    scores, fewer games left) and players with projections written since
+    the last refresh. Roster changes are handled by refresh_free_agents.
+    """
+    cur.execute(
+        """
+        SELECT tr.player_id
+        FROM games g
+        JOIN team_rosters tr
+          ON tr.season = %(season)s
+         AND tr.team_id IN (g.home_team_id, g.away_team_id)
+        WHERE g.season = %(season)s
+          AND g.game_date >= %(since)s
+          AND g.game_date <= %(today)s
+        UNION
+        SELECT player_id
+        FROM player_projections
+        WHERE season = %(season)s AND updated_at >= %(refreshed_at)s;
+        """,
+        {
+            "season": season,
+            "since": state["refreshed_at"][:10],
+            "today": today,
+            "refreshed_at": state["refreshed_at"],
+        },
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def upsert_free_agents(cur, season, scores):
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO fantasy_free_agents (
+            season, player_id, position, projected_ros, recent_form, games_remaining, updated_at
+        ) VALUES %s
+        ON CONFLICT (season, player_id) DO UPDATE SET
+            position = EXCLUDED.position,
+            projected_ros = EXCLUDED.projected_ros,
+            recent_form = EXCLUDED.recent_form,
+            games_remaining = EXCLUDED.games_remaining,
+            updated_at = EXCLUDED.updated_at;
+        """,
+        [
+            (
+                season,
+                player_id,
+                normalize_position(position),
+                round(projected_ros, 2),
+                round(recent_form, 2),
+                games_remaining,
+            )
+            for player_id, (position, projected_ros, recent_form, games_remaining) in scores.items()
+        ],
+        template="(%s, %s, %s, %s, %s, %s, NOW())",
+    )
+
+
+def refresh_free_agents(conn, season, full=False, today=None):
+    """Bring fantasy_free_agents up to date; returns the number of players rescored.
+
+    The first run for a season (or ``full``) scores every player. Later
+    runs only rescore players touched since the previous refresh (see
+    changed_player_ids) plus players dropped from a fantasy roster since
+    then, found by diffing fantasy_rosters against the rostered set saved
+    in sync_log. Every refresh deletes players who are now rostered.
+    """
+    from espn_ingest import update_sync_log
+
+    today = today or date.today()
+    with conn.cursor() as cur:
+        state = fetch_refresh_state(cur)
+        incremental = (
+            not full
+            and state.get("season") == season
+            and state.get("refreshed_at")
+            and "rostered" in state
+        )
+        refreshed_at = datetime.now(timezone.utc).isoformat()
+        rostered = fetch_rostered_ids(cur, season)
+
+        if incremental:
+            player_ids = changed_player_ids(cur, season, state, today)
+            player_ids |= set(state["rostered"]) - rostered
+            scores = score_free_agents(cur, season, player_ids, today) if player_ids else {}
+            stale = [player_id for player_id in player_ids if player_id not in scores]
+            if stale:
+                cur.execute(
+                    "DELETE FROM fantasy_free_agents WHERE season = %s AND player_id = ANY(%s);",
+                    (season, stale),
+                )
+        else:
+            scores = score_free_agents(cur, season, None, today)
+            cur.execute("DELETE FROM fantasy_free_agents WHERE season = %s;", (season,))
+        cur.execute(
+            """
+            DELETE FROM fantasy_free_agents
+            WHERE season = %s
+              AND player_id IN (SELECT player_id FROM fantasy_rosters WHERE season = %s);
+            """,
+            (season, season),
+        )
+        if scores:
+            upsert_free_agents(cur, season, scores)
+
+        update_sync_log(
+            cur,
+            "free_agents",
+            json.dumps(
+                {
+                    "season": season,
+                    "refreshed_at": refreshed_at,
+                    "rostered": sorted(rostered),
+                    "rescored": len(scores),
+                    "full": not incremental,
+                }
+            ),
+        )
+    conn.commit()
+    print(f"Free agents: rescored {len(scores)} players ({'incremental' if incremental else 'full'} refresh).")
+    return len(scores)
+
+
+def top_free_agents(cur, season, k=10, position=None, by="projected_ros"):
+    """Best ``k`` (player_id, position, score) by ``by``, optionally for one position.
+
+    One indexed ``ORDER BY <score> DESC LIMIT k`` per position; players
+    without a C/F/G position are stored under "" and only show up when no
+    position is requested.
+    """
+    if by not in FREE_AGENT_SCORES:
+        raise ValueError(f"Unknown free-agent score {by!r}; expected one of {FREE_AGENT_SCORES}")
+    positions = [normalize_position(position)] if position else POSITION_GROUPS + [""]
+    candidates = []
+    for group in positions:
+        cur.execute(
+            f"""
+            SELECT player_id, position, {by}
+            FROM fantasy_free_agents
+            WHERE season = %s AND position = %s
+            ORDER BY {by} DESC
+            LIMIT %s;
+            """,
+            (season, group, k),
+        )
+        candidates.extend(
+            (player_id, group, float(value or 0.0)) for player_id, group, value in cur.fetchall()
+        )
+    return heapq.nlargest(k, candidates, key=lambda item: item[2])
+
+
+def run_free_agents(conn, season, position=None, top=10, by="projected_ros"):
+    """Refresh the free-agent set and print the best ``top`` available players."""
+    refresh_free_agents(conn, season)
+    with conn.cursor() as cur:
+        best = top_free_agents(cur, season, k=top, position=position, by=by)
+        if not best:
+            print(f"No free agents found for season {season}.")
+            return []
+        cur.execute(
+            """
+            SELECT player_id, COALESCE(short_name, first_name || ' ' || last_name)
+            FROM players
+            WHERE player_id = ANY(%s);
+            """,
+            ([player_id for player_id, _group, _value in best],),
+        )
+        names = dict(cur.fetchall())
+    label = f"{position} " if position else ""
+    print(f"Top {len(best)} {label}free agents by {by.replace('_', ' ')}:")
+    for player_id, group, value in best:
+        print(f"  {names.get(player_id, player_id)} ({group or '-'}) {value:.1f}")
+    return best
@@ -92,6 +92,8 @@ def game_information(
     existing_player_game_ids=None,
     existing_team_game_ids=None,
     existing_play_keys=None,
+    writers=None,
+    plays_archive=None,
 ):
     url = (
         "https://site.api.espn.com/apis/site/v2/sports/basketball/"
@@ -130,7 +132,8 @@ def game_information(
     write_teams = team_stats_filename is not None
 
     if write_players:
-        ensure_csv_header(player_stats_filename, PLAYER_STATS_HEADER)
+        if writers is None:
+            ensure_csv_header(player_stats_filename, PLAYER_STATS_HEADER)
         if existing_player_game_ids is None:
             existing_player_game_ids = {
                 key[0]
@@ -144,7 +147,8 @@ def game_information(
             write_players = False
 
     if write_teams:
-        ensure_csv_header(team_stats_filename, TEAM_STATS_HEADER)
+        if writers is None:
+            ensure_csv_header(team_stats_filename, TEAM_STATS_HEADER)
         if existing_team_game_ids is None:
             existing_team_game_ids = load_existing_keys(
                 team_stats_filename,
@@ -162,6 +166,7 @@ def game_information(
             player_stats_filename if write_players else None,
             team_stats_filename if write_teams else None,
             existing_team_game_ids,
+            writers=writers,
         )
         if write_players and wrote_any:
             wrote_players = True
@@ -173,9 +178,14 @@ def game_information(
 
     plays_written = 0
     plays_error = False
-    if plays_filename:
+    if plays_filename or plays_archive is not None:
         plays_written, plays_ok = process_game_plays(
-            data, game_id_str, plays_filename, existing_play_keys
+            data,
+            game_id_str,
+            plays_filename,
+            existing_play_keys,
+            writers=writers,
+            plays_archive=plays_archive,
         )
         plays_error = not plays_ok
 
@@ -190,9 +200,18 @@ def game_information(
 
 
 def process_game_stats(
-    data, game_id, player_stats_filename=None, team_stats_filename=None, existing_team_game_ids=None
+    data,
+    game_id,
+    player_stats_filename=None,
+    team_stats_filename=None,
+    existing_team_game_ids=None,
+    writers=None,
 ):
-    """Process team and player statistics and write to the stats files."""
+    """Process team and player statistics and write to the stats files.
+
+    When a CsvWriterManager is passed as ``writers`` rows go to its long-lived
+    buffered handles instead of reopening each file per game.
+    """
     try:
         game_time = data["header"]["competitions"][0]["date"]
         game_date = (
@@ -206,15 +225,23 @@ def process_game_stats(
             player_writer = None
             team_writer = None
             if player_stats_filename:
-                player_file = stack.enter_context(
-                    open(player_stats_filename, "a", newline="", encoding="utf-8")
-                )
-                player_writer = csv.writer(player_file)
+                if writers is not None:
+                    player_writer = writers.writer(
+                        player_stats_filename, PLAYER_STATS_HEADER
+                    )
+                else:
+                    player_file = stack.enter_context(
+                        open(player_stats_filename, "a", newline="", encoding="utf-8")
+                    )
+                    player_writer = csv.writer(player_file)
             if team_stats_filename:
-                team_file = stack.enter_context(
-                    open(team_stats_filename, "a", newline="", encoding="utf-8")
-                )
-                team_writer = csv.writer(team_file)
+                if writers is not None:
+                    team_writer = writers.writer(team_stats_filename, TEAM_STATS_HEADER)
+                else:
+                    team_file = stack.enter_context(
+                        open(team_stats_filename, "a", newline="", encoding="utf-8")
+                    )
+                    team_writer = csv.writer(team_file)
 
             teams = data.get("boxscore", {}).get("players", [])
             for team_data in teams:
@@ -258,19 +285,44 @@ def process_game_stats(
         return False
 
 
-def process_game_plays(data, game_id, plays_filename, existing_play_keys=None):
-    """Process game plays and write to the plays file."""
+def process_game_plays(
+    data,
+    game_id,
+    plays_filename,
+    existing_play_keys=None,
+    writers=None,
+    plays_archive=None,
+):
+    """Process game plays and write to the plays file.
+
+    With ``plays_archive`` the game's rows are stored as one compressed block
+    in the PlaysArchive instead of being appended to the plays CSV.
+    """
     try:
         plays = data.get("plays", [])
-        ensure_csv_header(plays_filename, PLAYS_HEADER)
+        if plays_archive is not None:
+            if game_id in plays_archive:
+                return 0, True
+            existing_play_keys = set()
+        elif writers is None:
+            ensure_csv_header(plays_filename, PLAYS_HEADER)
         if existing_play_keys is None:
             existing_play_keys = load_existing_keys(
                 plays_filename, [0, 1], expected_header=PLAYS_HEADER
             )
 
         added_count = 0
-        with open(plays_filename, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
+        archive_rows = []
+        with ExitStack() as stack:
+            if plays_archive is not None:
+                writer = None
+            elif writers is not None:
+                writer = writers.writer(plays_filename, PLAYS_HEADER)
+            else:
+                file = stack.enter_context(
+                    open(plays_filename, "a", newline="", encoding="utf-8")
+                )
+                writer = csv.writer(file)
 
             for idx, play in enumerate(plays):
                 play_index = str(idx)
@@ -304,26 +356,30 @@ def process_game_plays(data, game_id, plays_filename, existing_play_keys=None):
                         for participant in play["participants"]
                     ]
 
-                writer.writerow(
-                    [
-                        game_id,
-                        play_index,
-                        play.get("id", "") or play.get("sequenceNumber", ""),
-                        type_id,
-                        type_text,
-                        play_text,
-                        away_score,
-                        home_score,
-                        period,
-                        period_display,
-                        clock,
-                        team_id,
-                        " ".join([pid for pid in player_ids if pid]),
-                        coord_x,
-                        coord_y,
-                    ]
-                )
+                play_row = [
+                    game_id,
+                    play_index,
+                    play.get("id", "") or play.get("sequenceNumber", ""),
+                    type_id,
+                    type_text,
+                    play_text,
+                    away_score,
+                    home_score,
+                    period,
+                    period_display,
+                    clock,
+                    team_id,
+                    " ".join([pid for pid in player_ids if pid]),
+                    coord_x,
+                    coord_y,
+                ]
+                if writer is None:
+                    archive_rows.append(play_row)
+                else:
+                    writer.writerow(play_row)
                 added_count += 1
+        if plays_archive is not None:
+            plays_archive.append_game(game_id, archive_rows)
         return added_count, True
     except Exception as e:
         print(f"Error processing plays for game ID {game_id}: {e}")
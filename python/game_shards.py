@@ -0,0 +1,275 @@
+import csv
+import heapq
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import groupby
+from pathlib import Path
+
+from csv_utils import CsvWriterManager
+from game_information import (
+    PLAYER_STATS_HEADER,
+    PLAYS_HEADER,
+    TEAM_STATS_HEADER,
+    game_information,
+)
+from http_utils import HTTP_STATS, get_session
+from progress import ProgressReporter
+
+
+def shard_for(game_id, shards):
+    # crc32 rather than hash() so the split is the same in every process.
+    return zlib.crc32(str(game_id).encode("utf-8")) % shards
+
+
+def shard_path(path, shard):
+    return f"{path}.shard{shard}"
+
+
+def _remove(path):
+    if path:
+        Path(path).unlink(missing_ok=True)
+
+
+def _collect_shard(shard, games, player_stats_file, team_stats_file, plays_file):
+    """Fetch one shard of games into that shard's own output files."""
+    player_path = shard_path(player_stats_file, shard) if player_stats_file else None
+    team_path = shard_path(team_stats_file, shard) if team_stats_file else None
+    plays_path = shard_path(plays_file, shard) if plays_file else None
+    for path in (player_path, team_path, plays_path):
+        _remove(path)
+
+    session = get_session()
+    start_bytes = HTTP_STATS["bytes"]
+    status = {
+        "written": 0,
+        "incomplete": 0,
+        "errors": 0,
+        "plays_written": 0,
+        "plays_errors": 0,
+        "bytes_downloaded": 0,
+    }
+    with CsvWriterManager() as writers:
+        for game_id, needs_player_stats, needs_team_stats, needs_plays in games:
+            result = game_information(
+                game_id,
+                player_path if needs_player_stats else None,
+                team_stats_filename=team_path if needs_team_stats else None,
+                plays_filename=plays_path if needs_plays else None,
+                session=session,
+                existing_player_game_ids=set(),
+                existing_team_game_ids=set(),
+                existing_play_keys=set(),
+                writers=writers,
+            )
+            if result["status"] == "written":
+                status["written"] += 1
+            elif result["status"] == "incomplete":
+                status["incomplete"] += 1
+            elif result["status"] == "error":
+                status["errors"] += 1
+            status["plays_written"] += result.get("plays_written", 0)
+            if result.get("plays_error"):
+                status["plays_errors"] += 1
+    status["bytes_downloaded"] = HTTP_STATS["bytes"] - start_bytes
+    return status
+
+
+def _iter_shard_rows(path, header, game_index, game_order):
+    """(rank, game_id, row) for a shard file's rows of games in ``game_order``."""
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if row == header or len(row) <= game_index:
+                continue
+            rank = game_order.get(row[game_index])
+            if rank is not None:
+                yield rank, row[game_index], row
+
+
+def merge_shards(
+    game_ids,
+    output_file,
+    header,
+    shards,
+    game_index,
+    key_indices,
+    seen_keys=None,
+    writers=None,
+    plays_archive=None,
+):
+    """Append the rows of shard files ``shards`` to the canonical output in ``game_ids`` order.
+
+    A worker writes its games in schedule order, so the shard files are
+    stream-merged on each game's position in ``game_ids`` with one row per
+    shard in memory (one game's rows in archive mode). Rows whose key is
+    already in ``seen_keys`` are dropped, so re-fetched or duplicated rows
+    never reach the merged file. Merged shard files are removed.
+    """
+    if seen_keys is None:
+        seen_keys = set()
+    game_order = {str(game_id): rank for rank, game_id in enumerate(game_ids)}
+    paths = [shard_path(output_file, shard) for shard in shards]
+    streams = [
+        _iter_shard_rows(path, header, game_index, game_order) for path in paths if Path(path).exists()
+    ]
+
+    writer = None
+    if plays_archive is None:
+        writer = writers.writer(output_file, header)
+
+    written = 0
+    merged = heapq.merge(*streams, key=lambda item: item[0])
+    for game_id, items in groupby(merged, key=lambda item: item[1]):
+        rows = []
+        for _rank, _game_id, row in items:
+            key = tuple(row[i] for i in key_indices)
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            rows.append(row)
+        if not rows:
+            continue
+        if plays_archive is not None:
+            plays_archive.append_game(game_id, rows)
+        else:
+            writer.writerows(rows)
+        written += len(rows)
+
+    for path in paths:
+        _remove(path)
+    return written
+
+
+def collect_game_shards(
+    games,
+    player_stats_file,
+    team_stats_file=None,
+    plays_file=None,
+    processes=2,
+    writers=None,
+    plays_archive=None,
+    existing_team_game_ids=None,
+):
+    """Fetch ``games`` across a process pool and merge the shard outputs.
+
+    ``games`` is a date-ordered list of (game_id, needs_player_stats,
+    needs_team_stats, needs_plays). Each worker writes ``<file>.shard<k>``;
+    the merge appends them to the canonical CSVs (or the plays archive) in
+    schedule order, whatever order the workers finished in. If a worker
+    raises, the shards that finished are still merged (so their games are
+    not fetched again) and the failed shard's partial files are dropped
+    before the error is re-raised.
+    """
+    shards = max(1, processes)
+    shard_games = [[] for _ in range(shards)]
+    for game in games:
+        shard_games[shard_for(game[0], shards)].append(game)
+
+    # Shard files for the plays always hold CSV rows, even in archive mode.
+    shard_plays_file = plays_file
+    if plays_archive is not None:
+        shard_plays_file = str(plays_archive.archive_path) + ".csv"
+
+    status = {
+        "written": 0,
+        "incomplete": 0,
+        "errors": 0,
+        "plays_written": 0,
+        "plays_errors": 0,
+        "bytes_downloaded": 0,
+    }
+    progress = ProgressReporter("Games processed", total=len(games))
+    completed = []
+    failed = []
+    error = None
+    with ProcessPoolExecutor(max_workers=shards) as executor:
+        futures = {
+            executor.submit(
+                _collect_shard,
+                shard,
+                shard_games[shard],
+                player_stats_file,
+                team_stats_file,
+                shard_plays_file,
+            ): shard
+            for shard in range(shards)
+            if shard_games[shard]
+        }
+        # One shard per worker, each fetching one game at a time, so the
+        # shards still running are the fetches in flight. Waking up every
+        # render interval keeps that count live between shard completions.
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, timeout=progress.min_interval, return_when=FIRST_COMPLETED)
+            if not finished:
+                progress.update(advance=0, in_flight=len(pending))
+            for future in finished:
+                shard = futures[future]
+                try:
+                    shard_status = future.result()
+                except Exception as exc:
+                    failed.append(shard)
+                    if error is None:
+                        error = exc
+                    progress.update(advance=0, in_flight=len(pending))
+                    continue
+                completed.append(shard)
+                for key, value in shard_status.items():
+                    status[key] += value
+                # Workers report once per shard, so progress moves in shard-sized steps.
+                progress.update(
+                    advance=len(shard_games[shard]),
+                    errors=shard_status["errors"],
+                    in_flight=len(pending),
+                    extra_bytes=shard_status["bytes_downloaded"],
+                )
+    if futures:
+        progress.finish()
+    for shard in failed:
+        for path in (player_stats_file, team_stats_file, shard_plays_file):
+            if path:
+                _remove(shard_path(path, shard))
+    completed.sort()
+
+    local_writers = None
+    if writers is None:
+        writers = local_writers = CsvWriterManager()
+    try:
+        game_ids = [game[0] for game in games]
+        if player_stats_file:
+            merge_shards(
+                game_ids,
+                player_stats_file,
+                PLAYER_STATS_HEADER,
+                completed,
+                game_index=1,
+                key_indices=[1, 2],
+                writers=writers,
+            )
+        if team_stats_file:
+            merge_shards(
+                game_ids,
+                team_stats_file,
+                TEAM_STATS_HEADER,
+                completed,
+                game_index=1,
+                key_indices=[1, 2],
+                seen_keys=existing_team_game_ids,
+                writers=writers,
+            )
+        if shard_plays_file:
+            merge_shards(
+                game_ids,
+                shard_plays_file,
+                PLAYS_HEADER,
+                completed,
+                game_index=0,
+                key_indices=[0, 1],
+                writers=writers,
+                plays_archive=plays_archive,
+            )
+    finally:
+        if local_writers is not None:
+            local_writers.close()
+    if error is not None:
+        raise error
+    return status
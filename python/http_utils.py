@@ -7,6 +7,26 @@ DEFAULT_TIMEOUT_SECONDS = 20
 DEFAULT_RETRIES = 3
 DEFAULT_BACKOFF_SECONDS = 1
 
+# Process-wide request counters read by the progress reporter. "errors"
+# counts failed requests and non-2xx responses alike.
+HTTP_STATS = {"requests": 0, "bytes": 0, "in_flight": 0, "errors": 0}
+
+
+def _get(client, url, timeout):
+    HTTP_STATS["in_flight"] += 1
+    try:
+        response = client.get(url, timeout=timeout)
+    except Exception:
+        HTTP_STATS["errors"] += 1
+        raise
+    finally:
+        HTTP_STATS["in_flight"] -= 1
+    HTTP_STATS["requests"] += 1
+    HTTP_STATS["bytes"] += len(response.content)
+    if not 200 <= response.status_code < 300:
+        HTTP_STATS["errors"] += 1
+    return response
+
 
 def get_session():
     session = requests.Session()
@@ -19,7 +39,7 @@ def fetch_json(url, session=None, timeout=DEFAULT_TIMEOUT_SECONDS, retries=DEFAU
     for attempt in range(1, retries + 1):
         try:
             client = session or requests
-            response = client.get(url, timeout=timeout)
+            response = _get(client, url, timeout)
             response.raise_for_status()
             return response.json()
         except Exception as error:
@@ -35,7 +55,7 @@ def fetch_content(url, session=None, timeout=DEFAULT_TIMEOUT_SECONDS, retries=DE
     for attempt in range(1, retries + 1):
         try:
             client = session or requests
-            response = client.get(url, timeout=timeout)
+            response = _get(client, url, timeout)
             response.raise_for_status()
             return response.content
         except Exception as error:
@@ -0,0 +1,205 @@
+import json
+import re
+import time
+
+from position_models import normalize_position
+
+
+# fantasy_lineups slots in column order; starters score, T1/T2 break ties.
+LINEUP_SLOTS = ["C", "F1", "F2", "G1", "G2", "T1", "T2"]
+LINEUP_COLUMNS = [
+    "center_id",
+    "forward1_id",
+    "forward2_id",
+    "guard1_id",
+    "guard2_id",
+    "t1_id",
+    "t2_id",
+]
+SLOT_POSITIONS = {"C": "C", "F1": "F", "F2": "F", "G1": "G", "G2": "G"}
+STARTER_NEEDS = {"C": 1, "F": 2, "G": 2}
+TIEBREAK_SLOTS = ["T1", "T2"]
+# Role order inside a DP state: (C, F, G, tiebreakers).
+ROLES = ["C", "F", "G", "T"]
+
+
+def eligible_positions(value):
+    """Position groups a roster position qualifies for, e.g. "F/C" -> {"F", "C"}."""
+    return {
+        position
+        for position in (normalize_position(part) for part in re.split(r"[/,]", str(value or "")))
+        if position
+    }
+
+
+def optimize_lineup(players, fixed=None):
+    """Best C/F1/F2/G1/G2 + T1/T2 lineup; returns ({slot: player_id}, starter points).
+
+    ``players`` is [(player_id, position, expected_points)]. The objective
+    is lexicographic: starter points, then T1, then T2, since the tiebreakers
+    only count when starters tie. A DP over players (best first) keeps, for
+    each count of C/F/G/T slots filled, the best (starters, T1, T2) vector;
+    vector addition preserves that order, so the result is exact, including
+    for players eligible at more than one position. ``fixed`` pins slots
+    (e.g. players already locked) before the rest are chosen. Rosters short
+    at a position leave that slot empty.
+    """
+    fixed = {slot: player_id for slot, player_id in (fixed or {}).items() if player_id is not None}
+    points = {player_id: float(value or 0.0) for player_id, _position, value in players}
+    needs = dict(STARTER_NEEDS)
+    for slot in fixed:
+        if slot in SLOT_POSITIONS:
+            needs[SLOT_POSITIONS[slot]] -= 1
+    open_tiebreaks = [slot for slot in TIEBREAK_SLOTS if slot not in fixed]
+    limits = (needs["C"], needs["F"], needs["G"], len(open_tiebreaks))
+
+    taken = set(fixed.values())
+    pool = sorted(
+        (player for player in players if player[0] not in taken),
+        key=lambda player: (-points[player[0]], str(player[0])),
+    )
+
+    # state -> (value vector, picks as ((player_id, role), ...))
+    states = {(0, 0, 0, 0): ((0.0, 0.0, 0.0), ())}
+    for player_id, position, _value in pool:
+        player_points = points[player_id]
+        roles = [ROLES.index(group) for group in eligible_positions(position)] + [3]
+        updated = dict(states)
+        for state, (value, picks) in states.items():
+            for role in roles:
+                if state[role] >= limits[role]:
+                    continue
+                next_state = state[:role] + (state[role] + 1,) + state[role + 1:]
+                if role == 3:
+                    # Best-first order makes the first open tiebreaker T1.
+                    component = 1 + TIEBREAK_SLOTS.index(open_tiebreaks[state[3]])
+                else:
+                    component = 0
+                next_value = list(value)
+                next_value[component] += player_points
+                candidate = (tuple(next_value), picks + ((player_id, ROLES[role]),))
+                current = updated.get(next_state)
+                if current is None or candidate[0] > current[0]:
+                    updated[next_state] = candidate
+        states = updated
+
+    # Fill as many slots as the roster allows, then maximize the value vector.
+    _state, (_value, picks) = max(
+        states.items(), key=lambda item: (sum(item[0]), item[1][0])
+    )
+    lineup = dict(fixed)
+    open_slots = {
+        "C": [slot for slot in ["C"] if slot not in fixed],
+        "F": [slot for slot in ["F1", "F2"] if slot not in fixed],
+        "G": [slot for slot in ["G1", "G2"] if slot not in fixed],
+        "T": open_tiebreaks,
+    }
+    for player_id, role in picks:
+        lineup[open_slots[role].pop(0)] = player_id
+    starter_points = sum(points.get(lineup[slot], 0.0) for slot in SLOT_POSITIONS if slot in lineup)
+    return lineup, starter_points
+
+
+def upsert_lineup_suggestions(cur, rows):
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO fantasy_lineup_suggestions (
+            season, week, fantasy_team_id, {", ".join(LINEUP_COLUMNS)}, projected_points, updated_at
+        ) VALUES %s
+        ON CONFLICT (season, week, fantasy_team_id) DO UPDATE SET
+            {", ".join(f"{column} = EXCLUDED.{column}" for column in LINEUP_COLUMNS)},
+            projected_points = EXCLUDED.projected_points,
+            updated_at = EXCLUDED.updated_at;
+        """,
+        rows,
+        template="(" + ", ".join(["%s"] * (len(LINEUP_COLUMNS) + 4)) + ", NOW())",
+    )
+
+
+def run_optimize(conn, season, week=None, apply_lineups=False):
+    """Suggest the best projected lineup for every fantasy team in a week.
+
+    Suggestions go to fantasy_lineup_suggestions. Slots of a saved lineup
+    whose player already played this week stay fixed. With
+    ``apply_lineups`` teams that have no saved lineup get the suggestion
+    written to fantasy_lineups; saved lineups are never overwritten.
+    """
+    from espn_ingest import update_sync_log
+    from matchup_sim import fetch_fantasy_rosters, fetch_saved_lineups, fetch_week, player_week_outlook
+
+    with conn.cursor() as cur:
+        week_row = fetch_week(cur, season, week)
+        if not week_row:
+            print(f"No fantasy week found for season {season}.")
+            return 0
+        week, start_date, end_date = week_row
+
+        rosters = fetch_fantasy_rosters(cur, season)
+        if not rosters:
+            print(f"No fantasy rosters found for season {season}.")
+            return 0
+        saved_lineups = fetch_saved_lineups(cur, season, week)
+        player_ids = {player_id for roster in rosters.values() for player_id, _ in roster}
+        player_ids |= {
+            player_id
+            for lineup in saved_lineups.values()
+            for player_id in lineup.values()
+            if player_id
+        }
+        outlook = player_week_outlook(cur, season, player_ids, start_date, end_date)
+        cur.execute(
+            """
+            SELECT DISTINCT player_id
+            FROM player_games
+            WHERE player_id = ANY(%s) AND game_date >= %s AND game_date <= %s;
+            """,
+            (list(player_ids), start_date, end_date),
+        )
+        played = {row[0] for row in cur.fetchall()}
+
+        started = time.perf_counter()
+        rows = []
+        applied = []
+        for team_id in sorted(rosters):
+            saved = saved_lineups.get(team_id) or {}
+            fixed = {slot: player_id for slot, player_id in saved.items() if player_id in played}
+            lineup, projected = optimize_lineup(
+                [
+                    (player_id, position, sum(outlook[player_id][:2]))
+                    for player_id, position in rosters[team_id]
+                ],
+                fixed=fixed,
+            )
+            slot_ids = [lineup.get(slot) for slot in LINEUP_SLOTS]
+            rows.append((season, week, team_id, *slot_ids, round(projected, 1)))
+            if apply_lineups and not saved and all(slot_ids):
+                applied.append((season, week, team_id, *slot_ids))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        upsert_lineup_suggestions(cur, rows)
+        if applied:
+            from psycopg2.extras import execute_values
+
+            execute_values(
+                cur,
+                f"""
+                INSERT INTO fantasy_lineups (season, week, fantasy_team_id, {", ".join(LINEUP_COLUMNS)})
+                VALUES %s
+                ON CONFLICT (season, week, fantasy_team_id) DO NOTHING;
+                """,
+                applied,
+            )
+        update_sync_log(
+            cur,
+            "optimize",
+            json.dumps({"season": season, "week": week, "teams": len(rows), "applied": len(applied)}),
+        )
+    conn.commit()
+    print(
+        f"Optimized {len(rows)} lineups for week {week} in {elapsed_ms:.1f} ms"
+        + (f"; saved {len(applied)} as lineups." if apply_lineups else ".")
+    )
+    return len(rows)
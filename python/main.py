@@ -1,20 +1,37 @@
 
 import argparse
 import csv
-from datetime import datetime
+import json
+import time
+from datetime import date, datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-from csv_utils import ensure_csv_header, load_existing_keys
-from feature_builder import FEATURES_HEADER, build_player_features
+from artifact_cache import ArtifactCache
+from csv_utils import (
+    DEFAULT_FLUSH_ROWS,
+    CsvWriterManager,
+    ensure_csv_header,
+    load_existing_keys,
+)
+from feature_builder import FEATURES_HEADER, build_player_datasets, build_player_features
 from game_information import (
     PLAYER_STATS_HEADER,
     TEAM_STATS_HEADER,
     PLAYS_HEADER,
     game_information,
 )
-from http_utils import fetch_content, get_session
+from game_shards import collect_game_shards
+from http_utils import HTTP_STATS, fetch_content, get_session
+from ml_model import dataset_samples_path, train_player_pts_model
+from plays_store import DEFAULT_CODEC, PlaysArchive
+from points_scorer import model_artifact_path
+from progress import ProgressReporter, peak_rss_mb
+from rolling_features import RollingFeatureSet, parse_number_list
+from schedule_index import ScheduleIndex
+from similarity_index import update_similarity_index
 from team_roster import ROSTER_HEADER, team_Roster
+from team_ratings import find_season_files, update_team_ratings
 from team_schedule import SCHEDULE_HEADER, team_schedule
 
 AVAILABLE_TEAMS = [
@@ -114,6 +131,10 @@ AVAILABLE_TEAMS = [
 
 EASTERN_TZ = ZoneInfo("America/New_York")
 
+# Runs in which a past game may be fetched without producing output before
+# it stops holding the game window open (cancelled or never-final games).
+MAX_GAME_ATTEMPTS = 3
+
 
 def _parse_team_ids(team_ids_text):
     if not team_ids_text:
@@ -127,18 +148,22 @@ def _parse_team_ids(team_ids_text):
     return team_ids
 
 
-def crawl_schedules(start_team, filename, season, session=None):
+def crawl_schedules(start_team, filename, season, session=None, schedule_index=None):
     visited = set()
     queue = [start_team]
-    existing_game_ids = {
-        key[0]
-        for key in load_existing_keys(
-            filename, [0], expected_header=SCHEDULE_HEADER
-        )
-    }
+    if schedule_index is not None:
+        existing_game_ids = schedule_index.game_ids()
+    else:
+        existing_game_ids = {
+            key[0]
+            for key in load_existing_keys(
+                filename, [0], expected_header=SCHEDULE_HEADER
+            )
+        }
     added_total = 0
     failed_teams = 0
     processed_teams = 0
+    progress = ProgressReporter("Schedule crawl: teams")
 
     while queue:
         team_id = queue.pop(0)
@@ -147,12 +172,6 @@ def crawl_schedules(start_team, filename, season, session=None):
 
         visited.add(team_id)
         processed_teams += 1
-        print(
-            # f"Schedule crawl: teams processed {processed_teams} "
-            f"(queued {len(queue)})",
-            end="\r",
-            flush=True,
-        )
 
         teams, existing_game_ids, added_count, ok = team_schedule(
             team_id,
@@ -169,9 +188,11 @@ def crawl_schedules(start_team, filename, season, session=None):
             if team not in visited:
                 queue.append(team)
 
+        queued = {team for team in queue if team not in visited}
+        progress.update(errors=0 if ok else 1, total=processed_teams + len(queued))
+
     if processed_teams:
-        print(" " * 60, end="\r", flush=True)
-        print(f"Schedule crawl: teams processed {processed_teams}")
+        progress.finish()
     return added_total, failed_teams
 
 
@@ -214,13 +235,8 @@ def collect_rosters(team_ids, roster_file, season, session=None):
     added_total = 0
     failed_teams = 0
     total_teams = len(team_ids)
-    for index, team_id in enumerate(team_ids, start=1):
-        if total_teams:
-            print(
-                f"Rosters: teams processed {index}/{total_teams}",
-                end="\r",
-                flush=True,
-            )
+    progress = ProgressReporter("Rosters: teams", total=total_teams)
+    for team_id in team_ids:
         existing_player_keys, added_count, ok = team_Roster(
             team_id,
             roster_file,
@@ -231,9 +247,9 @@ def collect_rosters(team_ids, roster_file, season, session=None):
         added_total += added_count
         if not ok:
             failed_teams += 1
+        progress.update(errors=0 if ok else 1)
     if total_teams:
-        print(" " * 60, end="\r", flush=True)
-        print(f"Rosters: teams processed {total_teams}/{total_teams}")
+        progress.finish()
     return added_total, failed_teams
 
 
@@ -260,68 +276,101 @@ def collect_schedules(team_ids, schedule_file, season, session=None):
     return added_total, failed_teams
 
 
-def _read_schedule_games(schedule_file):
-    games = []
-    schedule_path = Path(schedule_file)
-    if not schedule_path.exists() or schedule_path.stat().st_size == 0:
-        return games
-
-    with schedule_path.open("r", newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if row == SCHEDULE_HEADER:
-                continue
-            if len(row) < 2:
-                continue
-            game_id = row[0].strip()
-            game_date = row[1].strip()
-            if game_id and game_date:
-                games.append((game_id, game_date))
-    return games
-
-
-def _read_schedule_team_ids(schedule_file):
-    team_ids = set()
-    schedule_path = Path(schedule_file)
-    if not schedule_path.exists() or schedule_path.stat().st_size == 0:
-        return team_ids
-
-    with schedule_path.open("r", newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if row == SCHEDULE_HEADER:
-                continue
-            if len(row) < 6:
-                continue
-            home_id = row[3].strip()
-            away_id = row[5].strip()
-            if home_id:
-                try:
-                    team_ids.add(int(home_id))
-                except ValueError:
-                    pass
-            if away_id:
-                try:
-                    team_ids.add(int(away_id))
-                except ValueError:
-                    pass
-    return team_ids
-
-
-def _resolve_roster_team_ids(default_team_ids, schedule_file):
-    schedule_team_ids = _read_schedule_team_ids(schedule_file)
+def _resolve_roster_team_ids(default_team_ids, schedule_index):
+    schedule_team_ids = schedule_index.team_ids()
     if schedule_team_ids:
         return sorted(schedule_team_ids)
     return default_team_ids
 
 
+def game_attempts_path(schedule_file):
+    return Path(f"{schedule_file}.attempts.json")
+
+
+def _load_game_attempts(attempts_path):
+    if not attempts_path.exists():
+        return {}
+    try:
+        with attempts_path.open("r", encoding="utf-8") as file:
+            return {str(game_id): int(count) for game_id, count in json.load(file).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_game_attempts(attempts_path, attempts):
+    if not attempts:
+        attempts_path.unlink(missing_ok=True)
+        return
+    temp_path = attempts_path.with_name(f"{attempts_path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(attempts, file, sort_keys=True)
+    temp_path.replace(attempts_path)
+
+
+def game_window_path(schedule_file):
+    return Path(f"{schedule_file}.window.json")
+
+
+def _load_game_window(window_path, schedule_index, needs_work):
+    """Date before which every game had its output at the last run, or None.
+
+    The saved count of games before that date catches schedule rows added
+    in the past since then, and re-checking the first and last of those
+    games catches output files that were deleted or replaced; either means
+    a scan from the start of the season.
+    """
+    try:
+        with window_path.open("r", encoding="utf-8") as file:
+            saved = json.load(file)
+        done_before = date.fromisoformat(saved["done_before"])
+        games_before = int(saved["games_before"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if games_before == 0 or schedule_index.count_before(done_before) != games_before:
+        return None
+    games = schedule_index.by_date()
+    if needs_work(games[0].game_id) or needs_work(games[games_before - 1].game_id):
+        return None
+    return done_before
+
+
+def _save_game_window(window_path, schedule_index, done_before):
+    if done_before is None:
+        window_path.unlink(missing_ok=True)
+        return
+    window = {
+        "done_before": done_before.isoformat(),
+        "games_before": schedule_index.count_before(done_before),
+    }
+    temp_path = window_path.with_name(f"{window_path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(window, file)
+    temp_path.replace(window_path)
+
+
 def collect_completed_games_from_schedule(
     schedule_file,
     player_stats_file,
     team_stats_file=None,
     plays_file=None,
     session=None,
+    writers=None,
+    plays_archive=None,
+    schedule_index=None,
+    processes=1,
+    max_attempts=MAX_GAME_ATTEMPTS,
 ):
+    """Fetch every past schedule game whose output is missing.
+
+    Each run that fetches a game dated before today counts one attempt in
+    ``<schedule_file>.attempts.json``; once a game has ``max_attempts``
+    (0 = no limit) without producing output it is skipped, so one
+    cancelled or never-final game cannot pin the crawl window forever.
+    Delete the attempts file to retry those games.
+    """
+    if schedule_index is None:
+        schedule_index = ScheduleIndex.from_csv(schedule_file)
+
     existing_player_game_ids = set()
     if player_stats_file:
         existing_player_game_ids = {
@@ -340,16 +389,67 @@ def collect_completed_games_from_schedule(
 
     existing_play_keys = None
     existing_play_game_ids = set()
-    if plays_file:
+    if plays_archive is not None:
+        plays_file = None
+        existing_play_game_ids = plays_archive.game_ids()
+    elif plays_file:
         existing_play_keys = load_existing_keys(
             plays_file, [0, 1], expected_header=PLAYS_HEADER
         )
         existing_play_game_ids = {key[0] for key in existing_play_keys}
 
+    def needs_work(game_id):
+        return (
+            (player_stats_file and game_id not in existing_player_game_ids)
+            or (team_stats_file and game_id not in existing_team_game_ids_by_game)
+            or (
+                (plays_file or plays_archive is not None)
+                and game_id not in existing_play_game_ids
+            )
+        )
+
     today = datetime.now(EASTERN_TZ).date()
-    schedule_games = _read_schedule_games(schedule_file)
-    skipped_future = 0
-    skipped_existing = 0
+    skipped_future = schedule_index.count_after(today)
+    attempts_path = game_attempts_path(schedule_file)
+    attempts = {
+        game_id: count
+        for game_id, count in _load_game_attempts(attempts_path).items()
+        if needs_work(game_id)
+    }
+    given_up = {
+        game_id for game_id, count in attempts.items() if max_attempts and count >= max_attempts
+    }
+    if given_up:
+        print(
+            f"Skipping {len(given_up)} games still missing output after {max_attempts} attempts "
+            f"(delete {attempts_path} to retry them)."
+        )
+
+    def is_pending(game_id):
+        return game_id not in given_up and needs_work(game_id)
+
+    def count_attempt(game):
+        if game.game_date < today:
+            attempts[game.game_id] = attempts.get(game.game_id, 0) + 1
+
+    # Everything dated before the first game still missing output is done, so
+    # only the window from there through today is walked. The date is saved
+    # at the end of the run so the next run's scan for it starts there
+    # instead of at the season's first game; given-up games still hold it
+    # back so they are retried if --max-game-attempts is raised.
+    window_path = game_window_path(schedule_file)
+    first_missing = schedule_index.first_pending_date(
+        needs_work, _load_game_window(window_path, schedule_index, needs_work)
+    )
+    window_start = None
+    if first_missing is not None:
+        window_start = schedule_index.first_pending_date(is_pending, first_missing)
+    past_games = len(schedule_index.games_between(None, today))
+    if window_start is None or window_start > today:
+        schedule_games = []
+    else:
+        schedule_games = schedule_index.games_between(window_start, today)
+    skipped_existing = past_games - len(schedule_games)
     written = 0
     incomplete = 0
     errors = 0
@@ -358,28 +458,67 @@ def collect_completed_games_from_schedule(
     total_games = len(schedule_games)
     processed_games = 0
 
-    for game_id, game_date in schedule_games:
-        processed_games += 1
-        if total_games:
-            print(
-                f"Games processed {processed_games}/{total_games}",
-                end="\r",
-                flush=True,
+    if processes > 1:
+        pending_games = []
+        for game in schedule_games:
+            if game.game_id in given_up:
+                continue
+            needs_player_stats = bool(
+                player_stats_file and game.game_id not in existing_player_game_ids
             )
-        try:
-            game_day = datetime.strptime(game_date, "%Y/%m/%d").date()
-        except ValueError:
-            continue
-        if game_day > today:
-            skipped_future += 1
-            continue
+            needs_team_stats = bool(
+                team_stats_file and game.game_id not in existing_team_game_ids_by_game
+            )
+            needs_plays = bool(
+                (plays_file or plays_archive is not None)
+                and game.game_id not in existing_play_game_ids
+            )
+            if needs_player_stats or needs_team_stats or needs_plays:
+                pending_games.append(
+                    (game.game_id, needs_player_stats, needs_team_stats, needs_plays)
+                )
+                count_attempt(game)
+        skipped_existing += total_games - len(pending_games)
+        _save_game_attempts(attempts_path, attempts)
+        # Shard output is not tracked game by game here; the next run moves the window on.
+        _save_game_window(window_path, schedule_index, first_missing)
+        print(f"Collecting {len(pending_games)} games across {processes} processes")
+        shard_status = collect_game_shards(
+            pending_games,
+            player_stats_file,
+            team_stats_file=team_stats_file,
+            plays_file=plays_file,
+            processes=processes,
+            writers=writers,
+            plays_archive=plays_archive,
+            existing_team_game_ids=existing_team_game_ids,
+        )
+        if writers is not None:
+            writers.flush()
+        if plays_archive is not None:
+            plays_archive.flush()
+        return {
+            **shard_status,
+            "skipped_existing": skipped_existing,
+            "skipped_future": skipped_future,
+            "total_schedule": len(schedule_index) + schedule_index.skipped_rows,
+        }
+
+    progress = ProgressReporter("Games processed", total=total_games)
+    for game in schedule_games:
+        game_id = game.game_id
+        processed_games += 1
         needs_player_stats = player_stats_file and game_id not in existing_player_game_ids
         needs_team_stats = team_stats_file and game_id not in existing_team_game_ids_by_game
-        needs_plays = plays_file and game_id not in existing_play_game_ids
+        needs_plays = (
+            plays_file or plays_archive is not None
+        ) and game_id not in existing_play_game_ids
 
-        if not needs_player_stats and not needs_team_stats and not needs_plays:
+        if game_id in given_up or (not needs_player_stats and not needs_team_stats and not needs_plays):
             skipped_existing += 1
+            progress.update()
             continue
+        count_attempt(game)
 
         result = game_information(
             game_id,
@@ -390,6 +529,8 @@ def collect_completed_games_from_schedule(
             existing_player_game_ids=existing_player_game_ids,
             existing_team_game_ids=existing_team_game_ids,
             existing_play_keys=existing_play_keys,
+            writers=writers,
+            plays_archive=plays_archive if needs_plays else None,
         )
         if result["status"] == "written":
             existing_player_game_ids.add(game_id)
@@ -401,10 +542,19 @@ def collect_completed_games_from_schedule(
         plays_written += result.get("plays_written", 0)
         if result.get("plays_error"):
             plays_errors += 1
+        progress.update(errors=1 if result["status"] == "error" else 0)
 
     if total_games:
-        print(" " * 60, end="\r", flush=True)
-        print(f"Games processed {processed_games}/{total_games}")
+        progress.finish()
+    _save_game_attempts(attempts_path, attempts)
+    if first_missing is not None:
+        first_missing = schedule_index.first_pending_date(needs_work, first_missing)
+    _save_game_window(window_path, schedule_index, first_missing)
+
+    if writers is not None:
+        writers.flush()
+    if plays_archive is not None:
+        plays_archive.flush()
 
     return {
         "written": written,
@@ -412,7 +562,7 @@ def collect_completed_games_from_schedule(
         "errors": errors,
         "skipped_existing": skipped_existing,
         "skipped_future": skipped_future,
-        "total_schedule": len(schedule_games),
+        "total_schedule": len(schedule_index) + schedule_index.skipped_rows,
         "plays_written": plays_written,
         "plays_errors": plays_errors,
     }
@@ -436,15 +586,23 @@ def append_status_log(log_file, row):
         "Plays Written",
         "Plays Errors",
         "Features Written",
+        "Schedules Seconds",
+        "Rosters Seconds",
+        "Games Seconds",
+        "Features Seconds",
+        "Games Per Second",
+        "Bytes Downloaded",
+        "Peak RSS MB",
     ]
     log_path = Path(log_file)
     header_written = ensure_csv_header(log_file, header)
     if not header_written:
         try:
+            # Older logs carry a shorter header; add the current one once.
             with log_path.open("r", newline="", encoding="utf-8") as file:
                 reader = csv.reader(file)
-                first_row = next(reader, [])
-            if first_row != header:
+                has_header = any(existing_row == header for existing_row in reader)
+            if not has_header:
                 with log_path.open("a", newline="", encoding="utf-8") as file:
                     writer = csv.writer(file)
                     writer.writerow(header)
@@ -456,6 +614,31 @@ def append_status_log(log_file, row):
         writer.writerow(row)
 
 
+# Source files whose changes invalidate cached feature and model outputs.
+FEATURE_CODE_FILES = [
+    "feature_builder.py",
+    "rolling_features.py",
+    "external_sort.py",
+    "stats_cache.py",
+    "game_shards.py",
+    "game_information.py",
+    "ml_model.py",
+]
+MODEL_CODE_FILES = [
+    "ml_model.py",
+    "sample_store.py",
+    "online_ridge.py",
+    "points_scorer.py",
+    "rolling_features.py",
+    "external_sort.py",
+    "game_information.py",
+]
+
+
+def _code_files(names):
+    return [Path(__file__).with_name(name) for name in names]
+
+
 def main():
     parser = argparse.ArgumentParser(description="College basketball data collector")
     parser.add_argument(
@@ -484,12 +667,82 @@ def main():
     parser.add_argument("--team-stats-file", default="")
     parser.add_argument("--plays-file", default="")
     parser.add_argument("--features-file", default="")
+    parser.add_argument("--ml-dataset-file", default="")
+    parser.add_argument("--model-file", default="")
+    parser.add_argument(
+        "--ratings-file",
+        default="",
+        help="After collecting games, update adjusted team ratings for every season folder into this CSV.",
+    )
+    parser.add_argument(
+        "--similarity-index-file",
+        default="",
+        help="Add this season's features to a player similarity index shared across seasons.",
+    )
     parser.add_argument(
         "--min-minutes",
         type=float,
         default=5,
         help="Minimum minutes played to include in features.",
     )
+    parser.add_argument(
+        "--feature-engine",
+        choices=["auto", "numpy", "python"],
+        default="auto",
+        help="Feature builder implementation (auto uses numpy when installed).",
+    )
+    parser.add_argument(
+        "--incremental-features",
+        action="store_true",
+        help="Append feature rows for new games only, rebuilding when needed.",
+    )
+    parser.add_argument(
+        "--ml-dataset",
+        action="store_true",
+        help="Write the PTS/REB/AST training dataset in the same pass as features (and train on it).",
+    )
+    parser.add_argument(
+        "--train-model",
+        action="store_true",
+        help="Train the points model after building features.",
+    )
+    parser.add_argument(
+        "--incremental-train",
+        action="store_true",
+        help="Update the points dataset and model from new games only, rebuilding when needed.",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Skip feature/dataset/model steps whose inputs, parameters and code are unchanged.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Build features in N worker processes sharded by player ID.",
+    )
+    parser.add_argument(
+        "--stats-cache",
+        action="store_true",
+        help="Read player stats for features from a typed .npy column cache.",
+    )
+    parser.add_argument(
+        "--sort-buffer-rows",
+        type=int,
+        default=0,
+        help="Sort stats for features in bounded-memory runs of N rows (0 sorts in memory).",
+    )
+    parser.add_argument(
+        "--rolling-windows",
+        default="",
+        help="Comma-separated last-N-game windows for PTS/MIN/USG features (e.g. 3,5,10).",
+    )
+    parser.add_argument(
+        "--ewma-half-lives",
+        default="",
+        help="Comma-separated EWMA half-lives in games for PTS/MIN/USG features (e.g. 2,5).",
+    )
     parser.add_argument(
         "--no-features",
         action="store_true",
@@ -500,6 +753,40 @@ def main():
         action="store_true",
         help="Skip writing team-level stats.",
     )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=DEFAULT_FLUSH_ROWS,
+        help="Buffered game output rows to hold before flushing to disk.",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync game output files on every flush.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Collect games in N worker processes sharded by game ID.",
+    )
+    parser.add_argument(
+        "--max-game-attempts",
+        type=int,
+        default=MAX_GAME_ATTEMPTS,
+        help="Skip past games still missing output after N runs (0 = retry forever).",
+    )
+    parser.add_argument(
+        "--plays-archive",
+        action="store_true",
+        help="Store plays as compressed per-game blocks with a game_id index.",
+    )
+    parser.add_argument(
+        "--plays-codec",
+        choices=["gzip", "zstd"],
+        default=DEFAULT_CODEC,
+        help="Compression for --plays-archive blocks.",
+    )
     parser.add_argument(
         "--crawl-start-team",
         type=int,
@@ -525,7 +812,13 @@ def main():
     if not args.no_team_stats:
         team_stats_file = args.team_stats_file or str(output_dir / f"{season}_cbb_team_stats.csv")
     plays_file = args.plays_file or str(output_dir / f"{season}_cbb_plays.csv")
+    plays_archive_file = str(output_dir / f"{season}_cbb_plays.archive")
     features_file = args.features_file or str(output_dir / f"{season}_cbb_player_features.csv")
+    ml_dataset_file = args.ml_dataset_file or str(output_dir / f"{season}_cbb_ml_dataset.csv")
+    model_file = args.model_file or str(output_dir / f"{season}_cbb_pts_model.joblib")
+    pts_dataset_file = str(output_dir / f"{season}_cbb_pts_dataset.csv")
+    ml_samples_file = str(dataset_samples_path(ml_dataset_file))
+    pts_predictions_file = str(output_dir / f"{season}_cbb_pts_predictions.csv")
     status_log_file = str(output_dir / "status_log.csv")
 
     team_ids = _parse_team_ids(args.team_ids)
@@ -541,34 +834,189 @@ def main():
         "skipped_existing": 0,
         "skipped_future": 0,
         "total_schedule": 0,
+        "plays_written": 0,
+        "plays_errors": 0,
     }
 
+    # Read the schedule once and share it across stages; it is only re-read
+    # when the crawl appended new games.
+    schedule_index = ScheduleIndex.from_csv(schedule_file)
+
+    phase_seconds = {"schedules": 0.0, "rosters": 0.0, "games": 0.0, "features": 0.0}
+
     if args.task in ("schedules", "all"):
+        phase_start = time.monotonic()
         start_team = args.crawl_start_team or (team_ids[0] if team_ids else AVAILABLE_TEAMS[0])
         schedule_added, schedule_failed = crawl_schedules(
-            start_team, schedule_file, season, session=session
+            start_team,
+            schedule_file,
+            season,
+            session=session,
+            schedule_index=schedule_index,
         )
+        if schedule_added:
+            schedule_index = ScheduleIndex.from_csv(schedule_file)
+        phase_seconds["schedules"] = time.monotonic() - phase_start
 
     if args.task in ("rosters", "all"):
-        roster_team_ids = _resolve_roster_team_ids(team_ids, schedule_file)
+        phase_start = time.monotonic()
+        roster_team_ids = _resolve_roster_team_ids(team_ids, schedule_index)
         roster_added, roster_failed = collect_rosters(
             roster_team_ids, roster_file, season, session=session
         )
+        phase_seconds["rosters"] = time.monotonic() - phase_start
 
     if args.task in ("games", "all"):
-        game_status = collect_completed_games_from_schedule(
-            schedule_file,
-            player_stats_file,
-            team_stats_file=team_stats_file,
-            plays_file=plays_file,
-            session=session,
+        phase_start = time.monotonic()
+        writers = CsvWriterManager(flush_rows=args.flush_rows, fsync=args.fsync)
+        plays_archive = None
+        if args.plays_archive:
+            plays_archive = PlaysArchive(plays_archive_file, codec=args.plays_codec, writer=True)
+        try:
+            game_status = collect_completed_games_from_schedule(
+                schedule_file,
+                player_stats_file,
+                team_stats_file=team_stats_file,
+                plays_file=plays_file,
+                session=session,
+                writers=writers,
+                plays_archive=plays_archive,
+                schedule_index=schedule_index,
+                processes=args.processes,
+                max_attempts=args.max_game_attempts,
+            )
+        finally:
+            writers.close()
+            if plays_archive is not None:
+                plays_archive.close()
+        phase_seconds["games"] = time.monotonic() - phase_start
+
+    if args.task in ("games", "all") and args.ratings_file and team_stats_file:
+        season_files = find_season_files(output_dir.parent)
+        season_files[season] = (team_stats_file, schedule_file)
+        update_team_ratings(season_files, args.ratings_file)
+
+    rolling = None
+    rolling_windows = parse_number_list(args.rolling_windows, int)
+    ewma_half_lives = parse_number_list(args.ewma_half_lives)
+    if rolling_windows or ewma_half_lives:
+        rolling = RollingFeatureSet(rolling_windows, ewma_half_lives)
+
+    artifacts = ArtifactCache(output_dir / "artifacts.json") if args.skip_unchanged else None
+
+    def run_step(step, build, params, code_names, outputs):
+        if artifacts is None:
+            return True, build()
+        return artifacts.run(
+            step,
+            build,
+            inputs=[player_stats_file],
+            params=params,
+            code_files=_code_files(code_names),
+            outputs=outputs,
         )
 
+    step_params = {
+        "min_minutes": float(args.min_minutes),
+        "rolling": rolling.config() if rolling is not None else None,
+    }
     features_written = 0
+    dataset_store = None
     if args.task in ("features", "all") and not args.no_features:
-        features_written = build_player_features(
-            player_stats_file, features_file, min_minutes=args.min_minutes
-        )
+        phase_start = time.monotonic()
+        if args.ml_dataset:
+            if args.incremental_features or args.workers > 1:
+                print("--ml-dataset builds everything in one pass; ignoring incremental/workers options.")
+            # With --train-model the samples are kept as arrays (and saved) so
+            # training reuses this pass instead of re-reading the stats.
+            ran, result = run_step(
+                "ml_dataset",
+                lambda: build_player_datasets(
+                    player_stats_file,
+                    features_file,
+                    ml_dataset_file,
+                    min_minutes=args.min_minutes,
+                    rolling=rolling,
+                    sort_buffer_rows=args.sort_buffer_rows,
+                    as_arrays=args.train_model,
+                    samples_file=ml_samples_file if args.train_model else None,
+                ),
+                step_params,
+                FEATURE_CODE_FILES,
+                [features_file, ml_dataset_file] + ([ml_samples_file] if args.train_model else []),
+            )
+            if ran:
+                features_written, dataset_store = result
+        else:
+            ran, result = run_step(
+                "features",
+                lambda: build_player_features(
+                    player_stats_file,
+                    features_file,
+                    min_minutes=args.min_minutes,
+                    engine=args.feature_engine,
+                    incremental=args.incremental_features,
+                    rolling=rolling,
+                    sort_buffer_rows=args.sort_buffer_rows,
+                    stats_cache=args.stats_cache,
+                    workers=args.workers,
+                ),
+                step_params,
+                FEATURE_CODE_FILES,
+                [features_file],
+            )
+            if ran:
+                features_written = result
+        if args.similarity_index_file:
+            update_similarity_index([features_file], args.similarity_index_file)
+        phase_seconds["features"] = time.monotonic() - phase_start
+
+    if args.task in ("features", "all") and args.train_model:
+        model_outputs = [model_file, model_artifact_path(model_file), pts_predictions_file]
+        if args.ml_dataset and not args.no_features:
+            # Train on the one-pass dataset; when that step was skipped as
+            # unchanged its saved arrays are loaded instead.
+            run_step(
+                "model",
+                lambda: train_player_pts_model(
+                    player_stats_file,
+                    None,
+                    model_file,
+                    pts_predictions_file,
+                    min_minutes=args.min_minutes,
+                    incremental=args.incremental_train,
+                    store=dataset_store if dataset_store is not None else ml_samples_file,
+                ),
+                step_params,
+                MODEL_CODE_FILES,
+                model_outputs,
+            )
+        else:
+            run_step(
+                "model",
+                lambda: train_player_pts_model(
+                    player_stats_file,
+                    pts_dataset_file,
+                    model_file,
+                    pts_predictions_file,
+                    min_minutes=args.min_minutes,
+                    rolling=rolling,
+                    sort_buffer_rows=args.sort_buffer_rows,
+                    incremental=args.incremental_train,
+                ),
+                step_params,
+                MODEL_CODE_FILES,
+                [pts_dataset_file] + model_outputs,
+            )
+
+    games_fetched = (
+        game_status["written"] + game_status["incomplete"] + game_status["errors"]
+    )
+    games_per_second = (
+        games_fetched / phase_seconds["games"] if phase_seconds["games"] else 0.0
+    )
+    bytes_downloaded = HTTP_STATS["bytes"] + game_status.get("bytes_downloaded", 0)
+    peak_rss = peak_rss_mb()
 
     timestamp = datetime.now(EASTERN_TZ).isoformat(timespec="seconds")
     append_status_log(
@@ -590,6 +1038,13 @@ def main():
             game_status["plays_written"],
             game_status["plays_errors"],
             features_written,
+            round(phase_seconds["schedules"], 1),
+            round(phase_seconds["rosters"], 1),
+            round(phase_seconds["games"], 1),
+            round(phase_seconds["features"], 1),
+            round(games_per_second, 2),
+            bytes_downloaded,
+            round(peak_rss, 1) if peak_rss is not None else "",
         ],
     )
 
@@ -603,7 +1058,13 @@ def main():
         f"skipped future {game_status['skipped_future']}), "
         f"plays written {game_status['plays_written']} "
         f"(errors {game_status['plays_errors']}), "
-        f"features written {features_written}."
+        f"features written {features_written}. "
+        f"Phases: schedules {phase_seconds['schedules']:.1f}s, "
+        f"rosters {phase_seconds['rosters']:.1f}s, "
+        f"games {phase_seconds['games']:.1f}s ({games_per_second:.2f}/s), "
+        f"features {phase_seconds['features']:.1f}s; "
+        f"downloaded {bytes_downloaded / (1024 * 1024):.1f} MB"
+        + (f", peak RSS {peak_rss:.0f} MB." if peak_rss is not None else ".")
     )
 
 
@@ -0,0 +1,298 @@
+import json
+import math
+from datetime import date
+
+from lineup_optimizer import LINEUP_COLUMNS, LINEUP_SLOTS, optimize_lineup
+
+
+STARTER_COUNT = 5
+
+DEFAULT_SIMULATIONS = 20000
+# Per-game points standard deviation for players with too few games to estimate one.
+DEFAULT_GAME_SD = 6.0
+MIN_SD_GAMES = 3
+
+
+def simulate_slot_points(np, means, sds, actual, lineup_idx, n_sims, seed=None):
+    """(n_sims, n_teams, n_slots) points per lineup slot for the week.
+
+    Every player's remaining points are one normal draw per simulation,
+    floored at zero and rounded to whole points, added to the points already
+    scored. ``lineup_idx`` holds player indexes with -1 for an empty slot.
+    """
+    rng = np.random.default_rng(seed)
+    n_players = len(means)
+    draws = rng.standard_normal((n_sims, n_players), dtype=np.float32)
+    draws *= sds.astype(np.float32)
+    draws += means.astype(np.float32)
+    np.maximum(draws, 0, out=draws)
+    np.rint(draws, out=draws)
+    draws += actual.astype(np.float32)
+    # Empty slots read a trailing zero column.
+    draws = np.concatenate([draws, np.zeros((n_sims, 1), dtype=np.float32)], axis=1)
+    return draws[:, np.where(lineup_idx < 0, n_players, lineup_idx)]
+
+
+def win_probabilities(np, slot_points, team_idx, opponent_idx):
+    """P(team beats opponent) per pairing: starter total, then T1, then T2; full ties split."""
+    starters = slot_points[..., :STARTER_COUNT].sum(axis=-1)
+    keys = [starters, slot_points[..., STARTER_COUNT], slot_points[..., STARTER_COUNT + 1]]
+    wins = np.zeros((slot_points.shape[0], len(team_idx)), dtype=bool)
+    tied = np.ones_like(wins)
+    for key in keys:
+        diff = key[:, team_idx] - key[:, opponent_idx]
+        wins |= tied & (diff > 0)
+        tied &= diff == 0
+    return wins.mean(axis=0) + 0.5 * tied.mean(axis=0)
+
+
+def fetch_week(cur, season, week=None, today=None):
+    """(week, start_date, end_date): the given week, else the current or next one."""
+    if week is not None:
+        cur.execute(
+            "SELECT week, start_date, end_date FROM fantasy_weeks WHERE season = %s AND week = %s;",
+            (season, week),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT week, start_date, end_date
+            FROM fantasy_weeks
+            WHERE season = %s AND end_date >= %s
+            ORDER BY start_date
+            LIMIT 1;
+            """,
+            (season, today or date.today()),
+        )
+    return cur.fetchone()
+
+
+def fetch_player_outlook(cur, season, player_ids, start_date, end_date):
+    """Per player: points scored this week, remaining-game projections and season mean/sd."""
+    params = {"season": season, "player_ids": list(player_ids), "start": start_date, "end": end_date}
+    cur.execute(
+        """
+        SELECT player_id, COALESCE(SUM(pts), 0)
+        FROM player_games
+        WHERE player_id = ANY(%(player_ids)s)
+          AND game_date >= %(start)s
+          AND game_date <= %(end)s
+        GROUP BY player_id;
+        """,
+        params,
+    )
+    actual = {player_id: float(points) for player_id, points in cur.fetchall()}
+
+    cur.execute(
+        """
+        SELECT p.player_id, pp.projected_pts
+        FROM players p
+        JOIN games g ON g.home_team_id = p.team_id OR g.away_team_id = p.team_id
+        LEFT JOIN player_projections pp ON pp.player_id = p.player_id AND pp.game_id = g.game_id
+        WHERE p.player_id = ANY(%(player_ids)s)
+          AND g.game_date >= %(start)s
+          AND g.game_date <= %(end)s
+          AND NOT EXISTS (SELECT 1 FROM player_games pg WHERE pg.game_id = g.game_id);
+        """,
+        params,
+    )
+    remaining = {}
+    for player_id, projected in cur.fetchall():
+        remaining.setdefault(player_id, []).append(None if projected is None else float(projected))
+
+    cur.execute(
+        """
+        SELECT player_id, COUNT(*), AVG(pts), STDDEV_SAMP(pts)
+        FROM player_games
+        WHERE player_id = ANY(%(player_ids)s)
+          AND season = %(season)s
+          AND minutes > 0
+        GROUP BY player_id;
+        """,
+        params,
+    )
+    season_stats = {
+        player_id: (games, float(mean or 0), None if sd is None else float(sd))
+        for player_id, games, mean, sd in cur.fetchall()
+    }
+    return actual, remaining, season_stats
+
+
+def fetch_fantasy_rosters(cur, season):
+    """fantasy_team_id -> [(player_id, player_position)]."""
+    cur.execute(
+        "SELECT fantasy_team_id, player_id, player_position FROM fantasy_rosters WHERE season = %s;",
+        (season,),
+    )
+    rosters = {}
+    for team_id, player_id, position in cur.fetchall():
+        rosters.setdefault(team_id, []).append((player_id, position))
+    return rosters
+
+
+def fetch_saved_lineups(cur, season, week):
+    """fantasy_team_id -> {slot: player_id} from fantasy_lineups."""
+    cur.execute(
+        f"""
+        SELECT fantasy_team_id, {", ".join(LINEUP_COLUMNS)}
+        FROM fantasy_lineups
+        WHERE season = %s AND week = %s;
+        """,
+        (season, week),
+    )
+    return {row[0]: dict(zip(LINEUP_SLOTS, row[1:])) for row in cur.fetchall()}
+
+
+def player_week_outlook(cur, season, player_ids, start_date, end_date):
+    """player_id -> (points scored, remaining mean, remaining sd) for the week.
+
+    Remaining games are projected from player_projections when present,
+    else the player's season points per game; the per-game sd is the
+    player's season sd of points, scaled by sqrt(remaining games).
+    """
+    actual, remaining, season_stats = fetch_player_outlook(
+        cur, season, player_ids, start_date, end_date
+    )
+    outlook = {}
+    for player_id in player_ids:
+        games, mean, sd = season_stats.get(player_id, (0, 0.0, None))
+        if sd is None or games < MIN_SD_GAMES:
+            sd = DEFAULT_GAME_SD
+        projections = remaining.get(player_id, [])
+        outlook[player_id] = (
+            actual.get(player_id, 0.0),
+            sum(mean if value is None else value for value in projections),
+            sd * math.sqrt(len(projections)),
+        )
+    return outlook
+
+
+def upsert_matchup_odds(cur, rows):
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO fantasy_matchup_odds (
+            season, week, fantasy_team_id, opponent_fantasy_team_id, projected_points,
+            points_p10, points_p90, win_probability, simulations, lineup_source, updated_at
+        ) VALUES %s
+        ON CONFLICT (season, week, fantasy_team_id) DO UPDATE SET
+            opponent_fantasy_team_id = EXCLUDED.opponent_fantasy_team_id,
+            projected_points = EXCLUDED.projected_points,
+            points_p10 = EXCLUDED.points_p10,
+            points_p90 = EXCLUDED.points_p90,
+            win_probability = EXCLUDED.win_probability,
+            simulations = EXCLUDED.simulations,
+            lineup_source = EXCLUDED.lineup_source,
+            updated_at = EXCLUDED.updated_at;
+        """,
+        rows,
+        template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())",
+    )
+
+
+def run_simulate(conn, season, week=None, n_sims=DEFAULT_SIMULATIONS, seed=None):
+    """Simulate every fantasy_matchups pairing for a week into fantasy_matchup_odds.
+
+    Remaining games come from the schedule; each is projected from
+    player_projections when present, else the player's season points per
+    game. Teams without a saved lineup use the optimal projected lineup.
+    All players and pairings are simulated together as one array.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for matchup odds. Run: python -m pip install numpy")
+        return 0
+
+    from espn_ingest import update_sync_log
+
+    with conn.cursor() as cur:
+        week_row = fetch_week(cur, season, week)
+        if not week_row:
+            print(f"No fantasy week found for season {season}.")
+            return 0
+        week, start_date, end_date = week_row
+
+        cur.execute(
+            """
+            SELECT fantasy_team_id, opponent_fantasy_team_id
+            FROM fantasy_matchups
+            WHERE season = %s AND week = %s
+            ORDER BY fantasy_team_id;
+            """,
+            (season, week),
+        )
+        pairings = cur.fetchall()
+        if not pairings:
+            print(f"No matchups found for week {week}.")
+            return 0
+
+        rosters = fetch_fantasy_rosters(cur, season)
+        saved_lineups = fetch_saved_lineups(cur, season, week)
+
+        team_ids = sorted({team for pairing in pairings for team in pairing})
+        player_ids = {player_id for team in team_ids for player_id, _ in rosters.get(team, [])}
+        player_ids |= {
+            player_id
+            for team in team_ids
+            for player_id in saved_lineups.get(team, {}).values()
+            if player_id
+        }
+        outlook = player_week_outlook(cur, season, player_ids, start_date, end_date)
+
+        players = sorted(player_ids)
+        points = np.array([outlook[player_id][0] for player_id in players], dtype=np.float64)
+        means = np.array([outlook[player_id][1] for player_id in players], dtype=np.float64)
+        sds = np.array([outlook[player_id][2] for player_id in players], dtype=np.float64)
+
+        player_index = {player_id: idx for idx, player_id in enumerate(players)}
+        lineup_idx = np.full((len(team_ids), len(LINEUP_SLOTS)), -1, dtype=np.int64)
+        lineup_source = {}
+        for row, team in enumerate(team_ids):
+            lineup = saved_lineups.get(team)
+            lineup_source[team] = "saved" if lineup else "projected"
+            if not lineup:
+                lineup, _projected = optimize_lineup(
+                    [
+                        (player_id, position, sum(outlook[player_id][:2]))
+                        for player_id, position in rosters.get(team, [])
+                    ]
+                )
+            for col, slot in enumerate(LINEUP_SLOTS):
+                if lineup.get(slot) in player_index:
+                    lineup_idx[row, col] = player_index[lineup[slot]]
+
+        slot_points = simulate_slot_points(np, means, sds, points, lineup_idx, n_sims, seed)
+        team_row = {team: row for row, team in enumerate(team_ids)}
+        team_idx = np.array([team_row[team] for team, _ in pairings])
+        opponent_idx = np.array([team_row[opponent] for _, opponent in pairings])
+        probabilities = win_probabilities(np, slot_points, team_idx, opponent_idx)
+        starters = slot_points[..., :STARTER_COUNT].sum(axis=-1)
+        low, high = np.percentile(starters, [10, 90], axis=0)
+
+        rows = []
+        for (team, opponent), probability in zip(pairings, probabilities.tolist()):
+            column = team_row[team]
+            rows.append(
+                (
+                    season,
+                    week,
+                    team,
+                    opponent,
+                    round(float(starters[:, column].mean()), 1),
+                    round(float(low[column]), 1),
+                    round(float(high[column]), 1),
+                    round(probability, 4),
+                    n_sims,
+                    lineup_source[team],
+                )
+            )
+        upsert_matchup_odds(cur, rows)
+        update_sync_log(
+            cur, "simulate", json.dumps({"season": season, "week": week, "matchups": len(rows)})
+        )
+    conn.commit()
+    print(f"Simulated {len(rows)} matchup sides for week {week} ({n_sims} draws).")
+    return len(rows)
@@ -1,8 +1,17 @@
 import csv
+import io
+import json
+import time
 from datetime import datetime
 from pathlib import Path
 
+from csv_utils import file_prefix_crc
+from external_sort import external_sort
 from game_information import PLAYER_STATS_FIELDS
+from online_ridge import RidgeSufficientStats
+from points_scorer import model_artifact_path, save_model_artifact
+from rolling_features import rolling_row_values
+from sample_store import DEFAULT_CAPACITY, SampleStore, recency_weights, time_split
 
 
 ML_FEATURE_FIELDS = ["Games Played"] + [f"AVG_{field}" for field in PLAYER_STATS_FIELDS]
@@ -29,87 +38,447 @@ def _safe_div(numerator, denominator):
     return numerator / denominator if denominator else 0.0
 
 
+def _sort_key(item):
+    return item[0], item[1], item[2]
+
+
+def _iter_dataset_input_rows(reader):
+    for row in reader:
+        date_text = row.get("Date", "")
+        player_id = row.get("Player ID", "")
+        if not date_text or not player_id:
+            continue
+        try:
+            date_obj = datetime.strptime(date_text, "%m/%d/%y").date()
+        except Exception:
+            continue
+        yield player_id, date_obj, row.get("Game ID", ""), row
+
+
+def estimate_sample_count(rows, min_minutes, min_games):
+    """Samples a dataset build keeps from ``rows`` (player_id, date, game_id, row).
+
+    Counts the rows with enough minutes that follow at least ``min_games``
+    earlier rows of the same player, which is exact for rows sorted by
+    player and date.
+    """
+    games = {}
+    count = 0
+    for player_id, _date, _game_id, row in rows:
+        if not player_id:
+            continue
+        played = games.get(player_id, 0)
+        if played >= min_games and _to_float(row.get("MIN", 0)) >= min_minutes:
+            count += 1
+        games[player_id] = played + 1
+    return count
+
+
+class PreGameFeatures:
+    """Per-player running totals that give features from earlier games only.
+
+    Call ``features`` before ``update`` for a game so its own box score never
+    leaks into the features used to predict it.
+    """
+
+    def __init__(self, rolling=None):
+        self.totals_by_player = {}
+        self.games_by_player = {}
+        self.rolling = rolling
+        if rolling is not None:
+            rolling.reset()
+
+    def header(self):
+        if self.rolling is None:
+            return list(ML_FEATURE_FIELDS)
+        return ML_FEATURE_FIELDS + self.rolling.header()
+
+    def games_played(self, player_id):
+        return self.games_by_player.get(player_id, 0)
+
+    def features(self, player_id):
+        games_played = self.games_played(player_id)
+        totals = self.totals_by_player.get(player_id)
+        if totals is None:
+            averages = [0.0] * len(PLAYER_STATS_FIELDS)
+        else:
+            averages = [
+                _safe_div(totals[field], games_played) for field in PLAYER_STATS_FIELDS
+            ]
+        feature_row = [games_played] + averages
+        if self.rolling is not None:
+            feature_row += self.rolling.features(player_id)
+        return feature_row
+
+    def update(self, player_id, row):
+        totals = self.totals_by_player.setdefault(
+            player_id, {field: 0.0 for field in PLAYER_STATS_FIELDS}
+        )
+        for field in PLAYER_STATS_FIELDS:
+            totals[field] += _to_float(row.get(field, 0))
+        self.games_by_player[player_id] = self.games_played(player_id) + 1
+        if self.rolling is not None:
+            self.rolling.update(player_id, rolling_row_values(row))
+
+    def to_state(self):
+        return {
+            "players": {
+                player_id: [games, *(self.totals_by_player[player_id][field] for field in PLAYER_STATS_FIELDS)]
+                for player_id, games in self.games_by_player.items()
+            },
+            "rolling": self.rolling.to_state() if self.rolling is not None else None,
+        }
+
+    def load_state(self, state):
+        """Restore saved totals; returns False if the rolling config does not match."""
+        saved_rolling = state.get("rolling")
+        if self.rolling is None:
+            if saved_rolling is not None:
+                return False
+        elif not self.rolling.load_state(saved_rolling):
+            return False
+        self.totals_by_player = {}
+        self.games_by_player = {}
+        for player_id, values in state["players"].items():
+            self.games_by_player[player_id] = values[0]
+            self.totals_by_player[player_id] = dict(zip(PLAYER_STATS_FIELDS, values[1:]))
+        return True
+
+
+def samples_for_target(samples, target):
+    """Single-target samples, as build_player_pts_dataset returns, from multi-target ones."""
+    return [
+        {
+            "date": sample["date"],
+            "meta": sample["meta"],
+            "features": sample["features"],
+            "target": sample["targets"][target],
+        }
+        for sample in samples
+    ]
+
+
+def _write_pts_samples(writer, rows, pregame, min_minutes, min_games, store=None, samples=None):
+    """Write dataset rows for sorted (player_id, date, game_id, row) tuples.
+
+    Samples go to ``store`` or the ``samples`` list. Returns (rows written,
+    day number of the newest row read, or None if there were none).
+    """
+    written = 0
+    last_day = None
+    for player_id, date_obj, _game_id, row in rows:
+        day = date_obj.toordinal()
+        if last_day is None or day > last_day:
+            last_day = day
+        minutes = _to_float(row.get("MIN", 0))
+        if pregame.games_played(player_id) >= min_games and minutes >= min_minutes:
+            feature_row = pregame.features(player_id)
+            target_pts = _to_float(row.get("PTS", 0))
+            dataset_row = [
+                row.get("Date", ""),
+                row.get("Game ID", ""),
+                row.get("Player ID", ""),
+                row.get("Player Name", ""),
+                row.get("TEAM ID", ""),
+                row.get("Team Name", ""),
+                target_pts,
+                *feature_row,
+            ]
+            writer.writerow(dataset_row)
+            written += 1
+            if store is not None:
+                store.append(day, dataset_row[:6], feature_row, (target_pts,), aux=(minutes,))
+            else:
+                samples.append(
+                    {
+                        "date": date_obj,
+                        "meta": dataset_row[:7],
+                        "features": feature_row,
+                        "target": target_pts,
+                    }
+                )
+        pregame.update(player_id, row)
+    return written, last_day
+
+
 def build_player_pts_dataset(
     player_stats_file,
     output_file,
     min_minutes=5,
     min_games=3,
+    rolling=None,
+    sort_buffer_rows=None,
+    as_arrays=False,
+    samples_file=None,
+    incremental=False,
 ):
+    """Write one leakage-safe row per player game: features use only earlier games.
+
+    ``rolling`` is an optional rolling_features.RollingFeatureSet whose
+    last-N-game and EWMA columns are appended to the features.
+    ``sort_buffer_rows`` streams the stats through a bounded-memory external
+    sort instead of sorting every row in memory.
+
+    Returns a list of sample dicts, or with ``as_arrays`` a numpy
+    sample_store.SampleStore (saved to ``samples_file`` as .npz if given).
+    With ``incremental`` (requires ``as_arrays``) the store and the
+    per-player running totals are saved next to the dataset, and later runs
+    read only the stats appended since, adding samples for days after the
+    newest one already stored. A rewritten stats file, a changed dataset
+    file or a game on or before that day triggers a full rebuild.
+    """
     stats_path = Path(player_stats_file)
     if not stats_path.exists() or stats_path.stat().st_size == 0:
         print(f"No player stats found at {player_stats_file}")
-        return []
+        return None if as_arrays else []
 
-    rows = []
-    with stats_path.open("r", newline="", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            date_text = row.get("Date", "")
-            player_id = row.get("Player ID", "")
-            if not date_text or not player_id:
-                continue
-            try:
-                date_obj = datetime.strptime(date_text, "%m/%d/%y").date()
-            except Exception:
-                continue
-            rows.append((player_id, date_obj, row.get("Game ID", ""), row))
-
-    rows.sort(key=lambda item: (item[0], item[1], item[2]))
+    state_path = dataset_state_path(output_file)
+    if incremental and as_arrays:
+        samples_file = samples_file or dataset_samples_path(output_file)
+        store, reason = _update_pts_dataset(
+            stats_path, output_file, samples_file, min_minutes, min_games, rolling
+        )
+        if reason is None:
+            return store
+        print(f"Rebuilding the points dataset: {reason}")
+    elif state_path.exists():
+        state_path.unlink()
 
     output_path = Path(output_file)
     if output_path.exists():
         output_path.unlink()
 
+    # Taken before reading, as for feature_builder's incremental state.
+    source_size = stats_path.stat().st_size
     samples = []
-    with open(output_file, "w", newline="", encoding="utf-8") as out_file:
-        writer = csv.writer(out_file)
-        writer.writerow(ML_DATASET_HEADER)
+    with stats_path.open("r", newline="", encoding="utf-8") as file, open(
+        output_file, "w", newline="", encoding="utf-8"
+    ) as out_file:
+        rows = _iter_dataset_input_rows(csv.DictReader(file))
+        if sort_buffer_rows:
+            rows = external_sort(rows, key=_sort_key, buffer_rows=sort_buffer_rows)
+        else:
+            rows = sorted(rows, key=_sort_key)
 
-        totals_by_player = {}
-        games_by_player = {}
+        writer = csv.writer(out_file)
+        pregame = PreGameFeatures(rolling)
+        writer.writerow(ML_DATASET_HEADER[:7] + pregame.header())
+        store = None
+        if as_arrays:
+            import numpy as np
 
-        for player_id, _date, _game_id, row in rows:
-            totals = totals_by_player.setdefault(
-                player_id, {field: 0.0 for field in PLAYER_STATS_FIELDS}
-            )
-            games_played = games_by_player.get(player_id, 0)
-
-            minutes = _to_float(row.get("MIN", 0))
-            if games_played >= min_games and minutes >= min_minutes:
-                averages = [
-                    _safe_div(totals[field], games_played)
-                    for field in PLAYER_STATS_FIELDS
-                ]
-                feature_row = [games_played] + averages
-                target_pts = _to_float(row.get("PTS", 0))
-                dataset_row = [
-                    row.get("Date", ""),
-                    row.get("Game ID", ""),
-                    row.get("Player ID", ""),
-                    row.get("Player Name", ""),
-                    row.get("TEAM ID", ""),
-                    row.get("Team Name", ""),
-                    target_pts,
-                    *feature_row,
-                ]
-                writer.writerow(dataset_row)
-                samples.append(
-                    {
-                        "date": _date,
-                        "meta": dataset_row[:7],
-                        "features": feature_row,
-                        "target": target_pts,
-                    }
-                )
+            # A sorted list gives the sample count up front; a streamed sort grows as needed.
+            if isinstance(rows, list):
+                capacity = estimate_sample_count(rows, min_minutes, min_games)
+            else:
+                capacity = DEFAULT_CAPACITY
+            # MIN rides along as an aux column so callers can re-apply a stricter min_minutes.
+            store = SampleStore(np, pregame.header(), ["PTS"], capacity=capacity, aux_names=["MIN"])
 
-            for field in PLAYER_STATS_FIELDS:
-                totals[field] += _to_float(row.get(field, 0))
-            games_by_player[player_id] = games_played + 1
+        _written, last_day = _write_pts_samples(
+            writer, rows, pregame, min_minutes, min_games, store=store, samples=samples
+        )
 
+    if store is not None:
+        store.finish()
+        print(f"Wrote {len(store)} ML rows to {output_file}")
+        if samples_file:
+            store.save(samples_file)
+            print(f"Saved sample arrays to {samples_file}")
+        if incremental:
+            _save_dataset_state(
+                output_file, stats_path, source_size, min_minutes, min_games, len(store), last_day, pregame
+            )
+        return store
     print(f"Wrote {len(samples)} ML rows to {output_file}")
     return samples
 
 
+DATASET_STATE_VERSION = 1
+
+
+def dataset_state_path(dataset_file):
+    return Path(f"{dataset_file}.state.json")
+
+
+def dataset_samples_path(dataset_file):
+    return Path(f"{dataset_file}.samples.npz")
+
+
+def _save_dataset_state(
+    output_file, stats_path, source_size, min_minutes, min_games, sample_count, last_day, pregame
+):
+    state = {
+        "version": DATASET_STATE_VERSION,
+        "min_minutes": min_minutes,
+        "min_games": min_games,
+        "source": {"size": source_size, "crc": file_prefix_crc(stats_path, source_size)},
+        "output_size": Path(output_file).stat().st_size,
+        "samples": sample_count,
+        "last_day": last_day,
+        "pregame": pregame.to_state(),
+    }
+    state_path = dataset_state_path(output_file)
+    temp_path = state_path.with_name(state_path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(state, file)
+    temp_path.replace(state_path)
+
+
+def _update_pts_dataset(stats_path, output_file, samples_file, min_minutes, min_games, rolling=None):
+    """Add samples for stats rows appended since the saved state.
+
+    Returns (store, None), or (None, reason) when a full rebuild is needed.
+    """
+    import numpy as np
+
+    state_path = dataset_state_path(output_file)
+    try:
+        with state_path.open("r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None, "no saved dataset state"
+    if state.get("version") != DATASET_STATE_VERSION:
+        return None, "no saved dataset state"
+    if state.get("min_minutes") != min_minutes or state.get("min_games") != min_games:
+        return None, "dataset parameters changed"
+    pregame = PreGameFeatures(rolling)
+    if not pregame.load_state(state["pregame"]):
+        return None, "rolling features changed"
+    output_path = Path(output_file)
+    if not output_path.exists() or output_path.stat().st_size != state["output_size"]:
+        return None, "dataset file changed since the last build"
+    try:
+        store = SampleStore.load(np, samples_file)
+    except (OSError, ValueError, KeyError):
+        return None, "no saved sample arrays"
+    if len(store) != state["samples"] or store.feature_names != pregame.header():
+        return None, "sample arrays changed since the last build"
+
+    source = state["source"]
+    size = stats_path.stat().st_size
+    if size < source["size"] or file_prefix_crc(stats_path, source["size"]) != source["crc"]:
+        return None, "player stats file was rewritten"
+    if size == source["size"]:
+        print(f"No new stats rows; {len(store)} ML rows in {output_file}")
+        return store, None
+
+    with stats_path.open("r", newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    with stats_path.open("rb") as file:
+        file.seek(source["size"])
+        new_text = file.read(size - source["size"]).decode("utf-8")
+    reader = csv.DictReader(io.StringIO(new_text, newline=""), fieldnames=header)
+    rows = sorted(_iter_dataset_input_rows(reader), key=_sort_key)
+    last_day = state["last_day"]
+    for _player_id, date_obj, game_id, _row in rows:
+        if last_day is not None and date_obj.toordinal() <= last_day:
+            return None, f"game {game_id} on {date_obj} is not after the last dataset day"
+
+    new_store = SampleStore(np, store.feature_names, ["PTS"], capacity=len(rows), aux_names=["MIN"])
+    with open(output_file, "a", newline="", encoding="utf-8") as out_file:
+        written, new_last_day = _write_pts_samples(
+            csv.writer(out_file), rows, pregame, min_minutes, min_games, store=new_store
+        )
+    store.extend(new_store.finish())
+    store.save(samples_file)
+    _save_dataset_state(
+        output_file,
+        stats_path,
+        size,
+        min_minutes,
+        min_games,
+        len(store),
+        new_last_day if new_last_day is not None else last_day,
+        pregame,
+    )
+    print(f"Appended {written} ML rows to {output_file} ({len(store)} in all)")
+    return store, None
+
+
+def model_stats_path(model_file):
+    return Path(f"{model_file}.stats.npz")
+
+
+def _save_pts_model_stats(np, store, train_idx, stats_file, stats_params, stats=None):
+    """Save sums for the training days before the newest one.
+
+    The newest training day can be split by the train/test cut, so it is
+    added at fit time but only saved once a later day closes it.
+    """
+    days = store.days[train_idx]
+    boundary_day = int(days.max())
+    if stats is None:
+        stats = RidgeSufficientStats(np, store.features.shape[1])
+        closed = train_idx[days < boundary_day]
+        weights = None
+        if stats_params["recency_half_life_days"]:
+            weights = recency_weights(
+                np, store.days[closed], stats_params["recency_half_life_days"], boundary_day
+            )
+        stats.add(store.features[closed], store.target("PTS")[closed], weights)
+    stats.save(stats_file, {**stats_params, "boundary_day": boundary_day})
+    return stats
+
+
+def _pipeline_from_stats(np, stats, alpha=1.0):
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    mean, var, scale, coef, intercept = stats.solve(alpha)
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = scale
+    scaler.n_samples_seen_ = stats.count
+    scaler.n_features_in_ = len(mean)
+    ridge = Ridge(alpha=alpha)
+    ridge.coef_ = coef
+    ridge.intercept_ = intercept
+    ridge.n_features_in_ = len(coef)
+    return Pipeline([("scaler", scaler), ("ridge", ridge)])
+
+
+def _update_pts_model(np, store, train_idx, stats_file, stats_params):
+    """Fold new training days into the saved sums; returns (model, None) or (None, reason)."""
+    stats, meta = RidgeSufficientStats.load(np, stats_file)
+    if stats is None:
+        return None, "no saved model statistics"
+    if {key: meta.get(key) for key in stats_params} != stats_params:
+        return None, "dataset or weighting parameters changed"
+
+    days = store.days[train_idx]
+    old_boundary = meta["boundary_day"]
+    boundary_day = int(days.max())
+    if boundary_day < old_boundary:
+        return None, "training data ends before the saved statistics"
+    seen = train_idx[days < old_boundary]
+    if len(seen) != stats.count:
+        return None, "training samples before the last update changed"
+    if not np.allclose(store.features[seen].sum(axis=0), stats.sum_x, rtol=1e-9, atol=1e-6):
+        return None, "training samples before the last update changed"
+
+    targets = store.target("PTS")
+    half_life = stats_params["recency_half_life_days"]
+
+    def weights_for(indices):
+        if not half_life:
+            return None
+        return recency_weights(np, store.days[indices], half_life, boundary_day)
+
+    if half_life:
+        stats.decay(0.5 ** ((boundary_day - old_boundary) / half_life))
+    closed = train_idx[(days >= old_boundary) & (days < boundary_day)]
+    stats.add(store.features[closed], targets[closed], weights_for(closed))
+    _save_pts_model_stats(np, store, train_idx, stats_file, stats_params, stats)
+
+    newest = train_idx[days == boundary_day]
+    fit_stats = stats.copy()
+    fit_stats.add(store.features[newest], targets[newest], weights_for(newest))
+    return _pipeline_from_stats(np, fit_stats), None
+
+
 def train_player_pts_model(
     player_stats_file,
     dataset_file,
@@ -119,7 +488,28 @@ def train_player_pts_model(
     min_games=3,
     test_ratio=0.2,
     recency_half_life_days=365,
+    rolling=None,
+    sort_buffer_rows=None,
+    samples_file=None,
+    incremental=False,
+    store=None,
 ):
+    """Fit the StandardScaler + Ridge points model and report test metrics.
+
+    ``store`` is a SampleStore with a PTS target that was already built,
+    e.g. by feature_builder.build_player_datasets, or the path it was saved
+    to; the stats file is then not read and no dataset file is written.
+
+    With ``incremental`` the dataset is updated in place from the stats
+    rows appended since the last run (its sample arrays go to
+    ``samples_file``, by default ``<dataset_file>.samples.npz``) and the
+    training sums are kept next to the model (``<model_file>.stats.npz``);
+    later runs fold in only the samples from days not seen before,
+    re-solving the closed form instead of refitting. Changed earlier
+    samples or parameters trigger a full rebuild and refit.
+    The fitted parameters are also written to ``<model_file>.scorer.json``
+    for the NumPy-only PointsScorer.
+    """
     try:
         from sklearn.pipeline import Pipeline
         from sklearn.preprocessing import StandardScaler
@@ -130,78 +520,100 @@ def train_player_pts_model(
         print("scikit-learn is required. Run: python -m pip install scikit-learn")
         return None
 
-    samples = build_player_pts_dataset(
-        player_stats_file,
-        dataset_file,
-        min_minutes=min_minutes,
-        min_games=min_games,
-    )
-    if not samples:
-        return None
+    import numpy as np
 
-    samples.sort(key=lambda item: item["date"])
-    total = len(samples)
-    split_idx = int(total * (1 - test_ratio))
-    split_idx = max(1, min(split_idx, total - 1))
-
-    train_samples = samples[:split_idx]
-    test_samples = samples[split_idx:]
-
-    x_train = [s["features"] for s in train_samples]
-    y_train = [s["target"] for s in train_samples]
-    x_test = [s["features"] for s in test_samples]
-    y_test = [s["target"] for s in test_samples]
-
-    sample_weights = None
-    if recency_half_life_days and recency_half_life_days > 0:
-        max_date = max(s["date"] for s in train_samples)
-        sample_weights = [
-            0.5 ** ((max_date - s["date"]).days / recency_half_life_days)
-            for s in train_samples
-        ]
-        print(
-            "Using recency weighting with half-life "
-            f"{recency_half_life_days} days."
+    if store is None:
+        store = build_player_pts_dataset(
+            player_stats_file,
+            dataset_file,
+            min_minutes=min_minutes,
+            min_games=min_games,
+            rolling=rolling,
+            sort_buffer_rows=sort_buffer_rows,
+            as_arrays=True,
+            samples_file=samples_file,
+            incremental=incremental,
         )
+    elif not isinstance(store, SampleStore):
+        try:
+            store = SampleStore.load(np, store)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Could not load training samples from {store}: {exc}")
+            return None
+    if store is None or len(store) < 2:
+        return None
 
-    model = Pipeline(
-        [
-            ("scaler", StandardScaler()),
-            ("ridge", Ridge(alpha=1.0)),
-        ]
-    )
-    if sample_weights is None:
-        model.fit(x_train, y_train)
-    else:
-        model.fit(x_train, y_train, ridge__sample_weight=sample_weights)
+    train_idx, test_idx = time_split(np, store.days, test_ratio)
+    targets = store.target("PTS")
+    x_train = store.features[train_idx]
+    y_train = targets[train_idx]
+    x_test = store.features[test_idx]
+    y_test = targets[test_idx]
+
+    half_life = recency_half_life_days if recency_half_life_days and recency_half_life_days > 0 else None
+    stats_file = model_stats_path(model_file)
+    stats_params = {
+        "min_minutes": min_minutes,
+        "min_games": min_games,
+        "recency_half_life_days": half_life,
+        "feature_names": store.feature_names,
+    }
+    model = None
+    if incremental:
+        started = time.perf_counter()
+        model, reason = _update_pts_model(np, store, train_idx, stats_file, stats_params)
+        if model is None:
+            print(f"Refitting points model from scratch: {reason}")
+        else:
+            print(f"Updated points model in {(time.perf_counter() - started) * 1000:.1f} ms.")
+
+    if model is None:
+        sample_weights = None
+        if half_life:
+            sample_weights = recency_weights(np, store.days[train_idx], half_life)
+            print(
+                "Using recency weighting with half-life "
+                f"{recency_half_life_days} days."
+            )
+
+        model = Pipeline(
+            [
+                ("scaler", StandardScaler()),
+                ("ridge", Ridge(alpha=1.0)),
+            ]
+        )
+        if sample_weights is None:
+            model.fit(x_train, y_train)
+        else:
+            model.fit(x_train, y_train, ridge__sample_weight=sample_weights)
+        if incremental:
+            _save_pts_model_stats(np, store, train_idx, stats_file, stats_params)
     preds = model.predict(x_test)
 
     mae = mean_absolute_error(y_test, preds)
-    rmse = mean_squared_error(y_test, preds, squared=False)
+    rmse = float(np.sqrt(mean_squared_error(y_test, preds)))
     r2 = r2_score(y_test, preds)
 
     joblib.dump(model, model_file)
     print(f"Saved model to {model_file}")
+    artifact_file = model_artifact_path(model_file)
+    save_model_artifact(model, store.feature_names, artifact_file)
+    print(f"Saved scorer artifact to {artifact_file}")
     print(
         f"Test metrics: MAE {mae:.2f}, RMSE {rmse:.2f}, R2 {r2:.3f} "
         f"(test samples {len(y_test)})"
     )
 
-    yearly_actuals = {}
-    yearly_preds = {}
-    for sample, pred in zip(test_samples, preds):
-        year = sample["date"].year
-        yearly_actuals.setdefault(year, []).append(sample["target"])
-        yearly_preds.setdefault(year, []).append(pred)
-    if len(yearly_actuals) > 1:
+    test_years = store.years()[test_idx]
+    years = np.unique(test_years)
+    if len(years) > 1:
         print("Test metrics by year:")
-        for year in sorted(yearly_actuals):
-            year_actuals = yearly_actuals[year]
-            year_preds = yearly_preds[year]
+        for year in years.tolist():
+            mask = test_years == year
+            year_actuals = y_test[mask]
+            year_preds = preds[mask]
             year_mae = mean_absolute_error(year_actuals, year_preds)
-            year_rmse = mean_squared_error(
-                year_actuals, year_preds, squared=False
-            )
+            year_rmse = float(np.sqrt(mean_squared_error(year_actuals, year_preds)))
             year_r2 = r2_score(year_actuals, year_preds)
             print(
                 f"  {year}: MAE {year_mae:.2f}, RMSE {year_rmse:.2f}, R2 {year_r2:.3f} "
@@ -223,11 +635,15 @@ def train_player_pts_model(
                 "Error",
             ]
         )
-        for sample, pred in zip(test_samples, preds):
-            meta = sample["meta"]
-            actual = sample["target"]
-            error = pred - actual
-            writer.writerow([*meta[:6], actual, pred, error])
+        writer.writerows(
+            (*meta, actual, pred, error)
+            for meta, actual, pred, error in zip(
+                store.meta_rows(test_idx),
+                y_test.tolist(),
+                preds.tolist(),
+                (preds - y_test).tolist(),
+            )
+        )
 
     print(f"Wrote predictions to {predictions_file}")
     return {"mae": mae, "rmse": rmse, "r2": r2, "test_samples": len(y_test)}
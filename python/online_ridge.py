@@ -0,0 +1,95 @@
+import json
+
+
+STATS_VERSION = 1
+
+WEIGHTED_FIELDS = ["weight", "wsum_x", "wsum_y", "wsum_xx", "wsum_xy"]
+STAT_FIELDS = ["count", "sum_x", "sum_xx"] + WEIGHTED_FIELDS
+
+
+class RidgeSufficientStats:
+    """Running sums that determine a StandardScaler + weighted Ridge fit.
+
+    The scaler moments are unweighted, as Pipeline.fit passes no sample
+    weights to StandardScaler; the Ridge sums carry the sample weights. New
+    samples are folded in with ``add`` and ``solve`` re-derives the fit from
+    the sums, so an update costs O(new samples) plus one d x d solve.
+    """
+
+    def __init__(self, np, n_features):
+        self.np = np
+        self.count = 0
+        self.sum_x = np.zeros(n_features)
+        self.sum_xx = np.zeros((n_features, n_features))
+        self.weight = 0.0
+        self.wsum_x = np.zeros(n_features)
+        self.wsum_y = 0.0
+        self.wsum_xx = np.zeros((n_features, n_features))
+        self.wsum_xy = np.zeros(n_features)
+
+    def copy(self):
+        other = RidgeSufficientStats(self.np, len(self.sum_x))
+        for field in STAT_FIELDS:
+            value = getattr(self, field)
+            setattr(other, field, value.copy() if hasattr(value, "copy") else value)
+        return other
+
+    def add(self, x, y, weights=None):
+        np = self.np
+        if weights is None:
+            weights = np.ones(len(x))
+        weighted_x = x * weights[:, None]
+        self.count += len(x)
+        self.sum_x += x.sum(axis=0)
+        self.sum_xx += x.T @ x
+        self.weight += float(weights.sum())
+        self.wsum_x += weighted_x.sum(axis=0)
+        self.wsum_y += float(weights @ y)
+        self.wsum_xx += weighted_x.T @ x
+        self.wsum_xy += weighted_x.T @ y
+
+    def decay(self, factor):
+        """Scale every weight seen so far, e.g. when the recency reference date moves."""
+        for field in WEIGHTED_FIELDS:
+            setattr(self, field, getattr(self, field) * factor)
+
+    def solve(self, alpha=1.0):
+        """Return (mean, var, scale, coef, intercept) in StandardScaler/Ridge terms."""
+        np = self.np
+        mean = self.sum_x / self.count
+        var = np.maximum(np.diag(self.sum_xx) / self.count - mean**2, 0.0)
+        scale = np.sqrt(var)
+        # StandardScaler leaves constant features unscaled.
+        scale[scale <= np.finfo(np.float64).eps * np.maximum(np.abs(mean), 1.0)] = 1.0
+
+        x_bar = self.wsum_x / self.weight
+        y_bar = self.wsum_y / self.weight
+        cov_xx = self.wsum_xx - self.weight * np.outer(x_bar, x_bar)
+        cov_xy = self.wsum_xy - self.weight * x_bar * y_bar
+        cov_zz = cov_xx / np.outer(scale, scale)
+        cov_zy = cov_xy / scale
+        coef = np.linalg.solve(cov_zz + alpha * np.eye(len(scale)), cov_zy)
+        intercept = y_bar - ((x_bar - mean) / scale) @ coef
+        return mean, var, scale, coef, float(intercept)
+
+    def save(self, path, meta):
+        arrays = {field: self.np.asarray(getattr(self, field)) for field in STAT_FIELDS}
+        arrays["meta"] = self.np.array(json.dumps({"version": STATS_VERSION, **meta}))
+        with open(path, "wb") as file:
+            self.np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, np, path):
+        """(stats, meta) from ``save``, or (None, None) if missing or another version."""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != STATS_VERSION:
+                    return None, None
+                stats = cls(np, len(data["sum_x"]))
+                for field in STAT_FIELDS:
+                    value = data[field]
+                    setattr(stats, field, value.item() if value.ndim == 0 else value.copy())
+        except (OSError, KeyError, ValueError):
+            return None, None
+        return stats, meta
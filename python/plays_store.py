@@ -0,0 +1,238 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import sys
+from pathlib import Path
+
+from game_information import PLAYS_HEADER
+
+
+PLAYS_INDEX_HEADER = ["Game ID", "Offset", "Length", "Row Start", "Row Count", "Codec"]
+
+DEFAULT_CODEC = "gzip"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        print("zstandard is required for zstd blocks. Run: python -m pip install zstandard")
+        raise
+    return zstandard
+
+
+def _compress(payload, codec):
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=10).compress(payload)
+    return gzip.compress(payload, compresslevel=6, mtime=0)
+
+
+def _decompress(payload, codec):
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompress(payload)
+    return gzip.decompress(payload)
+
+
+def index_path_for(archive_file):
+    return Path(f"{archive_file}.idx")
+
+
+class PlaysArchive:
+    """Plays stored as one compressed CSV block per game plus a game_id index.
+
+    The index maps each game_id to the byte offset and length of its block and
+    to its row range, so ``read_plays`` seeks straight to one block. Only a
+    ``writer`` archive may append, and only a writer repairs the file.
+    """
+
+    def __init__(self, archive_file, codec=DEFAULT_CODEC, writer=False):
+        self.archive_path = Path(archive_file)
+        self.index_path = index_path_for(archive_file)
+        self.codec = codec
+        self.writer = writer
+        self.index = {}
+        self.total_rows = 0
+        self.archive_handle = None
+        self.index_handle = None
+        self.index_writer = None
+        self._load_index()
+
+    def _load_index(self):
+        end_offset = 0
+        index_end = 0
+        data = b""
+        if self.index_path.exists():
+            data = self.index_path.read_bytes()
+        position = 0
+        for line in data.splitlines(keepends=True):
+            position += len(line)
+            if not line.endswith(b"\n"):
+                # Torn last row from a crash mid-append: not indexed, and a
+                # writer cuts it off (with its block, below) before appending.
+                break
+            index_end = position
+            row = next(csv.reader([line.decode("utf-8")]), [])
+            if row == PLAYS_INDEX_HEADER or len(row) < len(PLAYS_INDEX_HEADER):
+                continue
+            game_id, offset, length, row_start, row_count, codec = row[:6]
+            try:
+                entry = (int(offset), int(length), int(row_start), int(row_count), codec)
+            except ValueError:
+                continue
+            self.index[game_id] = entry
+            end_offset = max(end_offset, entry[0] + entry[1])
+            self.total_rows = max(self.total_rows, entry[2] + entry[3])
+
+        if self.writer and len(data) > index_end:
+            with self.index_path.open("r+b") as file:
+                file.truncate(index_end)
+        # A block written without its index row (interrupted run) is dropped
+        # before appending; readers never see it, since nothing indexes it.
+        if self.writer and self.archive_path.exists() and self.archive_path.stat().st_size > end_offset:
+            with self.archive_path.open("r+b") as file:
+                file.truncate(end_offset)
+
+    def game_ids(self):
+        return set(self.index)
+
+    def __contains__(self, game_id):
+        return str(game_id) in self.index
+
+    def _open_for_append(self):
+        if self.archive_handle is not None:
+            return
+        if not self.writer:
+            raise ValueError(f"{self.archive_path} was opened read-only; pass writer=True to append")
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self.archive_handle = self.archive_path.open("ab")
+        write_header = not self.index_path.exists() or self.index_path.stat().st_size == 0
+        self.index_handle = self.index_path.open("a", newline="", encoding="utf-8")
+        self.index_writer = csv.writer(self.index_handle)
+        if write_header:
+            self.index_writer.writerow(PLAYS_INDEX_HEADER)
+
+    def append_game(self, game_id, rows):
+        game_id = str(game_id)
+        if not rows or game_id in self.index:
+            return 0
+        self._open_for_append()
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        block = _compress(buffer.getvalue().encode("utf-8"), self.codec)
+
+        offset = self.archive_handle.tell()
+        self.archive_handle.write(block)
+        self.archive_handle.flush()
+        entry = (offset, len(block), self.total_rows, len(rows), self.codec)
+        self.index_writer.writerow([game_id, *entry])
+        self.index_handle.flush()
+
+        self.index[game_id] = entry
+        self.total_rows += len(rows)
+        return len(rows)
+
+    def _read_block(self, file, entry):
+        offset, length, _row_start, _row_count, codec = entry
+        file.seek(offset)
+        payload = _decompress(file.read(length), codec)
+        return list(csv.reader(io.StringIO(payload.decode("utf-8"))))
+
+    def read_plays(self, game_id):
+        entry = self.index.get(str(game_id))
+        if entry is None or not self.archive_path.exists():
+            return []
+        if self.archive_handle is not None:
+            self.archive_handle.flush()
+        with self.archive_path.open("rb") as file:
+            return self._read_block(file, entry)
+
+    def iter_plays(self):
+        """Stream every play row in archive order, one block in memory at a time."""
+        if not self.archive_path.exists():
+            return
+        if self.archive_handle is not None:
+            self.archive_handle.flush()
+        entries = sorted(self.index.values())
+        with self.archive_path.open("rb") as file:
+            for entry in entries:
+                yield from self._read_block(file, entry)
+
+    def flush(self, fsync=False):
+        for handle in (self.archive_handle, self.index_handle):
+            if handle is None:
+                continue
+            handle.flush()
+            if fsync:
+                os.fsync(handle.fileno())
+
+    def close(self):
+        self.flush()
+        for handle in (self.archive_handle, self.index_handle):
+            if handle is not None:
+                handle.close()
+        self.archive_handle = None
+        self.index_handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def read_plays(archive_file, game_id):
+    return PlaysArchive(archive_file).read_plays(game_id)
+
+
+def convert_plays_csv(plays_file, archive_file, codec=DEFAULT_CODEC):
+    """Pack an existing plays CSV into the archive, one block per game."""
+    plays_path = Path(plays_file)
+    if not plays_path.exists() or plays_path.stat().st_size == 0:
+        print(f"No plays found at {plays_file}")
+        return 0
+
+    games = {}
+    with plays_path.open("r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        for row in reader:
+            if row == PLAYS_HEADER or not row:
+                continue
+            games.setdefault(row[0], []).append(row)
+
+    written = 0
+    with PlaysArchive(archive_file, codec=codec, writer=True) as archive:
+        for game_id, rows in games.items():
+            written += archive.append_game(game_id, rows)
+
+    print(f"Archived {written} plays from {len(games)} games to {archive_file}")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed per-game plays archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Pack a plays CSV into an archive.")
+    convert_parser.add_argument("plays_file")
+    convert_parser.add_argument("archive_file")
+    convert_parser.add_argument("--codec", choices=["gzip", "zstd"], default=DEFAULT_CODEC)
+
+    show_parser = subparsers.add_parser("show", help="Print the plays for one game as CSV.")
+    show_parser.add_argument("archive_file")
+    show_parser.add_argument("game_id")
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        convert_plays_csv(args.plays_file, args.archive_file, codec=args.codec)
+    elif args.command == "show":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(PLAYS_HEADER)
+        writer.writerows(read_plays(args.archive_file, args.game_id))
+
+
+if __name__ == "__main__":
+    main()
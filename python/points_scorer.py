@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+
+ARTIFACT_VERSION = 1
+
+
+def model_artifact_path(model_file):
+    return Path(f"{model_file}.scorer.json")
+
+
+def save_model_artifact(model, feature_names, path, target="PTS"):
+    """Write a fitted StandardScaler + Ridge pipeline's parameters as JSON.
+
+    Floats are written by json's repr, so they load back bit for bit.
+    """
+    scaler = model.named_steps["scaler"]
+    ridge = model.named_steps["ridge"]
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "target": target,
+        "feature_names": list(feature_names),
+        "mean": [float(value) for value in scaler.mean_],
+        "scale": [float(value) for value in scaler.scale_],
+        "coef": [float(value) for value in ridge.coef_],
+        "intercept": float(ridge.intercept_),
+    }
+    path = Path(path)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(artifact, file)
+    temp_path.replace(path)
+
+
+class PointsScorer:
+    """NumPy-only scorer for an artifact written by ``save_model_artifact``.
+
+    The scaler is folded into the coefficients at load time, so ``predict``
+    is one matrix-vector product: x @ (coef / scale) + (intercept - mean . coef / scale).
+    """
+
+    def __init__(self, np, feature_names, mean, scale, coef, intercept, target="PTS"):
+        self.np = np
+        self.feature_names = list(feature_names)
+        self.target = target
+        scale = np.asarray(scale, dtype=np.float64)
+        self.weights = np.asarray(coef, dtype=np.float64) / scale
+        self.bias = float(intercept) - float(np.asarray(mean, dtype=np.float64) @ self.weights)
+
+    @property
+    def n_features_in_(self):
+        return len(self.feature_names)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            import numpy as np
+        except ImportError:
+            print("numpy is required for scoring. Run: python -m pip install numpy")
+            raise
+        with open(path, "r", encoding="utf-8") as file:
+            artifact = json.load(file)
+        if artifact.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"{path} is scorer artifact version {artifact.get('version')}, expected {ARTIFACT_VERSION}")
+        return cls.from_params(np, artifact["feature_names"], artifact, target=artifact.get("target", "PTS"))
+
+    @classmethod
+    def from_params(cls, np, feature_names, params, target="PTS"):
+        """Scorer from a dict holding "mean", "scale", "coef" and "intercept"."""
+        return cls(
+            np,
+            feature_names,
+            params["mean"],
+            params["scale"],
+            params["coef"],
+            params["intercept"],
+            target=target,
+        )
+
+    def predict(self, features):
+        return self.np.asarray(features, dtype=self.np.float64) @ self.weights + self.bias
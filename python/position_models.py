@@ -0,0 +1,320 @@
+import argparse
+import csv
+import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from feature_builder import DATASET_TARGETS, build_player_datasets
+from online_ridge import RidgeSufficientStats
+from points_scorer import ARTIFACT_VERSION, PointsScorer
+from sample_store import recency_weights, time_split
+
+
+# Fantasy lineup slot groups (fantasy_lineups C/F/G columns); ALL is the
+# fallback model for players without a usable position.
+POSITION_GROUPS = ["C", "F", "G"]
+ALL_POSITIONS = "ALL"
+MODEL_GROUPS = [ALL_POSITIONS] + POSITION_GROUPS
+
+# Position models need this many training samples; the ALL model is fit at
+# any size so every target has a fallback.
+MIN_MODEL_SAMPLES = 200
+
+ARRAY_NAMES = ["features", "targets", "days", "groups", "is_train"]
+
+# Loaded once per worker process by _init_worker.
+_ARRAYS = {}
+
+
+def normalize_position(value):
+    """"C", "F" or "G" for a roster position name or abbreviation, else ""."""
+    normalized = str(value or "").strip().lower()
+    if normalized in ("c", "center", "centers"):
+        return "C"
+    if normalized in ("f", "forward", "forwards"):
+        return "F"
+    if normalized in ("g", "guard", "guards"):
+        return "G"
+    return ""
+
+
+def load_player_positions(roster_file):
+    """Player ID -> position group from a roster CSV (team_roster.ROSTER_HEADER)."""
+    positions = {}
+    roster_path = Path(roster_file)
+    if not roster_path.exists():
+        return positions
+    with roster_path.open("r", newline="", encoding="utf-8-sig") as file:
+        for row in csv.DictReader(file):
+            position = normalize_position(row.get("Player Position"))
+            if row.get("Player ID") and position:
+                positions[row["Player ID"]] = position
+    return positions
+
+
+def _init_worker(arrays_dir, config):
+    import numpy as np
+
+    _ARRAYS["np"] = np
+    _ARRAYS["config"] = config
+    for name in ARRAY_NAMES:
+        _ARRAYS[name] = np.load(Path(arrays_dir) / f"{name}.npy", mmap_mode="r")
+
+
+def _fit_model(task):
+    """Fit one (group, target) model; returns (group, target_index, params or None)."""
+    np = _ARRAYS["np"]
+    config = _ARRAYS["config"]
+    group, target_idx = task
+    features = _ARRAYS["features"]
+    targets = _ARRAYS["targets"][:, target_idx]
+    days = _ARRAYS["days"]
+    is_train = _ARRAYS["is_train"]
+
+    if group == ALL_POSITIONS:
+        in_group = np.ones(len(days), dtype=bool)
+    else:
+        in_group = _ARRAYS["groups"] == MODEL_GROUPS.index(group)
+    train_idx = np.flatnonzero(in_group & is_train)
+    test_idx = np.flatnonzero(in_group & ~is_train)
+    min_samples = 1 if group == ALL_POSITIONS else config["min_samples"]
+    if len(train_idx) < max(min_samples, 1):
+        return group, target_idx, None
+
+    weights = None
+    if config["half_life"]:
+        weights = recency_weights(np, days[train_idx], config["half_life"], config["reference_day"])
+    stats = RidgeSufficientStats(np, features.shape[1])
+    stats.add(features[train_idx], targets[train_idx], weights)
+    mean, _var, scale, coef, intercept = stats.solve(config["alpha"])
+
+    params = {
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": coef.tolist(),
+        "intercept": intercept,
+        "train_samples": len(train_idx),
+        "test_samples": len(test_idx),
+    }
+    if len(test_idx):
+        predicted = ((features[test_idx] - mean) / scale) @ coef + intercept
+        params["test_mae"] = float(np.abs(predicted - targets[test_idx]).mean())
+    return group, target_idx, params
+
+
+class PositionModelBundle:
+    """Per-position, per-target linear models with position routing.
+
+    ``predict`` scores each position group with its own model in one
+    matrix-vector product per group; positions without a model (or blank
+    positions) use the ALL model for that target.
+    """
+
+    def __init__(self, np, feature_names, models):
+        self.np = np
+        self.feature_names = list(feature_names)
+        self.scorers = {
+            (group, target): PointsScorer.from_params(np, self.feature_names, params, target=target)
+            for group, by_target in models.items()
+            for target, params in by_target.items()
+        }
+
+    @property
+    def n_features_in_(self):
+        return len(self.feature_names)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            import numpy as np
+        except ImportError:
+            print("numpy is required for scoring. Run: python -m pip install numpy")
+            raise
+        with open(path, "r", encoding="utf-8") as file:
+            bundle = json.load(file)
+        if bundle.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"{path} is model bundle version {bundle.get('version')}, expected {ARTIFACT_VERSION}")
+        return cls(np, bundle["feature_names"], bundle["models"])
+
+    def scorer(self, position, target):
+        return self.scorers.get((position, target)) or self.scorers[(ALL_POSITIONS, target)]
+
+    def predict(self, features, positions, target="PTS"):
+        np = self.np
+        features = np.asarray(features, dtype=np.float64)
+        groups = np.array([normalize_position(position) for position in positions], dtype=object)
+        predicted = np.empty(len(features), dtype=np.float64)
+        for group in set(groups.tolist()):
+            mask = groups == group
+            predicted[mask] = self.scorer(group, target).predict(features[mask])
+        return predicted
+
+
+def train_position_models(
+    player_stats_file,
+    roster_file,
+    features_file,
+    dataset_file,
+    bundle_file,
+    targets=DATASET_TARGETS,
+    min_minutes=5,
+    min_games=3,
+    test_ratio=0.2,
+    recency_half_life_days=365,
+    alpha=1.0,
+    rolling=None,
+    workers=1,
+    min_samples=MIN_MODEL_SAMPLES,
+):
+    """Fit one StandardScaler + Ridge model per position group x target.
+
+    The dataset is built once; its arrays are shared with the workers as
+    memory-mapped .npy files and every (group, target) fit is one task in
+    the pool. The ALL group is fit on every sample, whatever its size, and
+    serves players with no roster position or whose group has fewer than
+    ``min_samples`` training samples. Writes the bundle JSON and returns
+    its dict.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for position models. Run: python -m pip install numpy")
+        return None
+
+    positions = load_player_positions(roster_file)
+    if not positions:
+        print(f"No player positions found in {roster_file}; only the ALL model will be fit.")
+
+    _written, store = build_player_datasets(
+        player_stats_file,
+        features_file,
+        dataset_file,
+        min_minutes=min_minutes,
+        min_games=min_games,
+        targets=targets,
+        rolling=rolling,
+        as_arrays=True,
+    )
+    if store is None or len(store) < 2:
+        print("Not enough samples to train position models.")
+        return None
+
+    player_positions = [positions.get(player_id, "") for player_id in store.meta_column("Player ID").tolist()]
+    groups = np.array(
+        [MODEL_GROUPS.index(position) if position else 0 for position in player_positions],
+        dtype=np.int8,
+    )
+    train_idx, _test_idx = time_split(np, store.days, test_ratio)
+    is_train = np.zeros(len(store), dtype=bool)
+    is_train[train_idx] = True
+    half_life = recency_half_life_days if recency_half_life_days and recency_half_life_days > 0 else None
+    config = {
+        "alpha": alpha,
+        "half_life": half_life,
+        "reference_day": int(store.days[train_idx].max()),
+        "min_samples": min_samples,
+    }
+    tasks = [(group, target_idx) for group in MODEL_GROUPS for target_idx in range(len(targets))]
+
+    with tempfile.TemporaryDirectory() as arrays_dir:
+        arrays = {
+            "features": store.features,
+            "targets": store.targets,
+            "days": store.days,
+            "groups": groups,
+            "is_train": is_train,
+        }
+        for name in ARRAY_NAMES:
+            np.save(Path(arrays_dir) / f"{name}.npy", arrays[name])
+
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(arrays_dir, config)
+            ) as executor:
+                results = list(executor.map(_fit_model, tasks))
+        else:
+            _init_worker(arrays_dir, config)
+            results = [_fit_model(task) for task in tasks]
+            _ARRAYS.clear()
+
+    models = {}
+    for group, target_idx, params in results:
+        if params is not None:
+            models.setdefault(group, {})[targets[target_idx]] = params
+    missing = [target for target in targets if target not in models.get(ALL_POSITIONS, {})]
+    if missing:
+        print(f"No ALL model could be fit for {', '.join(missing)}; not saving {bundle_file}.")
+        return None
+    bundle = {
+        "version": ARTIFACT_VERSION,
+        "feature_names": store.feature_names,
+        "targets": list(targets),
+        "models": models,
+    }
+    bundle_path = Path(bundle_file)
+    temp_path = bundle_path.with_name(f"{bundle_path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(bundle, file)
+    temp_path.replace(bundle_path)
+    print(f"Saved {sum(len(by_target) for by_target in models.values())} models to {bundle_file}")
+
+    # Compare each position model with the ALL model on the same test rows.
+    routed = PositionModelBundle(np, store.feature_names, models)
+    test_mask = ~is_train
+    for group in POSITION_GROUPS:
+        rows = test_mask & (groups == MODEL_GROUPS.index(group))
+        if group not in models or not rows.any():
+            continue
+        for target in targets:
+            if target not in models[group]:
+                continue
+            actual = store.target(target)[rows]
+            position_mae = float(np.abs(routed.scorer(group, target).predict(store.features[rows]) - actual).mean())
+            all_mae = float(np.abs(routed.scorer(ALL_POSITIONS, target).predict(store.features[rows]) - actual).mean())
+            print(
+                f"  {group} {target}: MAE {position_mae:.2f} vs {all_mae:.2f} for the ALL model "
+                f"(test samples {int(rows.sum())})"
+            )
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-position, per-target player models")
+    parser.add_argument("player_stats_file")
+    parser.add_argument("roster_file")
+    parser.add_argument("--features-file", default="position_features.csv")
+    parser.add_argument("--dataset-file", default="position_dataset.csv")
+    parser.add_argument("--bundle-file", default="position_models.json")
+    parser.add_argument("--targets", default=",".join(DATASET_TARGETS))
+    parser.add_argument("--min-minutes", type=float, default=5)
+    parser.add_argument("--min-games", type=int, default=3)
+    parser.add_argument("--half-life", type=float, default=365, help="Recency half-life in days (0 disables).")
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=MIN_MODEL_SAMPLES,
+        help="Training samples a position group needs for its own model.",
+    )
+    args = parser.parse_args()
+
+    train_position_models(
+        args.player_stats_file,
+        args.roster_file,
+        args.features_file,
+        args.dataset_file,
+        args.bundle_file,
+        targets=[target.strip() for target in args.targets.split(",") if target.strip()],
+        min_minutes=args.min_minutes,
+        min_games=args.min_games,
+        recency_half_life_days=args.half_life,
+        alpha=args.alpha,
+        workers=args.workers,
+        min_samples=args.min_samples,
+    )
+
+
+if __name__ == "__main__":
+    main()
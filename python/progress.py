@@ -0,0 +1,110 @@
+import sys
+import time
+
+from http_utils import HTTP_STATS
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere.
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _format_seconds(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """Single-line progress with rate, ETA, in-flight work, errors and bytes.
+
+    Network figures come from http_utils.HTTP_STATS, measured from the moment
+    the reporter is created, so each phase reports only its own traffic.
+    In-flight is the number of requests under way in this process unless
+    the caller reports its own count (e.g. shard workers still fetching).
+    """
+
+    def __init__(self, label, total=0, min_interval=0.5, stream=None):
+        self.label = label
+        self.total = total
+        self.min_interval = min_interval
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.errors = 0
+        self.in_flight = None
+        self.extra_bytes = 0
+        self.started = time.monotonic()
+        self.start_bytes = HTTP_STATS["bytes"]
+        self.last_render = 0.0
+        self.last_width = 0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def bytes_downloaded(self):
+        return HTTP_STATS["bytes"] - self.start_bytes + self.extra_bytes
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def update(self, advance=1, errors=0, total=None, in_flight=None, extra_bytes=0):
+        self.done += advance
+        self.errors += errors
+        self.extra_bytes += extra_bytes
+        if total is not None:
+            self.total = total
+        if in_flight is not None:
+            self.in_flight = in_flight
+        now = time.monotonic()
+        if now - self.last_render >= self.min_interval or self.done == self.total:
+            self.last_render = now
+            self._write(self.render(), end="\r")
+
+    def render(self):
+        rate = self.rate
+        parts = [f"{self.label} {self.done}/{self.total}" if self.total else f"{self.label} {self.done}"]
+        parts.append(f"{rate:.1f}/s")
+        if self.total and rate > 0:
+            remaining = max(self.total - self.done, 0)
+            parts.append(f"ETA {_format_seconds(remaining / rate)}")
+        in_flight = HTTP_STATS["in_flight"] if self.in_flight is None else self.in_flight
+        parts.append(f"in-flight {in_flight}")
+        error_rate = 100.0 * self.errors / self.done if self.done else 0.0
+        parts.append(f"errors {self.errors} ({error_rate:.1f}%)")
+        parts.append(f"{self.bytes_downloaded / (1024 * 1024):.1f} MB")
+        return " | ".join(parts)
+
+    def _write(self, text, end="\n"):
+        padding = " " * max(self.last_width - len(text), 0)
+        self.stream.write(text + padding + end)
+        self.stream.flush()
+        self.last_width = len(text) if end == "\r" else 0
+
+    def finish(self):
+        elapsed = self.elapsed
+        summary = (
+            f"{self.label} {self.done}"
+            + (f"/{self.total}" if self.total else "")
+            + f" in {_format_seconds(elapsed)} ({self.rate:.1f}/s, "
+            f"errors {self.errors}, {self.bytes_downloaded / (1024 * 1024):.1f} MB)"
+        )
+        self._write(summary)
+        return elapsed
@@ -0,0 +1,158 @@
+import json
+from datetime import date
+from pathlib import Path
+
+from game_information import PLAYER_STATS_FIELDS
+from ml_model import PreGameFeatures
+from points_scorer import PointsScorer, model_artifact_path
+
+
+# player_games column for each PLAYER_STATS_FIELDS entry.
+PLAYER_GAMES_COLUMNS = {
+    "PTS": "pts",
+    "FGM": "fgm",
+    "FGA": "fga",
+    "3PTM": "tpm",
+    "3PTA": "tpa",
+    "FTM": "ftm",
+    "FTA": "fta",
+    "REB": "reb",
+    "AST": "ast",
+    "TO": "turnovers",
+    "STL": "stl",
+    "Blocks": "blocks",
+    "OREB": "oreb",
+    "DREB": "dreb",
+    "PF": "pf",
+    "MIN": "minutes",
+}
+
+UPSERT_PAGE_SIZE = 1000
+
+
+def fetch_upcoming_games(cur, season, today):
+    """(player_id, team_id, game_id, game_date) for each active roster player's unplayed games."""
+    cur.execute(
+        """
+        SELECT tr.player_id, tr.team_id, g.game_id, g.game_date
+        FROM games g
+        JOIN team_rosters tr
+          ON tr.season = %(season)s
+         AND COALESCE(tr.is_active, TRUE)
+         AND tr.team_id IN (g.home_team_id, g.away_team_id)
+        WHERE g.season = %(season)s
+          AND g.game_date >= %(today)s
+          AND NOT EXISTS (SELECT 1 FROM player_games pg WHERE pg.game_id = g.game_id)
+        ORDER BY tr.player_id, g.game_date, g.game_id;
+        """,
+        {"season": season, "today": today},
+    )
+    return cur.fetchall()
+
+
+def fetch_player_history(cur, season, player_ids):
+    """Season box scores for ``player_ids`` as stats-CSV style dicts, oldest first per player."""
+    columns = [PLAYER_GAMES_COLUMNS[field] for field in PLAYER_STATS_FIELDS]
+    cur.execute(
+        f"""
+        SELECT player_id, {", ".join(columns)}
+        FROM player_games
+        WHERE season = %(season)s
+          AND player_id = ANY(%(player_ids)s)
+          AND game_date IS NOT NULL
+        ORDER BY player_id, game_date, game_id;
+        """,
+        {"season": season, "player_ids": list(player_ids)},
+    )
+    for record in cur:
+        yield record[0], dict(zip(PLAYER_STATS_FIELDS, record[1:]))
+
+
+def upsert_projections(cur, rows):
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO player_projections (
+            player_id, game_id, game_date, season, team_id, games_played, projected_pts, updated_at
+        ) VALUES %s
+        ON CONFLICT (player_id, game_id) DO UPDATE SET
+            game_date = EXCLUDED.game_date,
+            season = EXCLUDED.season,
+            team_id = EXCLUDED.team_id,
+            games_played = EXCLUDED.games_played,
+            projected_pts = EXCLUDED.projected_pts,
+            updated_at = EXCLUDED.updated_at;
+        """,
+        rows,
+        template="(%s, %s, %s, %s, %s, %s, %s, NOW())",
+        page_size=UPSERT_PAGE_SIZE,
+    )
+
+
+def load_points_model(model_file):
+    """PointsScorer from a .scorer.json artifact (or the one saved beside a joblib model), else the joblib Pipeline."""
+    artifact_file = Path(model_file)
+    if not artifact_file.name.endswith(".json"):
+        artifact_file = model_artifact_path(model_file)
+    if artifact_file.exists():
+        return PointsScorer.load(artifact_file)
+    try:
+        import joblib
+    except ImportError:
+        print("scikit-learn is required. Run: python -m pip install scikit-learn")
+        raise
+    return joblib.load(model_file)
+
+
+def run_predict(conn, season, model_file, rolling=None, today=None):
+    """Score every active roster player's upcoming games and store them in player_projections.
+
+    Features are replayed from the season's player_games through the same
+    PreGameFeatures used for training, so a player's projection uses every
+    game played so far. The model is loaded once and scores all rows in a
+    single predict call; the NumPy-only scorer artifact is used when present.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for projections. Run: python -m pip install numpy")
+        return 0
+
+    from espn_ingest import update_sync_log
+
+    model = load_points_model(model_file)
+    today = today or date.today()
+
+    with conn.cursor() as cur:
+        upcoming = fetch_upcoming_games(cur, season, today)
+        if not upcoming:
+            print("No upcoming games to project.")
+            return 0
+
+        pregame = PreGameFeatures(rolling)
+        header = pregame.header()
+        expected = getattr(model, "n_features_in_", len(header))
+        if expected != len(header) or getattr(model, "feature_names", header) != header:
+            raise RuntimeError(
+                f"{model_file} expects {expected} features but predict builds "
+                f"{len(header)}; pass the rolling settings the model was trained with."
+            )
+
+        player_ids = sorted({row[0] for row in upcoming})
+        for player_id, row in fetch_player_history(cur, season, player_ids):
+            pregame.update(player_id, row)
+
+        features = np.array([pregame.features(row[0]) for row in upcoming], dtype=np.float64)
+        projected = model.predict(features)
+
+        rows = [
+            (player_id, game_id, game_date, season, team_id, pregame.games_played(player_id), round(float(pts), 2))
+            for (player_id, team_id, game_id, game_date), pts in zip(upcoming, projected)
+        ]
+        upsert_projections(cur, rows)
+        update_sync_log(cur, "predict", json.dumps({"season": season, "projections": len(rows)}))
+    conn.commit()
+    print(f"Projected {len(rows)} player games for {len(player_ids)} players.")
+    return len(rows)
@@ -0,0 +1,80 @@
+import heapq
+
+
+class RankedPool:
+    """Players kept in one max-heap per position, best value first.
+
+    Removing a player or changing its value only updates ``entries``; heap
+    items that no longer match are dropped when they reach the top (lazy
+    deletion), and a heap is rebuilt once most of it is stale. Adds, removes
+    and best-of-position lookups are O(log n); ``top`` is O(k log n).
+    """
+
+    def __init__(self):
+        self.heaps = {}
+        self.entries = {}
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, player_id):
+        return player_id in self.entries
+
+    def add(self, player_id, position, value):
+        """Insert a player, or move/re-value one already in the pool."""
+        self.remove(player_id)
+        self.entries[player_id] = (position, value)
+        self.sizes[position] = self.sizes.get(position, 0) + 1
+        heap = self.heaps.setdefault(position, [])
+        heapq.heappush(heap, (-value, player_id))
+        if len(heap) > 64 and len(heap) > 2 * self.sizes[position]:
+            self._compact(position)
+
+    def remove(self, player_id):
+        """Drop a player; returns its (position, value) or None."""
+        entry = self.entries.pop(player_id, None)
+        if entry is not None:
+            self.sizes[entry[0]] -= 1
+        return entry
+
+    def count(self, position):
+        return self.sizes.get(position, 0)
+
+    def positions(self):
+        return list(self.heaps)
+
+    def _is_live(self, position, item):
+        return self.entries.get(item[1]) == (position, -item[0])
+
+    def _compact(self, position):
+        heap = [(-value, player_id) for player_id, (pos, value) in self.entries.items() if pos == position]
+        heapq.heapify(heap)
+        self.heaps[position] = heap
+
+    def best(self, position):
+        """(player_id, value) of the best player at ``position``, or None."""
+        heap = self.heaps.get(position)
+        while heap and not self._is_live(position, heap[0]):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        return heap[0][1], -heap[0][0]
+
+    def top(self, position, k):
+        """Best ``k`` (player_id, value) at ``position``, best first."""
+        heap = self.heaps.get(position)
+        if not heap:
+            return []
+        found = []
+        seen = set()
+        popped = []
+        while heap and len(found) < k:
+            item = heapq.heappop(heap)
+            if self._is_live(position, item) and item[1] not in seen:
+                found.append((item[1], -item[0]))
+                seen.add(item[1])
+                popped.append(item)
+        for item in popped:
+            heapq.heappush(heap, item)
+        return found
@@ -0,0 +1,176 @@
+DEFAULT_WINDOWS = (3, 5, 10)
+DEFAULT_HALF_LIVES = (2.0, 5.0)
+
+# USG is a per-game possessions-used proxy: FGA + 0.44 * FTA + TO.
+ROLLING_STATS = ("PTS", "MIN", "USG")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
+def parse_number_list(text, cast=float):
+    values = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if part:
+            values.append(cast(part))
+    return tuple(values)
+
+
+def usage_proxy(fga, fta, turnovers):
+    return fga + 0.44 * fta + turnovers
+
+
+def rolling_row_values(row):
+    """PTS, MIN and USG for one player-stats row (a csv.DictReader dict)."""
+    return [
+        _to_float(row.get("PTS", 0)),
+        _to_float(row.get("MIN", 0)),
+        usage_proxy(
+            _to_float(row.get("FGA", 0)),
+            _to_float(row.get("FTA", 0)),
+            _to_float(row.get("TO", 0)),
+        ),
+    ]
+
+
+class RollingWindow:
+    """Mean of the last ``size`` values from a ring buffer and a running sum."""
+
+    __slots__ = ("size", "values", "index", "count", "total")
+
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value):
+        if self.count == self.size:
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % self.size
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_state(self):
+        return [self.values, self.index, self.count, self.total]
+
+    def load_state(self, state):
+        self.values, self.index, self.count, self.total = state
+
+
+class Ewma:
+    """Exponentially weighted mean with a half-life measured in games."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, half_life):
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        self.value = None
+
+    def push(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+
+    def mean(self):
+        return 0.0 if self.value is None else self.value
+
+    def to_state(self):
+        return self.value
+
+    def load_state(self, state):
+        self.value = state
+
+
+class RollingFeatureSet:
+    """Last-N-game and EWMA form per player, updated in O(1) per game.
+
+    ``features(player_id)`` returns the current values; call it before
+    ``update`` for pre-game (leakage-free) features and after it for values
+    that include the game, like the season-to-date averages.
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, half_lives=DEFAULT_HALF_LIVES, stats=ROLLING_STATS):
+        self.windows = tuple(int(size) for size in windows)
+        self.half_lives = tuple(float(half_life) for half_life in half_lives)
+        self.stats = tuple(stats)
+        if any(size <= 0 for size in self.windows) or any(h <= 0 for h in self.half_lives):
+            raise ValueError("Rolling windows and EWMA half-lives must be positive.")
+        self.players = {}
+        self.empty = [0.0] * len(self.header())
+
+    def reset(self):
+        self.players = {}
+
+    def header(self):
+        names = []
+        for stat in self.stats:
+            names.extend(f"L{size} {stat}" for size in self.windows)
+            names.extend(f"EWMA{half_life:g} {stat}" for half_life in self.half_lives)
+        return names
+
+    def config(self):
+        return {
+            "windows": list(self.windows),
+            "half_lives": list(self.half_lives),
+            "stats": list(self.stats),
+        }
+
+    def _new_trackers(self):
+        trackers = []
+        for _stat in self.stats:
+            trackers.extend(RollingWindow(size) for size in self.windows)
+            trackers.extend(Ewma(half_life) for half_life in self.half_lives)
+        return trackers
+
+    def update(self, player_id, values):
+        trackers = self.players.get(player_id)
+        if trackers is None:
+            trackers = self.players[player_id] = self._new_trackers()
+        per_stat = len(self.windows) + len(self.half_lives)
+        for stat_idx, value in enumerate(values):
+            for tracker in trackers[stat_idx * per_stat:(stat_idx + 1) * per_stat]:
+                tracker.push(value)
+
+    def features(self, player_id):
+        trackers = self.players.get(player_id)
+        if trackers is None:
+            return list(self.empty)
+        return [tracker.mean() for tracker in trackers]
+
+    def to_state(self):
+        return {
+            "config": self.config(),
+            "players": {
+                player_id: [tracker.to_state() for tracker in trackers]
+                for player_id, trackers in self.players.items()
+            },
+        }
+
+    def load_state(self, state):
+        """Restore saved trackers; returns False if the config does not match."""
+        self.players = {}
+        return self.merge_state(state)
+
+    def merge_state(self, state):
+        """Add the players from a saved state, e.g. one built for another shard."""
+        if not state or state.get("config") != self.config():
+            return False
+        for player_id, tracker_states in state["players"].items():
+            trackers = self._new_trackers()
+            for tracker, tracker_state in zip(trackers, tracker_states):
+                tracker.load_state(tracker_state)
+            self.players[player_id] = trackers
+        return True
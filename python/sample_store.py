@@ -0,0 +1,169 @@
+from datetime import date
+
+
+SAMPLE_META_FIELDS = ["Date", "Game ID", "Player ID", "Player Name", "TEAM ID", "Team Name"]
+
+DEFAULT_CAPACITY = 4096
+
+
+class SampleStore:
+    """Training samples held as contiguous float64 arrays plus a metadata table.
+
+    ``features`` is (n, n_features), ``targets`` is (n, n_targets), ``aux``
+    is (n, n_aux) for per-sample numbers that are neither features nor
+    training targets (e.g. minutes, for re-applying a stricter minutes cut)
+    and ``days`` holds each sample's date as a day number (date.toordinal).
+    Rows are appended into preallocated arrays that are copied into arrays
+    twice the size when full; ``finish`` copies them down to the rows
+    written and ``extend`` appends another finished store. The metadata
+    table keeps each SAMPLE_META_FIELDS column as (values, int32 codes);
+    ``meta_column`` and ``meta_rows`` decode it.
+    """
+
+    def __init__(self, np, feature_names, target_names, capacity=DEFAULT_CAPACITY, aux_names=()):
+        self.np = np
+        self.feature_names = list(feature_names)
+        self.target_names = list(target_names)
+        self.aux_names = list(aux_names)
+        self.size = 0
+        capacity = max(int(capacity), 1)
+        self.features = np.empty((capacity, len(self.feature_names)), dtype=np.float64)
+        self.targets = np.empty((capacity, len(self.target_names)), dtype=np.float64)
+        self.aux = np.empty((capacity, len(self.aux_names)), dtype=np.float64)
+        self.days = np.empty(capacity, dtype=np.int32)
+        self._meta_rows = [[] for _ in SAMPLE_META_FIELDS]
+        self.meta = None
+
+    def __len__(self):
+        return self.size
+
+    def _reallocate(self, capacity):
+        # New arrays plus a copy, never an in-place resize: slices handed out
+        # earlier keep pointing at the old (still valid) buffers.
+        np = self.np
+        for name in ("features", "targets", "aux", "days"):
+            old = getattr(self, name)
+            grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[: self.size] = old[: self.size]
+            setattr(self, name, grown)
+
+    def append(self, day, meta, features, targets, aux=()):
+        if self.size == len(self.days):
+            self._reallocate(len(self.days) * 2)
+        idx = self.size
+        self.features[idx] = features
+        self.targets[idx] = targets
+        self.aux[idx] = aux
+        self.days[idx] = day
+        for column, value in zip(self._meta_rows, meta):
+            column.append(value)
+        self.size += 1
+
+    def finish(self):
+        np = self.np
+        if self.size < len(self.days):
+            self._reallocate(self.size)
+        if self._meta_rows is not None:
+            # Category codes: names, teams and dates repeat across thousands of rows.
+            self.meta = {}
+            for field, values in zip(SAMPLE_META_FIELDS, self._meta_rows):
+                uniques, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+                self.meta[field] = (uniques, codes.astype(np.int32))
+            self._meta_rows = None
+        return self
+
+    def extend(self, other):
+        """Append the samples of another finished store with the same columns.
+
+        The arrays are concatenated and each metadata column's values merged
+        and its codes remapped, so the result matches one store built from
+        both sets of rows.
+        """
+        np = self.np
+        for name in ("features", "targets", "aux", "days"):
+            merged = np.concatenate([getattr(self, name)[: self.size], getattr(other, name)[: other.size]])
+            setattr(self, name, merged)
+        for field in SAMPLE_META_FIELDS:
+            values, codes = self.meta[field]
+            other_values, other_codes = other.meta[field]
+            uniques = np.union1d(values, other_values)
+            self.meta[field] = (
+                uniques,
+                np.concatenate(
+                    [np.searchsorted(uniques, values)[codes], np.searchsorted(uniques, other_values)[other_codes]]
+                ).astype(np.int32),
+            )
+        self.size += other.size
+        return self
+
+    def target(self, name):
+        return self.targets[:, self.target_names.index(name)]
+
+    def aux_column(self, name):
+        return self.aux[:, self.aux_names.index(name)]
+
+    def years(self):
+        np = self.np
+        unique_days, inverse = np.unique(self.days, return_inverse=True)
+        years = np.array([date.fromordinal(int(day)).year for day in unique_days], dtype=np.int32)
+        return years[inverse]
+
+    def meta_column(self, field, indices=None):
+        uniques, codes = self.meta[field]
+        if indices is not None:
+            codes = codes[indices]
+        return uniques[codes]
+
+    def meta_rows(self, indices):
+        columns = [self.meta_column(field, indices).tolist() for field in SAMPLE_META_FIELDS]
+        return list(zip(*columns))
+
+    def save(self, path):
+        arrays = {
+            "features": self.features,
+            "targets": self.targets,
+            "aux": self.aux,
+            "days": self.days,
+            "feature_names": self.np.array(self.feature_names, dtype=str),
+            "target_names": self.np.array(self.target_names, dtype=str),
+            "aux_names": self.np.array(self.aux_names, dtype=str),
+        }
+        for idx, field in enumerate(SAMPLE_META_FIELDS):
+            arrays[f"meta_{idx}_values"], arrays[f"meta_{idx}_codes"] = self.meta[field]
+        with open(path, "wb") as file:
+            self.np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, np, path):
+        with np.load(path) as data:
+            aux_names = data["aux_names"].tolist() if "aux_names" in data.files else []
+            store = cls(
+                np, data["feature_names"].tolist(), data["target_names"].tolist(), capacity=1, aux_names=aux_names
+            )
+            store.features = data["features"]
+            store.targets = data["targets"]
+            store.days = data["days"]
+            store.aux = data["aux"] if "aux" in data.files else np.empty((len(store.days), 0), dtype=np.float64)
+            store.size = len(store.days)
+            store.meta = {
+                field: (data[f"meta_{idx}_values"], data[f"meta_{idx}_codes"])
+                for idx, field in enumerate(SAMPLE_META_FIELDS)
+            }
+            store._meta_rows = None
+        return store
+
+
+def recency_weights(np, days, half_life_days, reference_day=None):
+    """0.5 ** (age / half_life) with age measured back from ``reference_day`` (default: newest)."""
+    if reference_day is None:
+        reference_day = days.max()
+    return 0.5 ** ((reference_day - days.astype(np.int64)) / half_life_days)
+
+
+def time_split(np, days, test_ratio):
+    """Train/test row indices: the newest ``test_ratio`` of samples by date form the test set."""
+    total = len(days)
+    order = np.argsort(days, kind="stable")
+    split_idx = int(total * (1 - test_ratio))
+    split_idx = max(1, min(split_idx, total - 1))
+    return order[:split_idx], order[split_idx:]
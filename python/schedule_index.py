@@ -0,0 +1,168 @@
+import csv
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date
+from pathlib import Path
+
+from team_schedule import SCHEDULE_HEADER
+
+
+ScheduleGame = namedtuple(
+    "ScheduleGame",
+    [
+        "game_id",
+        "game_date",
+        "game_time",
+        "home_team_id",
+        "home_team_name",
+        "away_team_id",
+        "away_team_name",
+        "neutral_site",
+    ],
+)
+
+
+def parse_schedule_date(text):
+    """Parse the schedule's YYYY/MM/DD dates without strptime."""
+    parts = text.split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        return date(int(parts[0]), int(parts[1]), int(parts[2]))
+    except ValueError:
+        return None
+
+
+def _parse_team_id(text):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+class ScheduleIndex:
+    """Schedule CSV read once into game, date and team lookups.
+
+    Games are kept sorted by (date, game_id) so date windows are found with
+    bisect instead of walking the whole season.
+    """
+
+    def __init__(self, games=()):
+        self.games = {}
+        self.team_games = {}
+        self.skipped_rows = 0
+        # Rows with unparsable dates are not indexed, but their games exist.
+        self.skipped_game_ids = set()
+        self._sorted = None
+        self._dates = None
+        for game in games:
+            self.add(game)
+
+    @classmethod
+    def from_csv(cls, schedule_file):
+        index = cls()
+        schedule_path = Path(schedule_file)
+        if not schedule_path.exists() or schedule_path.stat().st_size == 0:
+            return index
+
+        with schedule_path.open("r", newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            for row in reader:
+                if row == SCHEDULE_HEADER:
+                    continue
+                if len(row) < 2:
+                    continue
+                game_id = row[0].strip()
+                game_date = parse_schedule_date(row[1].strip())
+                if not game_id:
+                    continue
+                if game_date is None:
+                    index.skipped_rows += 1
+                    index.skipped_game_ids.add(game_id)
+                    continue
+                row = row + [""] * (len(SCHEDULE_HEADER) - len(row))
+                index.add(
+                    ScheduleGame(
+                        game_id,
+                        game_date,
+                        row[2],
+                        _parse_team_id(row[3]),
+                        row[4],
+                        _parse_team_id(row[5]),
+                        row[6],
+                        row[7].strip().lower() == "true",
+                    )
+                )
+        return index
+
+    def add(self, game):
+        if game.game_id in self.games:
+            return
+        self.games[game.game_id] = game
+        for team_id in (game.home_team_id, game.away_team_id):
+            if team_id is not None:
+                self.team_games.setdefault(team_id, []).append(game.game_id)
+        self._sorted = None
+        self._dates = None
+
+    def __len__(self):
+        return len(self.games)
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def get(self, game_id):
+        return self.games.get(game_id)
+
+    def game_ids(self):
+        """Every game ID in the schedule file, including rows skipped for their date."""
+        return set(self.games) | self.skipped_game_ids
+
+    def team_ids(self):
+        return set(self.team_games)
+
+    def games_for_team(self, team_id):
+        return [self.games[game_id] for game_id in self.team_games.get(team_id, [])]
+
+    def _ensure_sorted(self):
+        if self._sorted is None:
+            self._sorted = sorted(
+                self.games.values(), key=lambda game: (game.game_date, game.game_id)
+            )
+            self._dates = [game.game_date for game in self._sorted]
+
+    def by_date(self):
+        self._ensure_sorted()
+        return self._sorted
+
+    def games_between(self, start_date=None, end_date=None):
+        """Games with start_date <= date <= end_date, in date order."""
+        self._ensure_sorted()
+        lo = 0 if start_date is None else bisect_left(self._dates, start_date)
+        hi = len(self._dates) if end_date is None else bisect_right(self._dates, end_date)
+        return self._sorted[lo:hi]
+
+    def count_after(self, end_date):
+        self._ensure_sorted()
+        return len(self._dates) - bisect_right(self._dates, end_date)
+
+    def count_before(self, start_date):
+        """Indexed games dated before ``start_date``."""
+        self._ensure_sorted()
+        return bisect_left(self._dates, start_date)
+
+    def first_pending_date(self, is_pending, start_date=None):
+        """Date of the earliest game on or after ``start_date`` for which ``is_pending(game_id)`` is true.
+
+        Games before ``start_date`` are skipped with bisect, so a caller that
+        knows everything before some date is done walks only the games after it.
+        """
+        self._ensure_sorted()
+        lo = 0 if start_date is None else bisect_left(self._dates, start_date)
+        for position in range(lo, len(self._sorted)):
+            if is_pending(self._sorted[position].game_id):
+                return self._dates[position]
+        return None
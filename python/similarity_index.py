@@ -0,0 +1,345 @@
+import argparse
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from feature_builder import FEATURES_HEADER
+
+
+INDEX_VERSION = 2
+# Rows scored per matrix-vector product in a search.
+BLOCK_ROWS = 8192
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def similarity_columns(header):
+    """Season averages plus any rolling/EWMA columns in a features CSV header."""
+    return [
+        column
+        for column in header
+        if column.startswith("Avg ") or column not in FEATURES_HEADER
+    ]
+
+
+def season_for_date(played):
+    """Season tag for a game date (2023-11-26 -> 2024); seasons end in spring."""
+    return played.year + 1 if played.month >= 7 else played.year
+
+
+def _read_new_bytes(path, saved):
+    """(offset, new bytes, crc of the whole file) in one pass over ``path``.
+
+    The features file is rebuilt in player order by default, so new games
+    land mid-file and only a crc over everything read last time tells an
+    append from a rewrite. When that prefix no longer matches, the whole
+    file is returned from offset 0.
+    """
+    saved_size = saved["size"] if saved else 0
+    crc = 0
+    with path.open("rb") as file:
+        remaining = saved_size
+        while remaining > 0:
+            chunk = file.read(min(remaining, READ_CHUNK_BYTES))
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+        if saved and remaining == 0 and crc == saved["crc"]:
+            new_bytes = file.read()
+            return saved_size, new_bytes, zlib.crc32(new_bytes, crc)
+        file.seek(0)
+        data = file.read()
+    return 0, data, zlib.crc32(data)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SimilarityIndex:
+    """Cosine k-nearest-neighbour index over (player, season) feature vectors.
+
+    Each vector is the player's latest features row for the season (season
+    averages and rolling columns). Columns are z-scored across the index and
+    rows scaled to unit length, so cosine similarity is a dot product; a
+    search scores BLOCK_ROWS rows per matrix-vector product and keeps the
+    best k of each block with argpartition.
+    """
+
+    def __init__(self, np, columns, player_ids, seasons, names, days, sources, raw, files=None):
+        self.np = np
+        self.columns = list(columns)
+        self.player_ids = list(player_ids)
+        self.seasons = [int(season) for season in seasons]
+        self.names = list(names)
+        self.days = [int(day) for day in days]
+        self.sources = [str(source) for source in sources]
+        self.raw = np.asarray(raw, dtype=np.float64).reshape(len(self.player_ids), len(self.columns))
+        self.files = dict(files or {})
+        self._reindex()
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def _reindex(self):
+        np = self.np
+        self.rows = {key: row for row, key in enumerate(zip(self.player_ids, self.seasons))}
+        self.player_array = np.array(self.player_ids, dtype=str)
+        self.season_array = np.array(self.seasons, dtype=np.int32)
+        if not len(self):
+            self.unit = np.zeros((0, len(self.columns)), dtype=np.float32)
+            return
+        mean = self.raw.mean(axis=0)
+        scale = self.raw.std(axis=0)
+        scale[scale == 0] = 1.0
+        scaled = (self.raw - mean) / scale
+        norms = np.linalg.norm(scaled, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.unit = (scaled / norms).astype(np.float32)
+
+    @classmethod
+    def empty(cls, np, columns):
+        return cls(np, columns, [], [], [], [], [], np.zeros((0, len(columns))))
+
+    @classmethod
+    def load(cls, path):
+        try:
+            import numpy as np
+        except ImportError:
+            print("numpy is required for the similarity index. Run: python -m pip install numpy")
+            raise
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != INDEX_VERSION:
+                raise ValueError(f"{path} is similarity index version {meta.get('version')}, expected {INDEX_VERSION}")
+            return cls(
+                np,
+                meta["columns"],
+                data["player_ids"].tolist(),
+                data["seasons"].tolist(),
+                data["names"].tolist(),
+                data["days"].tolist(),
+                data["sources"].tolist(),
+                data["raw"],
+                files=meta["files"],
+            )
+
+    def save(self, path):
+        np = self.np
+        meta = {"version": INDEX_VERSION, "columns": self.columns, "files": self.files}
+        index_path = Path(path)
+        temp_path = index_path.with_name(f"{index_path.name}.tmp.npz")
+        np.savez(
+            temp_path,
+            meta=np.array(json.dumps(meta)),
+            player_ids=np.array(self.player_ids, dtype=str),
+            seasons=np.array(self.seasons, dtype=np.int32),
+            names=np.array(self.names, dtype=str),
+            days=np.array(self.days, dtype=np.int32),
+            sources=np.array(self.sources, dtype=str),
+            raw=self.raw,
+        )
+        temp_path.replace(index_path)
+
+    def drop_source(self, source):
+        keep = [row for row, row_source in enumerate(self.sources) if row_source != source]
+        if len(keep) == len(self):
+            return
+        for attr in ("player_ids", "seasons", "names", "days", "sources"):
+            values = getattr(self, attr)
+            setattr(self, attr, [values[row] for row in keep])
+        self.raw = self.raw[keep]
+        self._reindex()
+
+    def apply_rows(self, rows):
+        """Insert or replace vectors from (player_id, season, name, day, source, vector) rows.
+
+        A (player, season) keeps its latest row by day, so feeding the
+        rows appended to a features file only moves the players who played.
+        """
+        np = self.np
+        latest = {}
+        for player_id, season, name, day, source, vector in rows:
+            key = (player_id, season)
+            current = latest.get(key)
+            if current is None or day >= current[1]:
+                latest[key] = (name, day, source, vector)
+
+        appended = []
+        for key, (name, day, source, vector) in latest.items():
+            row = self.rows.get(key)
+            if row is None:
+                appended.append((key, name, day, source, vector))
+            elif day >= self.days[row]:
+                self.raw[row] = vector
+                self.names[row] = name
+                self.days[row] = day
+                self.sources[row] = source
+        if appended:
+            for (player_id, season), name, day, source, _vector in appended:
+                self.player_ids.append(player_id)
+                self.seasons.append(season)
+                self.names.append(name)
+                self.days.append(day)
+                self.sources.append(source)
+            self.raw = np.vstack([self.raw, np.array([item[4] for item in appended], dtype=np.float64)])
+        self._reindex()
+        return len(latest)
+
+    def most_similar(self, player_id, season=None, k=10, same_season=False):
+        """[(player_id, season, name, similarity)] for the ``k`` nearest other players.
+
+        ``season`` defaults to the player's latest season in the index;
+        ``same_season`` limits matches to that season.
+        """
+        np = self.np
+        player_id = str(player_id)
+        exclude = self.player_array == player_id
+        if season is None:
+            if not exclude.any():
+                return []
+            season = int(self.season_array[exclude].max())
+        row = self.rows.get((player_id, int(season)))
+        if row is None:
+            return []
+        query = self.unit[row]
+        if same_season:
+            exclude = exclude | (self.season_array != int(season))
+
+        best_scores = []
+        best_rows = []
+        for start in range(0, len(self), BLOCK_ROWS):
+            scores = self.unit[start:start + BLOCK_ROWS] @ query
+            scores[exclude[start:start + BLOCK_ROWS]] = -np.inf
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+            else:
+                top = np.arange(len(scores))
+            best_scores.append(scores[top])
+            best_rows.append(top + start)
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [
+            (self.player_ids[rows[i]], self.seasons[rows[i]], self.names[rows[i]], float(scores[i]))
+            for i in order
+            if np.isfinite(scores[i])
+        ]
+
+
+def _read_feature_rows(text, header, columns, source):
+    positions = [header.index(column) for column in columns]
+    player_idx = header.index("Player ID")
+    name_idx = header.index("Player Name")
+    date_idx = header.index("Date")
+    for record in csv.reader(io.StringIO(text, newline="")):
+        if len(record) < len(header) or record[0] == "Date":
+            continue
+        try:
+            played = datetime.strptime(record[date_idx], "%m/%d/%y").date()
+        except ValueError:
+            continue
+        yield (
+            record[player_idx],
+            season_for_date(played),
+            record[name_idx],
+            played.toordinal(),
+            source,
+            [_to_float(record[position]) for position in positions],
+        )
+
+
+def update_similarity_index(features_files, index_file):
+    """Add new features rows to the index at ``index_file``; returns the index.
+
+    Each file's size and crc32 are recorded at every update. When the file
+    still starts with exactly those bytes (incremental features appends),
+    only the rows past them are parsed; otherwise the file was rewritten,
+    so its vectors are dropped and it is read again in full. A different
+    column set rebuilds the index.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for the similarity index. Run: python -m pip install numpy")
+        return None
+
+    index = None
+    index_path = Path(index_file)
+    if index_path.exists():
+        try:
+            index = SimilarityIndex.load(index_path)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Rebuilding similarity index ({exc}).")
+
+    updated = 0
+    for features_file in features_files:
+        path = Path(features_file)
+        if not path.exists():
+            print(f"Features file not found: {features_file}")
+            continue
+        with path.open("r", newline="", encoding="utf-8") as file:
+            header = next(csv.reader(file), [])
+        columns = similarity_columns(header)
+        if index is not None and index.columns != columns:
+            print(f"Feature columns in {features_file} differ from the index; rebuilding it.")
+            index = None
+        if index is None:
+            index = SimilarityIndex.empty(np, columns)
+
+        source = str(path.resolve())
+        saved = index.files.get(source)
+        offset, new_bytes, crc = _read_new_bytes(path, saved)
+        if offset == 0:
+            # New or rewritten file: its old vectors may not be in it any more.
+            index.drop_source(source)
+        elif not new_bytes:
+            continue
+        text = new_bytes.decode("utf-8")
+        updated += index.apply_rows(_read_feature_rows(text, header, columns, source))
+        index.files[source] = {"size": offset + len(new_bytes), "crc": crc}
+
+    if index is None:
+        return None
+    index.save(index_path)
+    print(f"Similarity index: {len(index)} player seasons, {updated} updated.")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find statistically similar players")
+    parser.add_argument("--index-file", default="player_similarity.npz")
+    parser.add_argument("--features-files", default="", help="Comma-separated features CSVs to add first.")
+    parser.add_argument("--player-id", default="")
+    parser.add_argument("--season", type=int, default=None)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--same-season", action="store_true")
+    args = parser.parse_args()
+
+    features_files = [name.strip() for name in args.features_files.split(",") if name.strip()]
+    if features_files:
+        index = update_similarity_index(features_files, args.index_file)
+    elif Path(args.index_file).exists():
+        index = SimilarityIndex.load(args.index_file)
+    else:
+        print(f"No similarity index at {args.index_file}; pass --features-files to build one.")
+        return
+    if index is None or not args.player_id:
+        return
+
+    matches = index.most_similar(args.player_id, args.season, k=args.k, same_season=args.same_season)
+    if not matches:
+        print(f"Player {args.player_id} is not in the index.")
+        return
+    for player_id, season, name, similarity in matches:
+        print(f"  {name} ({player_id}, {season}) {similarity:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from itertools import zip_longest
+from pathlib import Path
+
+from game_information import PLAYER_STATS_FIELDS
+
+
+STATS_CACHE_VERSION = 2
+
+ID_FIELDS = ["Game ID", "Player ID", "TEAM ID"]
+TEXT_FIELDS = ["Date", "Player Name", "Team Name"]
+DAY_COLUMN = "Day"
+
+INT32_MAX = 2**31 - 1
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        print("numpy is required for the stats cache. Run: python -m pip install numpy")
+        raise
+    return numpy
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
+def stats_cache_dir(stats_file):
+    return Path(f"{stats_file}.cache")
+
+
+def _column_filename(field, suffix=""):
+    safe = "".join(ch if ch.isalnum() else "_" for ch in field.lower())
+    return f"{safe}{suffix}.npy"
+
+
+def _source_signature(stats_path):
+    stat = stats_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_text_columns(stats_path, fields):
+    with stats_path.open("r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None) or []
+        positions = {name: idx for idx, name in enumerate(header)}
+        transposed = list(zip_longest(*(row for row in reader if row), fillvalue=""))
+
+    row_count = len(transposed[0]) if transposed else 0
+    columns = {}
+    for field in fields:
+        idx = positions.get(field)
+        if idx is None or idx >= len(transposed):
+            columns[field] = ("",) * row_count
+        else:
+            columns[field] = transposed[idx]
+    return row_count, columns
+
+
+def _int32_ids(np, values):
+    """int32 array when every value is a canonical integer that fits, else None."""
+    try:
+        numbers = [int(value) for value in values]
+    except ValueError:
+        return None
+    if any(
+        not 0 <= number <= INT32_MAX or str(number) != value
+        for number, value in zip(numbers, values)
+    ):
+        return None
+    return np.array(numbers, dtype=np.int32)
+
+
+def _day_numbers(np, values):
+    cache = {}
+    days = []
+    for text in values:
+        day = cache.get(text)
+        if day is None:
+            try:
+                day = datetime.strptime(text, "%m/%d/%y").date().toordinal()
+            except Exception:
+                day = -1
+            cache[text] = day
+        days.append(day)
+    return np.array(days, dtype=np.int32)
+
+
+def _stat_values(np, values):
+    """float32 when it holds every value exactly, float64 otherwise."""
+    try:
+        wide = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        wide = np.array([_to_float(value) for value in values], dtype=np.float64)
+    narrow = wide.astype(np.float32)
+    if np.array_equal(narrow.astype(np.float64), wide, equal_nan=True):
+        return narrow
+    return wide
+
+
+def _save_array(np, cache_dir, filename, array):
+    with (cache_dir / filename).open("wb") as file:
+        np.save(file, array)
+
+
+def _build_started(build):
+    try:
+        return int(build.split("-")[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _prune_builds(cache_dir, build, previous):
+    """Remove finished builds started before ``build`` except ``previous``.
+
+    Builds started later belong to a concurrent rebuild that has not
+    swapped its manifest in yet. Files from unversioned caches go too.
+    """
+    for path in cache_dir.iterdir():
+        if (
+            path.is_dir()
+            and path.name.startswith("build-")
+            and path.name != previous
+            and _build_started(path.name) < _build_started(build)
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.is_file() and path.suffix == ".npy":
+            path.unlink(missing_ok=True)
+
+
+def build_stats_cache(stats_file):
+    """Parse the player stats CSV once into typed .npy columns.
+
+    IDs become int32 (or category codes when they are not plain integers),
+    dates become day numbers plus their original text, and every field in
+    PLAYER_STATS_FIELDS becomes float32 unless float32 would round a value.
+
+    Every build writes a fresh ``build-*`` directory, renames it into place
+    when complete and then swaps manifest.json to point at it, so a reader
+    that read the old manifest still sees one consistent set of columns.
+    The previous build is kept for such readers; older ones are removed.
+    """
+    np = _numpy()
+    stats_path = Path(stats_file)
+    signature = _source_signature(stats_path)
+    cache_dir = stats_cache_dir(stats_file)
+    build = f"build-{time.time_ns()}-{os.getpid()}"
+    build_dir = cache_dir / f"tmp-{build}"
+    build_dir.mkdir(parents=True)
+
+    row_count, text = _read_text_columns(stats_path, ID_FIELDS + TEXT_FIELDS + PLAYER_STATS_FIELDS)
+    columns = {}
+
+    days = _day_numbers(np, text["Date"])
+    _save_array(np, build_dir, _column_filename(DAY_COLUMN), days)
+    columns[DAY_COLUMN] = {"kind": "day", "file": _column_filename(DAY_COLUMN)}
+
+    for field in ID_FIELDS + TEXT_FIELDS:
+        ids = _int32_ids(np, text[field]) if field in ID_FIELDS else None
+        if ids is not None:
+            _save_array(np, build_dir, _column_filename(field), ids)
+            columns[field] = {"kind": "int32", "file": _column_filename(field)}
+            continue
+        values, codes = np.unique(np.array(text[field], dtype=str), return_inverse=True)
+        _save_array(np, build_dir, _column_filename(field), codes.astype(np.int32))
+        _save_array(np, build_dir, _column_filename(field, ".values"), values)
+        columns[field] = {
+            "kind": "category",
+            "file": _column_filename(field),
+            "values": _column_filename(field, ".values"),
+        }
+
+    for field in PLAYER_STATS_FIELDS:
+        values = _stat_values(np, text[field])
+        _save_array(np, build_dir, _column_filename(field), values)
+        columns[field] = {"kind": values.dtype.name, "file": _column_filename(field)}
+
+    build_dir.rename(cache_dir / build)
+    manifest = {
+        "version": STATS_CACHE_VERSION,
+        "source": signature,
+        "rows": row_count,
+        "build": build,
+        "columns": columns,
+    }
+    previous = _load_manifest(cache_dir) or {}
+    manifest_path = cache_dir / "manifest.json"
+    temp_path = cache_dir / f"manifest.json.{os.getpid()}.tmp"
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+    temp_path.replace(manifest_path)
+    _prune_builds(cache_dir, build, previous.get("build"))
+    return manifest
+
+
+def _load_manifest(cache_dir):
+    manifest_path = cache_dir / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    try:
+        with manifest_path.open("r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_is_current(manifest, stats_path):
+    return (
+        manifest is not None
+        and manifest.get("version") == STATS_CACHE_VERSION
+        and manifest.get("source") == _source_signature(stats_path)
+    )
+
+
+class PlayerStatsColumns:
+    """Memory-mapped view of a cached player stats CSV.
+
+    Every column of the manifest's build is opened up front, so all of them
+    come from the same build even if the cache is rebuilt afterwards.
+    ``values(field)`` returns the stored array (day numbers, int32 IDs,
+    float32/float64 stats, or category codes); ``text(field)`` returns the
+    original CSV strings for ID, date and name fields.
+    """
+
+    def __init__(self, np, cache_dir, manifest, mmap_mode="r"):
+        self.np = np
+        self.cache_dir = cache_dir
+        self.manifest = manifest
+        self.mmap_mode = mmap_mode
+        self.rows = manifest["rows"]
+        build_dir = cache_dir / manifest["build"]
+        self._arrays = {}
+        for column in manifest["columns"].values():
+            for key in ("file", "values"):
+                filename = column.get(key)
+                if filename:
+                    self._arrays[filename] = np.load(build_dir / filename, mmap_mode=mmap_mode)
+        for field, column in manifest["columns"].items():
+            if len(self._arrays[column["file"]]) != self.rows:
+                raise ValueError(f"Stats cache column {field} does not have {self.rows} rows")
+
+    def __len__(self):
+        return self.rows
+
+    def values(self, field):
+        return self._arrays[self.manifest["columns"][field]["file"]]
+
+    def days(self):
+        return self.values(DAY_COLUMN)
+
+    def text(self, field):
+        column = self.manifest["columns"][field]
+        if column["kind"] == "category":
+            return self._arrays[column["values"]][self._arrays[column["file"]]].tolist()
+        return self._arrays[column["file"]].astype(str).tolist()
+
+
+def load_player_stats(stats_file, mmap_mode="r", rebuild=True):
+    """Cached typed columns for ``stats_file``, rebuilt when its size or mtime changes.
+
+    Returns None when there is no stats file, or when the cache is stale and
+    ``rebuild`` is false.
+    """
+    np = _numpy()
+    stats_path = Path(stats_file)
+    if not stats_path.exists() or stats_path.stat().st_size == 0:
+        return None
+    cache_dir = stats_cache_dir(stats_file)
+    manifest = _load_manifest(cache_dir)
+    if _cache_is_current(manifest, stats_path):
+        try:
+            return PlayerStatsColumns(np, cache_dir, manifest, mmap_mode=mmap_mode)
+        except (OSError, ValueError, KeyError):
+            # Pruned by two rebuilds since the manifest was read, or damaged.
+            pass
+    if not rebuild:
+        return None
+    manifest = build_stats_cache(stats_file)
+    return PlayerStatsColumns(np, cache_dir, manifest, mmap_mode=mmap_mode)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typed column cache of a player stats CSV")
+    parser.add_argument("player_stats_file")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache is current.")
+    args = parser.parse_args()
+
+    if args.force:
+        build_stats_cache(args.player_stats_file)
+    columns = load_player_stats(args.player_stats_file)
+    if columns is None:
+        print(f"No player stats found at {args.player_stats_file}")
+        return
+    for field, column in columns.manifest["columns"].items():
+        print(f"{field}: {column['kind']}")
+    print(f"Cached {len(columns)} rows in {stats_cache_dir(args.player_stats_file)}")
+
+
+if __name__ == "__main__":
+    main()
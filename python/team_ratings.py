@@ -0,0 +1,294 @@
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+
+from csv_utils import ensure_csv_header
+from schedule_index import ScheduleIndex
+
+
+RATINGS_HEADER = [
+    "Season",
+    "TEAM ID",
+    "Team Name",
+    "Games",
+    "Adj Off",
+    "Adj Def",
+    "Adj Margin",
+]
+RATINGS_STATE_VERSION = 1
+# Ridge penalty on every offense/defense rating, in squared points per 100
+# possessions; keeps teams with one or two games near average.
+DEFAULT_RIDGE = 1.0
+DEFAULT_TOLERANCE = 1e-8
+MAX_ITERATIONS = 2000
+
+
+def ratings_state_path(ratings_file):
+    return Path(f"{ratings_file}.state.json")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def estimate_possessions(row):
+    """FGA - OREB + TO + 0.475 * FTA from a TEAM_STATS_HEADER row dict."""
+    return (
+        _to_float(row.get("FGA"))
+        - _to_float(row.get("OREB"))
+        + _to_float(row.get("TO"))
+        + 0.475 * _to_float(row.get("FTA"))
+    )
+
+
+def load_rating_games(team_stats_file, schedule_file):
+    """[(team_id, opponent_id, points per 100 possessions, location)] plus team names.
+
+    Every game with both team rows gives one observation per side. Game
+    possessions are the mean of the two teams' estimates; location is 1 for
+    the home side, -1 for the away side and 0 at a neutral site or when the
+    game is missing from the schedule.
+    """
+    games = {}
+    names = {}
+    team_stats_path = Path(team_stats_file)
+    if not team_stats_path.exists():
+        return [], names
+    with team_stats_path.open("r", newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            game_id = (row.get("Game ID") or "").strip()
+            team_id = (row.get("TEAM ID") or "").strip()
+            if not game_id or not team_id:
+                continue
+            names[team_id] = row.get("Team Name") or names.get(team_id, "")
+            games.setdefault(game_id, {})[team_id] = (
+                _to_float(row.get("PTS")),
+                estimate_possessions(row),
+            )
+
+    schedule = ScheduleIndex.from_csv(schedule_file)
+    observations = []
+    for game_id, sides in games.items():
+        if len(sides) != 2:
+            continue
+        (team_a, (points_a, poss_a)), (team_b, (points_b, poss_b)) = sides.items()
+        possessions = (poss_a + poss_b) / 2
+        if possessions <= 0:
+            continue
+        game = schedule.get(game_id)
+        home = str(game.home_team_id) if game is not None and not game.neutral_site else None
+        for team, opponent, points in ((team_a, team_b, points_a), (team_b, team_a, points_b)):
+            location = 0 if home is None else (1 if team == home else -1)
+            observations.append((team, opponent, 100 * points / possessions, location))
+    return observations, names
+
+
+def find_season_files(base_dir):
+    """season -> (team stats, schedule) for every <season>/ folder main.py wrote under ``base_dir``."""
+    season_files = {}
+    for team_stats_path in sorted(Path(base_dir).glob("*/*_cbb_team_stats.csv")):
+        season = team_stats_path.parent.name
+        if not season.isdigit() or team_stats_path.name != f"{season}_cbb_team_stats.csv":
+            continue
+        schedule_path = team_stats_path.with_name(f"{season}_cbb_available_games.csv")
+        season_files[int(season)] = (str(team_stats_path), str(schedule_path))
+    return season_files
+
+
+def solve_ratings(np, sparse, lsqr, observations, ridge=DEFAULT_RIDGE, previous=None, tolerance=DEFAULT_TOLERANCE):
+    """Least-squares team ratings; returns ({column: value}, iterations).
+
+    ``observations`` is [(season, team_id, opponent_id, efficiency, location)]
+    and the model is
+
+        efficiency = avg[season] + home[season] * location + off[team] - def[opponent]
+
+    with one column per season average and home edge, and one offense and
+    one defense column per (season, team). The sparse design matrix has
+    four non-zeros per row. The ridge is appended as extra rows rather
+    than LSQR's damping so a warm start from ``previous`` solves exactly
+    the same problem; the ridge also fixes the ratings' level, since the
+    optimum has zero-mean offense and defense within each season.
+    """
+    columns = {}
+
+    def column(key):
+        index = columns.get(key)
+        if index is None:
+            index = columns[key] = len(columns)
+        return index
+
+    rows = []
+    cols = []
+    values = []
+    targets = []
+    for row, (season, team, opponent, efficiency, location) in enumerate(observations):
+        entries = [
+            (column(f"{season}:avg"), 1.0),
+            (column(f"{season}:{team}:off"), 1.0),
+            (column(f"{season}:{opponent}:def"), -1.0),
+        ]
+        if location:
+            entries.append((column(f"{season}:home"), float(location)))
+        for col, value in entries:
+            rows.append(row)
+            cols.append(col)
+            values.append(value)
+        targets.append(efficiency)
+
+    rated = [index for key, index in columns.items() if key.endswith((":off", ":def"))]
+    first_ridge_row = len(observations)
+    penalty = float(np.sqrt(ridge))
+    for offset, index in enumerate(rated):
+        rows.append(first_ridge_row + offset)
+        cols.append(index)
+        values.append(penalty)
+    targets.extend([0.0] * len(rated))
+
+    design = sparse.csr_matrix(
+        (np.array(values), (np.array(rows), np.array(cols))),
+        shape=(len(targets), len(columns)),
+    )
+    x0 = np.zeros(len(columns))
+    if previous:
+        for key, index in columns.items():
+            x0[index] = previous.get(key, 0.0)
+    # New seasons start from their mean efficiency rather than zero.
+    for key, index in columns.items():
+        if key.endswith(":avg") and not (previous and key in previous):
+            season = key.split(":", 1)[0]
+            season_values = [obs[3] for obs in observations if str(obs[0]) == season]
+            x0[index] = float(np.mean(season_values)) if season_values else 0.0
+
+    # Scale columns to unit norm: the season average and home columns touch
+    # every row of a season and would otherwise dominate the conditioning.
+    column_norms = np.sqrt(np.asarray(design.multiply(design).sum(axis=0)).ravel())
+    column_norms[column_norms == 0] = 1.0
+    result = lsqr(
+        design @ sparse.diags(1.0 / column_norms),
+        np.array(targets),
+        x0=x0 * column_norms,
+        atol=tolerance,
+        btol=tolerance,
+        iter_lim=MAX_ITERATIONS,
+    )
+    solution, iterations = result[0] / column_norms, result[2]
+    return {key: float(solution[index]) for key, index in columns.items()}, int(iterations)
+
+
+def _load_ratings_state(ratings_file, ridge):
+    state_path = ratings_state_path(ratings_file)
+    if not state_path.exists():
+        return None
+    try:
+        with state_path.open("r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != RATINGS_STATE_VERSION or state.get("ridge") != ridge:
+        return None
+    return state.get("solution")
+
+
+def update_team_ratings(season_files, ratings_file, ridge=DEFAULT_RIDGE, warm_start=True):
+    """Rate every team in ``season_files`` (season -> (team stats, schedule)).
+
+    Writes RATINGS_HEADER rows for all seasons to ``ratings_file`` and the
+    full solution to its .state.json, which warm-starts the next run so a
+    nightly update with a few new games converges in a few iterations.
+    Returns the number of team seasons rated.
+    """
+    try:
+        import numpy as np
+        from scipy import sparse
+        from scipy.sparse.linalg import lsqr
+    except ImportError:
+        print("numpy and scipy are required for team ratings. Run: python -m pip install numpy scipy")
+        return 0
+
+    started = time.perf_counter()
+    observations = []
+    names = {}
+    games = {}
+    for season, (team_stats_file, schedule_file) in sorted(season_files.items()):
+        season_observations, season_names = load_rating_games(team_stats_file, schedule_file)
+        names.update(season_names)
+        for team, opponent, efficiency, location in season_observations:
+            observations.append((season, team, opponent, efficiency, location))
+            games[(season, team)] = games.get((season, team), 0) + 1
+    if not observations:
+        print("No completed games with both team stat rows; no ratings written.")
+        return 0
+    load_seconds = time.perf_counter() - started
+
+    previous = _load_ratings_state(ratings_file, ridge) if warm_start else None
+    started = time.perf_counter()
+    solution, iterations = solve_ratings(np, sparse, lsqr, observations, ridge=ridge, previous=previous)
+    solve_seconds = time.perf_counter() - started
+
+    rows = []
+    for season, team in sorted(games, key=lambda key: (key[0], int(key[1]) if key[1].isdigit() else 0, key[1])):
+        average = solution[f"{season}:avg"]
+        offense = solution[f"{season}:{team}:off"]
+        defense = solution.get(f"{season}:{team}:def", 0.0)
+        rows.append(
+            [
+                season,
+                team,
+                names.get(team, ""),
+                games[(season, team)],
+                round(average + offense, 2),
+                round(average - defense, 2),
+                round(offense + defense, 2),
+            ]
+        )
+
+    ratings_path = Path(ratings_file)
+    temp_path = ratings_path.with_name(f"{ratings_path.name}.tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+    ensure_csv_header(temp_path, RATINGS_HEADER)
+    with temp_path.open("a", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows(rows)
+    temp_path.replace(ratings_path)
+
+    state_path = ratings_state_path(ratings_file)
+    temp_state = state_path.with_name(f"{state_path.name}.tmp")
+    with temp_state.open("w", encoding="utf-8") as file:
+        json.dump({"version": RATINGS_STATE_VERSION, "ridge": ridge, "solution": solution}, file)
+    temp_state.replace(state_path)
+
+    print(
+        f"Rated {len(rows)} team seasons from {len(observations) // 2} games in "
+        f"{load_seconds + solve_seconds:.2f}s ({iterations} LSQR iterations, "
+        f"{'warm' if previous else 'cold'} start)."
+    )
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Opponent-adjusted team efficiency ratings")
+    parser.add_argument("--data-dir", default=".", help="Folder holding main.py's <season>/ output folders.")
+    parser.add_argument("--seasons", default="", help="Comma-separated seasons (default: every season found).")
+    parser.add_argument("--ratings-file", default="team_ratings.csv")
+    parser.add_argument("--ridge", type=float, default=DEFAULT_RIDGE)
+    parser.add_argument("--cold-start", action="store_true", help="Ignore the saved solution.")
+    args = parser.parse_args()
+
+    season_files = find_season_files(args.data_dir)
+    if args.seasons:
+        wanted = {int(season) for season in args.seasons.split(",") if season.strip()}
+        season_files = {season: files for season, files in season_files.items() if season in wanted}
+    if not season_files:
+        print(f"No <season>/<season>_cbb_team_stats.csv files found under {args.data_dir}.")
+        return
+    update_team_ratings(season_files, args.ratings_file, ridge=args.ridge, warm_start=not args.cold_start)
+
+
+if __name__ == "__main__":
+    main()
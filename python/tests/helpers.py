@@ -0,0 +1,46 @@
+import csv
+import random
+from datetime import date, timedelta
+
+from game_information import PLAYER_STATS_HEADER
+
+
+def make_stats_rows(players=20, games=8, seed=1, season=2025, start_game=0, minutes=None):
+    """Shuffled PLAYER_STATS_HEADER rows: ``players`` players on teams of 5, one game every 3 days."""
+    rnd = random.Random(seed)
+    rows = []
+    start = date(season - 1, 11, 5)
+    for game in range(start_game, start_game + games):
+        game_date = (start + timedelta(days=3 * game)).strftime("%m/%d/%y")
+        for team in range(players // 5):
+            game_id = str(400000000 + game * 1000 + team)
+            for slot in range(5):
+                player_id = 1000 + team * 5 + slot
+                fga = rnd.randint(0, 15)
+                fgm = rnd.randint(0, fga)
+                tpa = rnd.randint(0, min(fga, 7))
+                tpm = rnd.randint(0, min(fgm, tpa))
+                fta = rnd.randint(0, 8)
+                ftm = rnd.randint(0, fta)
+                oreb = rnd.randint(0, 4)
+                dreb = rnd.randint(0, 8)
+                played = rnd.choice([0, 4, 12, 22, 31]) if minutes is None else minutes
+                stats = [
+                    2 * (fgm - tpm) + 3 * tpm + ftm, fgm, fga, tpm, tpa, ftm, fta,
+                    oreb + dreb, rnd.randint(0, 8), rnd.randint(0, 5), rnd.randint(0, 3),
+                    rnd.randint(0, 3), oreb, dreb, rnd.randint(0, 5), played,
+                ]
+                rows.append(
+                    [game_date, game_id, str(player_id), f"Player {player_id}", *stats, str(team), f"Team {team}"]
+                )
+    rnd.shuffle(rows)
+    return rows
+
+
+def write_stats(path, rows, mode="w"):
+    with open(path, mode, newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        if mode == "w":
+            writer.writerow(PLAYER_STATS_HEADER)
+        writer.writerows(rows)
+    return path
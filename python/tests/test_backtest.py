@@ -0,0 +1,31 @@
+import csv
+
+from backtest import BACKTEST_HEADER, run_backtest
+from helpers import make_stats_rows, write_stats
+
+
+def _backtest(tmp_path, **kwargs):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=15, games=12))
+    return run_backtest(
+        stats,
+        tmp_path / "report.csv",
+        alphas=(0.5, 2.0),
+        min_games_values=(1, 3),
+        min_minutes_values=(0,),
+        half_lives=(0, 30),
+        n_splits=2,
+        **kwargs,
+    )
+
+
+def test_workers_match_single_process(tmp_path):
+    single = _backtest(tmp_path)
+    assert len(single) == 2 * 2 * 2 * 2 * 2
+    with open(tmp_path / "report.csv", newline="", encoding="utf-8") as file:
+        assert next(csv.reader(file)) == BACKTEST_HEADER
+    assert _backtest(tmp_path, workers=2) == single
+
+
+def test_too_few_samples(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=5, games=1))
+    assert run_backtest(stats, tmp_path / "report.csv") == []
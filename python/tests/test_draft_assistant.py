@@ -0,0 +1,69 @@
+import random
+
+from draft_assistant import DraftAssistant, draft_pick_order
+
+
+def _replacement(remaining, position, open_slots):
+    values = sorted((value for positions, value in remaining.values() if position in positions), reverse=True)
+    return values[open_slots] if len(values) > open_slots else 0.0
+
+
+def test_incremental_board_matches_recomputed_board():
+    rnd = random.Random(11)
+    choices = ["C", "F", "G", "Guard", "", "F", "F/C", "G/F", "PG"]
+    players = [(index, rnd.choice(choices), float(rnd.randint(0, 30))) for index in range(90)]
+    teams = [1, 2, 3, 4]
+    assistant = DraftAssistant(players, teams, bench_slots=1)
+    remaining = {
+        player_id: (assistant.positions[player_id], value)
+        for player_id, _p, value in players
+        if player_id in assistant.positions
+    }
+    assert remaining[next(pid for pid, position, _v in players if position == "F/C")][0] == ["C", "F"]
+
+    while assistant.on_the_clock() is not None:
+        team = assistant.on_the_clock()
+        for position in assistant.starter_slots:
+            expected = _replacement(remaining, position, assistant.league_open[position])
+            assert assistant.replacement[position] == expected
+
+        recommended = assistant.recommend(k=3)
+        candidate_positions = assistant._candidate_positions(team)
+        best = []
+        for player_id, (positions, value) in remaining.items():
+            vors = [value - assistant.replacement[position] for position in positions if position in candidate_positions]
+            if vors:
+                best.append((max(vors), value))
+                assert assistant.vor(player_id) == max(value - assistant.replacement[p] for p in positions)
+        expected = sorted(best, key=lambda item: (-item[0], -item[1]))[:3]
+        assert [(vor, value) for _player, _position, value, vor in recommended] == expected
+        assert len({player for player, *_rest in recommended}) == len(recommended)
+
+        if not recommended:
+            break
+        # Mix best picks with reaches so the board moves in both ways.
+        choice = recommended[0][0] if rnd.random() < 0.7 else rnd.choice(list(remaining))
+        assistant.pick(choice)
+        remaining.pop(choice)
+        assert assistant.vor(choice) is None
+
+    assert assistant.pick_number == len(draft_pick_order(teams, 5 + 2 + 1))
+
+
+def test_compound_position_fills_first_open_slot():
+    players = [(1, "F/C", 20.0), (2, "C", 15.0), (3, "G/F", 10.0)]
+    assistant = DraftAssistant(players, [1], bench_slots=0)
+    # Listed once, where its VOR is best: F has no replacement-level player left.
+    assert assistant.recommend(k=3) == [(1, "F", 20.0, 20.0), (3, "F", 10.0, 10.0), (2, "C", 15.0, 0.0)]
+    assert assistant.pick(2) == "C"
+    # C is filled, so the F/C player takes an F slot.
+    assert assistant.pick(1) == "F"
+    assert assistant.league_open == {"C": 0, "F": 1, "G": 2}
+    assert assistant.pick(3) == "F"
+
+
+def test_empty_pool():
+    assistant = DraftAssistant([], [1, 2])
+    assert assistant.recommend(k=5) == []
+    assert assistant.replacement == {"C": 0.0, "F": 0.0, "G": 0.0}
+    assert assistant.pick("unknown") == "T"
@@ -0,0 +1,50 @@
+from espn_ingest import run_post_sync_step
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.table = params[0]
+
+    def fetchone(self):
+        return (self.table if self.table in self.conn.tables else None,)
+
+
+class _Conn:
+    def __init__(self, tables):
+        self.tables = set(tables)
+        self.rollbacks = 0
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_post_sync_step_skips_missing_table(capsys):
+    calls = []
+    conn = _Conn([])
+    assert not run_post_sync_step(conn, "matchup odds", "fantasy_matchup_odds", lambda: calls.append(1))
+    assert calls == []
+    assert "--apply-schema" in capsys.readouterr().out
+
+
+def test_post_sync_step_logs_failures(capsys):
+    conn = _Conn(["fantasy_free_agents"])
+
+    def fail():
+        raise RuntimeError("boom")
+
+    assert not run_post_sync_step(conn, "free agents", "fantasy_free_agents", fail)
+    assert conn.rollbacks == 1
+    assert "Free agents refresh failed: boom" in capsys.readouterr().out
+    assert run_post_sync_step(conn, "free agents", "fantasy_free_agents", lambda: None)
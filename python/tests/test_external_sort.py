@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+import external_sort
+from external_sort import external_sort as sort_external
+
+
+def _items(count, seed=1):
+    rnd = random.Random(seed)
+    # Few distinct keys, so stability is exercised; the index records input order.
+    return [(rnd.randint(0, 20), index) for index in range(count)]
+
+
+@pytest.mark.parametrize("count,buffer_rows", [(0, 1), (1, 1), (5, 100), (100, 1), (1000, 7), (1000, 1000)])
+def test_matches_sorted(tmp_path, count, buffer_rows):
+    items = _items(count)
+    key = lambda item: item[0]
+    assert list(sort_external(iter(items), key, buffer_rows=buffer_rows, temp_dir=tmp_path)) == sorted(items, key=key)
+
+
+def test_multi_pass_merge_keeps_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_sort, "MAX_MERGE_RUNS", 3)
+    monkeypatch.setattr(external_sort, "RUN_CHUNK_ROWS", 2)
+    items = _items(500, seed=2)
+    key = lambda item: item[0]
+    assert list(sort_external(items, key, buffer_rows=9, temp_dir=tmp_path)) == sorted(items, key=key)
+
+
+def test_rejects_empty_buffer():
+    with pytest.raises(ValueError):
+        list(sort_external([], lambda item: item, buffer_rows=0))
@@ -0,0 +1,197 @@
+import json
+
+import numpy as np
+import pytest
+
+from feature_builder import FEATURES_HEADER, build_player_datasets, build_player_features, feature_state_path
+from helpers import make_stats_rows, write_stats
+from ml_model import build_player_pts_dataset, train_player_pts_model
+from rolling_features import RollingFeatureSet
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+@pytest.mark.parametrize("incremental", [False, True])
+def test_header_only_stats_writes_empty_features(tmp_path, engine, incremental):
+    stats = write_stats(tmp_path / "stats.csv", [])
+    features = tmp_path / "features.csv"
+    assert build_player_features(stats, features, engine=engine, incremental=incremental) == 0
+    assert _read(features).splitlines() == [",".join(FEATURES_HEADER)]
+    if incremental:
+        state = json.loads(feature_state_path(features).read_text())
+        assert state["players"] == {}
+        assert "watermark" not in state
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_all_rows_below_min_minutes(tmp_path, engine):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(minutes=2))
+    features = tmp_path / "features.csv"
+    assert build_player_features(stats, features, min_minutes=5, engine=engine) == 0
+    assert _read(features).splitlines() == [",".join(FEATURES_HEADER)]
+
+
+def test_numpy_matches_python(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=30, games=10))
+    build_player_features(stats, tmp_path / "py.csv", engine="python")
+    build_player_features(stats, tmp_path / "np.csv", engine="numpy")
+    assert _read(tmp_path / "np.csv") == _read(tmp_path / "py.csv")
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_incremental_from_empty_matches_full(tmp_path, engine):
+    stats = write_stats(tmp_path / "stats.csv", [])
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, engine=engine, incremental=True)
+
+    write_stats(stats, sorted(make_stats_rows(games=4), key=lambda row: row[1]), mode="a")
+    build_player_features(stats, features, engine=engine, incremental=True)
+    write_stats(stats, sorted(make_stats_rows(games=3, start_game=4, seed=2), key=lambda row: row[1]), mode="a")
+    build_player_features(stats, features, engine=engine, incremental=True)
+
+    build_player_features(stats, tmp_path / "full.csv", engine=engine)
+    assert sorted(_read(features).splitlines()) == sorted(_read(tmp_path / "full.csv").splitlines())
+
+
+@pytest.mark.parametrize("engine,stats_cache", [("python", False), ("numpy", False), ("numpy", True)])
+@pytest.mark.parametrize("players", [2, 30])
+def test_workers_match_single_process(tmp_path, engine, stats_cache, players):
+    rows = make_stats_rows(players=30, games=6)
+    if players == 2:
+        # Two players leave most of the four shards empty.
+        rows = [row for row in rows if row[2] in ("1000", "1001")]
+    stats = write_stats(tmp_path / "stats.csv", rows)
+    rolling = RollingFeatureSet((3,), (2.0,))
+    build_player_features(stats, tmp_path / "single.csv", engine=engine, rolling=rolling)
+    written = build_player_features(
+        stats,
+        tmp_path / "multi.csv",
+        engine=engine,
+        rolling=RollingFeatureSet((3,), (2.0,)),
+        stats_cache=stats_cache,
+        workers=4,
+    )
+    assert written == len(_read(tmp_path / "single.csv").splitlines()) - 1
+    assert _read(tmp_path / "multi.csv") == _read(tmp_path / "single.csv")
+    assert not list(tmp_path.glob("multi.csv.*shard*"))
+
+
+def test_workers_on_header_only_stats(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", [])
+    assert build_player_features(stats, tmp_path / "multi.csv", workers=3) == 0
+    assert _read(tmp_path / "multi.csv").splitlines() == [",".join(FEATURES_HEADER)]
+    assert not list(tmp_path.glob("multi.csv.*shard*"))
+
+
+@pytest.mark.parametrize("rolling", [None, (1, 4)])
+@pytest.mark.parametrize("min_minutes", [0, 15])
+@pytest.mark.parametrize("players,games", [(5, 1), (30, 10)])
+def test_engines_match_on_variants(tmp_path, rolling, min_minutes, players, games):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=players, games=games, seed=games))
+    outputs = {}
+    for engine in ("python", "numpy"):
+        features_set = RollingFeatureSet(rolling, (1.5,)) if rolling else None
+        outputs[engine] = tmp_path / f"{engine}.csv"
+        build_player_features(stats, outputs[engine], min_minutes=min_minutes, engine=engine, rolling=features_set)
+    assert _read(outputs["numpy"]) == _read(outputs["python"])
+
+
+def test_stats_cache_matches_csv_with_text_ids(tmp_path):
+    rows = make_stats_rows(players=15, games=5)
+    for row in rows:
+        # Non-integer player IDs take the category-code path of the cache.
+        row[2] = f"p{row[2]}"
+    stats = write_stats(tmp_path / "stats.csv", rows)
+    build_player_features(stats, tmp_path / "csv.csv", engine="python")
+    build_player_features(stats, tmp_path / "cached.csv", engine="numpy", stats_cache=True)
+    assert _read(tmp_path / "cached.csv") == _read(tmp_path / "csv.csv")
+
+
+@pytest.mark.parametrize("buffer_rows", [1, 7, 100000])
+def test_external_sort_matches_in_memory(tmp_path, buffer_rows):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=20, games=6))
+    rolling = RollingFeatureSet((3,), (2.0,))
+    build_player_features(stats, tmp_path / "memory.csv", engine="python", rolling=rolling)
+    build_player_features(
+        stats, tmp_path / "sorted.csv", engine="python", rolling=RollingFeatureSet((3,), (2.0,)),
+        sort_buffer_rows=buffer_rows,
+    )
+    assert _read(tmp_path / "sorted.csv") == _read(tmp_path / "memory.csv")
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_incremental_with_rolling_matches_full(tmp_path, engine):
+    stats = write_stats(tmp_path / "stats.csv", sorted(make_stats_rows(games=5), key=lambda row: row[1]))
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, engine=engine, incremental=True, rolling=RollingFeatureSet((3,), (2.0,)))
+    for game in (5, 6):
+        rows = sorted(make_stats_rows(games=1, start_game=game, seed=game), key=lambda row: row[1])
+        write_stats(stats, rows, mode="a")
+        build_player_features(stats, features, engine=engine, incremental=True, rolling=RollingFeatureSet((3,), (2.0,)))
+    build_player_features(stats, tmp_path / "full.csv", engine=engine, rolling=RollingFeatureSet((3,), (2.0,)))
+    assert sorted(_read(features).splitlines()) == sorted(_read(tmp_path / "full.csv").splitlines())
+
+
+@pytest.mark.parametrize("games", [1, 8])
+def test_single_pass_datasets_match_separate_builds(tmp_path, games):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=15, games=games))
+    rolling = RollingFeatureSet((3,), (2.0,))
+    written, store = build_player_datasets(
+        stats, tmp_path / "features.csv", tmp_path / "dataset.csv", rolling=rolling, as_arrays=True
+    )
+    build_player_features(stats, tmp_path / "alone.csv", engine="python", rolling=RollingFeatureSet((3,), (2.0,)))
+    assert _read(tmp_path / "features.csv") == _read(tmp_path / "alone.csv")
+    assert written == len(_read(tmp_path / "alone.csv").splitlines()) - 1
+
+    pts_store = build_player_pts_dataset(
+        stats, tmp_path / "pts.csv", rolling=RollingFeatureSet((3,), (2.0,)), as_arrays=True
+    )
+    assert len(store) == len(pts_store)
+    assert np.array_equal(store.features, pts_store.features)
+    assert np.array_equal(store.target("PTS"), pts_store.target("PTS"))
+    assert store.meta_rows(np.arange(len(store))) == pts_store.meta_rows(np.arange(len(pts_store)))
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_incremental_rebuilds_after_mid_file_rewrite(tmp_path, engine):
+    stats = tmp_path / "stats.csv"
+    rows = sorted(make_stats_rows(players=50, games=40), key=lambda row: row[1])
+    write_stats(stats, rows)
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, engine=engine, incremental=True, min_minutes=0)
+
+    # Same length, far from either end of the file: only a whole-file crc sees it.
+    middle = len(rows) // 2
+    rows[middle][4] ^= 1
+    write_stats(stats, rows)
+    assert stats.stat().st_size > 128 * 1024
+    write_stats(stats, make_stats_rows(players=50, games=1, start_game=40, seed=3), mode="a")
+    build_player_features(stats, features, engine=engine, incremental=True, min_minutes=0)
+
+    build_player_features(stats, tmp_path / "full.csv", engine=engine, min_minutes=0)
+    assert sorted(_read(features).splitlines()) == sorted(_read(tmp_path / "full.csv").splitlines())
+
+
+def test_training_reuses_single_pass_store(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=20, games=10))
+    samples_file = tmp_path / "samples.npz"
+    _written, store = build_player_datasets(
+        stats, tmp_path / "features.csv", tmp_path / "dataset.csv", as_arrays=True, samples_file=samples_file
+    )
+    assert store.target_names == ["PTS", "REB", "AST"]
+
+    def predictions(name, **kwargs):
+        train_player_pts_model(
+            stats, tmp_path / f"{name}.dataset.csv", tmp_path / f"{name}.joblib", tmp_path / f"{name}.csv", **kwargs
+        )
+        return _read(tmp_path / f"{name}.csv")
+
+    expected = predictions("separate")
+    assert predictions("store", store=store) == expected
+    assert predictions("saved", store=samples_file) == expected
+    assert not (tmp_path / "store.dataset.csv").exists()
+    assert train_player_pts_model(stats, None, tmp_path / "m.joblib", tmp_path / "p.csv", store=tmp_path / "none.npz") is None
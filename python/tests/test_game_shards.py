@@ -0,0 +1,74 @@
+import csv
+
+import pytest
+
+import game_shards
+from game_information import PLAYER_STATS_HEADER
+from game_shards import collect_game_shards, merge_shards, shard_for, shard_path
+from csv_utils import CsvWriterManager
+
+GAME_IDS = [str(401000 + game) for game in range(12)]
+
+
+def _player_rows(game_id):
+    return [
+        ["11/0" + str(int(game_id) % 9 + 1) + "/23", game_id, str(player)] + [""] * (len(PLAYER_STATS_HEADER) - 3)
+        for player in range(3)
+    ]
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [row for row in csv.reader(file) if row != PLAYER_STATS_HEADER]
+
+
+def _fake_game_information(game_id, player_stats_filename=None, writers=None, **_kwargs):
+    if game_id == "401005":
+        raise RuntimeError("worker died")
+    writers.writer(player_stats_filename, PLAYER_STATS_HEADER).writerows(_player_rows(game_id))
+    return {"status": "written"}
+
+
+def test_merge_shards_streams_in_schedule_order(tmp_path):
+    output = tmp_path / "stats.csv"
+    shards = 3
+    with CsvWriterManager() as writers:
+        for game_id in GAME_IDS:
+            path = shard_path(output, shard_for(game_id, shards))
+            writers.writer(path, PLAYER_STATS_HEADER).writerows(_player_rows(game_id))
+    # A duplicated row and a game outside the run are both dropped.
+    with open(shard_path(output, 0), "a", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows(_player_rows("999"))
+
+    with CsvWriterManager() as writers:
+        written = merge_shards(
+            GAME_IDS, output, PLAYER_STATS_HEADER, range(shards), game_index=1, key_indices=[1, 2],
+            seen_keys={(GAME_IDS[0], "0")}, writers=writers,
+        )
+    expected = [row for game_id in GAME_IDS for row in _player_rows(game_id)][1:]
+    assert written == len(expected)
+    assert _read_rows(output) == expected
+    assert not list(tmp_path.glob("*.shard*"))
+
+
+def test_merge_shards_without_shard_files(tmp_path):
+    output = tmp_path / "stats.csv"
+    with CsvWriterManager() as writers:
+        assert merge_shards(GAME_IDS, output, PLAYER_STATS_HEADER, [], 1, [1, 2], writers=writers) == 0
+    assert _read_rows(output) == []
+
+
+def test_failed_worker_keeps_finished_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(game_shards, "game_information", _fake_game_information)
+    output = tmp_path / "stats.csv"
+    games = [(game_id, True, False, False) for game_id in GAME_IDS]
+    with pytest.raises(RuntimeError):
+        collect_game_shards(games, str(output), processes=3)
+
+    failed = shard_for("401005", 3)
+    expected = [
+        row for game_id in GAME_IDS if shard_for(game_id, 3) != failed for row in _player_rows(game_id)
+    ]
+    assert expected
+    assert _read_rows(output) == expected
+    assert not list(tmp_path.glob("*.shard*"))
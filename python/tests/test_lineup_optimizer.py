@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from lineup_optimizer import LINEUP_SLOTS, SLOT_POSITIONS, eligible_positions, optimize_lineup
+
+POSITIONS = ["C", "F", "G", "F/C", "G/F", "", "Center"]
+
+
+def _key(lineup, points):
+    """(slots filled, starter points, T1 points, T2 points): the optimizer's objective."""
+    return (
+        len(lineup),
+        sum(points[lineup[slot]] for slot in SLOT_POSITIONS if slot in lineup),
+        points[lineup["T1"]] if "T1" in lineup else 0.0,
+        points[lineup["T2"]] if "T2" in lineup else 0.0,
+    )
+
+
+def _brute_force(players, fixed):
+    """Best objective over every assignment of players (or nobody) to the open slots."""
+    points = {player_id: value for player_id, _position, value in players}
+    positions = {player_id: eligible_positions(position) for player_id, position, _value in players}
+    open_slots = [slot for slot in LINEUP_SLOTS if slot not in fixed]
+    best = None
+
+    def assign(index, lineup, used):
+        nonlocal best
+        if index == len(open_slots):
+            key = _key(lineup, points)
+            best = key if best is None or key > best else best
+            return
+        slot = open_slots[index]
+        assign(index + 1, lineup, used)
+        for player_id in points:
+            if player_id in used:
+                continue
+            if slot in SLOT_POSITIONS and SLOT_POSITIONS[slot] not in positions[player_id]:
+                continue
+            assign(index + 1, {**lineup, slot: player_id}, used | {player_id})
+
+    assign(0, dict(fixed), set(fixed.values()))
+    return best
+
+
+def _check(players, fixed=None):
+    fixed = fixed or {}
+    lineup, starter_points = optimize_lineup(players, fixed=fixed)
+    points = {player_id: value for player_id, _position, value in players}
+    positions = {player_id: eligible_positions(position) for player_id, position, _value in players}
+
+    assert len(set(lineup.values())) == len(lineup)
+    assert all(lineup[slot] == player_id for slot, player_id in fixed.items())
+    for slot, player_id in lineup.items():
+        if slot in SLOT_POSITIONS and slot not in fixed:
+            assert SLOT_POSITIONS[slot] in positions[player_id]
+    key = _key(lineup, points)
+    assert starter_points == pytest.approx(key[1])
+    assert key == pytest.approx(_brute_force(players, fixed))
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    players = [
+        (100 + index, rnd.choice(POSITIONS), float(rnd.choice([0, 5, 5, 8, 12, rnd.randint(0, 30)])))
+        for index in range(rnd.randint(0, 8))
+    ]
+    _check(players)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force_with_fixed_slots(seed):
+    rnd = random.Random(1000 + seed)
+    players = [(100 + index, rnd.choice(POSITIONS), float(rnd.randint(0, 20))) for index in range(7)]
+    slots = rnd.sample(LINEUP_SLOTS, rnd.randint(1, 3))
+    fixed = {slot: player_id for slot, (player_id, _position, _value) in zip(slots, players)}
+    _check(players, fixed)
+
+
+def test_degenerate_rosters():
+    assert optimize_lineup([]) == ({}, 0.0)
+    # Only guards: centre and forward slots stay empty, extras go to T1/T2.
+    guards = [(index, "G", float(index)) for index in range(5)]
+    lineup, starter_points = optimize_lineup(guards)
+    assert set(lineup) == {"G1", "G2", "T1", "T2"}
+    assert starter_points == 7.0
+    assert (lineup["T1"], lineup["T2"]) == (2, 1)
+    _check(guards)
+    # All-equal projections.
+    _check([(index, "F/C", 10.0) for index in range(6)])
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from matchup_sim import STARTER_COUNT, simulate_slot_points, win_probabilities
+
+
+def _loop_probability(slot_points, team, opponent):
+    score = 0.0
+    for sim in slot_points.tolist():
+        ours, theirs = sim[team], sim[opponent]
+        ours_key = (sum(ours[:STARTER_COUNT]), ours[STARTER_COUNT], ours[STARTER_COUNT + 1])
+        theirs_key = (sum(theirs[:STARTER_COUNT]), theirs[STARTER_COUNT], theirs[STARTER_COUNT + 1])
+        score += 1.0 if ours_key > theirs_key else 0.5 if ours_key == theirs_key else 0.0
+    return score / len(slot_points)
+
+
+def test_win_probabilities_match_loop():
+    rng = np.random.default_rng(2)
+    # Small integer points so starter totals and tiebreakers tie often.
+    slot_points = rng.integers(0, 3, size=(2000, 4, 7)).astype(np.float32)
+    team_idx = np.array([0, 1, 2, 3])
+    opponent_idx = np.array([1, 0, 3, 3])
+    probabilities = win_probabilities(np, slot_points, team_idx, opponent_idx)
+    for pairing, (team, opponent) in enumerate(zip(team_idx, opponent_idx)):
+        assert probabilities[pairing] == pytest.approx(_loop_probability(slot_points, team, opponent))
+    assert probabilities[0] + probabilities[1] == pytest.approx(1.0)
+    assert probabilities[3] == 0.5
+
+
+def test_simulated_slots():
+    means = np.array([10.0, 0.0, 5.0])
+    sds = np.array([3.0, 0.0, 2.0])
+    actual = np.array([4.0, 7.0, 0.0])
+    lineup_idx = np.array([[0, 1, -1, 2, -1, -1, -1]])
+    points = simulate_slot_points(np, means, sds, actual, lineup_idx, 500, seed=1)
+    assert points.shape == (500, 1, 7)
+    assert (points[:, 0, [2, 4, 5, 6]] == 0).all()
+    assert (points[:, 0, 1] == 7).all()
+    assert (points >= 0).all() and (points == np.rint(points)).all()
+    assert np.array_equal(points, simulate_slot_points(np, means, sds, actual, lineup_idx, 500, seed=1))
@@ -0,0 +1,111 @@
+import csv
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from helpers import make_stats_rows, write_stats
+from ml_model import train_player_pts_model
+from online_ridge import RidgeSufficientStats
+
+
+def _data(rows=300, features=5, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(rows, features)) * [1, 5, 0.1, 3, 1][:features]
+    x[:, 0] = 7.0  # a constant column, which StandardScaler leaves unscaled
+    y = x @ np.arange(features) + rng.normal(size=rows)
+    return x, y, rng.uniform(0.1, 1.0, size=rows)
+
+
+def _sklearn_fit(x, y, weights, alpha):
+    model = Pipeline([("scaler", StandardScaler()), ("ridge", Ridge(alpha=alpha))])
+    model.fit(x, y, ridge__sample_weight=weights)
+    return model
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("alpha", [0.1, 1.0, 50.0])
+def test_solve_matches_sklearn(weighted, alpha):
+    x, y, weights = _data()
+    weights = weights if weighted else None
+    stats = RidgeSufficientStats(np, x.shape[1])
+    stats.add(x, y, weights)
+    mean, var, scale, coef, intercept = stats.solve(alpha)
+
+    model = _sklearn_fit(x, y, weights, alpha)
+    scaler, ridge = model.named_steps["scaler"], model.named_steps["ridge"]
+    assert np.allclose(mean, scaler.mean_)
+    assert np.allclose(var, scaler.var_)
+    assert np.allclose(scale, scaler.scale_)
+    assert np.allclose(coef, ridge.coef_, rtol=1e-8, atol=1e-10)
+    assert intercept == pytest.approx(ridge.intercept_, rel=1e-9)
+
+
+def test_chunked_adds_and_decay_match_one_fit():
+    x, y, weights = _data(seed=1)
+    whole = RidgeSufficientStats(np, x.shape[1])
+    whole.add(x, y, weights * 0.5)
+
+    chunked = RidgeSufficientStats(np, x.shape[1])
+    chunked.add(x[:1], y[:1], weights[:1])
+    chunked.add(x[1:120], y[1:120], weights[1:120])
+    copy = chunked.copy()
+    chunked.add(x[120:], y[120:], weights[120:])
+    chunked.decay(0.5)
+    for got, expected in zip(chunked.solve(2.0), whole.solve(2.0)):
+        assert np.allclose(got, expected, rtol=1e-9, atol=1e-12)
+    assert copy.count == 120
+
+
+def test_save_load_round_trip(tmp_path):
+    x, y, weights = _data(seed=2)
+    stats = RidgeSufficientStats(np, x.shape[1])
+    stats.add(x, y, weights)
+    stats.save(tmp_path / "stats.npz", {"alpha": 1.0})
+    loaded, meta = RidgeSufficientStats.load(np, tmp_path / "stats.npz")
+    assert meta["alpha"] == 1.0
+    for got, expected in zip(loaded.solve(), stats.solve()):
+        assert np.array_equal(got, expected)
+    assert RidgeSufficientStats.load(np, tmp_path / "missing.npz") == (None, None)
+
+
+def _predictions(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [float(row["Predicted PTS"]) for row in csv.DictReader(file)]
+
+
+@pytest.mark.parametrize("half_life", [0, 30])
+def test_incremental_training_matches_refit(tmp_path, half_life):
+    stats_file = write_stats(tmp_path / "stats.csv", make_stats_rows(players=20, games=12))
+    model_file = tmp_path / "model.joblib"
+
+    def train(name, incremental):
+        return train_player_pts_model(
+            stats_file,
+            tmp_path / f"{name}.dataset.csv",
+            tmp_path / name,
+            tmp_path / f"{name}.predictions.csv",
+            recency_half_life_days=half_life,
+            incremental=incremental,
+        )
+
+    train("model.joblib", True)  # no saved sums yet: refits and saves them
+    for game in range(12, 18, 2):
+        write_stats(stats_file, make_stats_rows(players=20, games=2, start_game=game, seed=game), mode="a")
+        updated = train("model.joblib", True)
+        refit = train("refit.joblib", False)
+        assert _predictions(tmp_path / "model.joblib.predictions.csv") == pytest.approx(
+            _predictions(tmp_path / "refit.joblib.predictions.csv"), rel=1e-7, abs=1e-7
+        )
+        assert updated["mae"] == pytest.approx(refit["mae"], rel=1e-7)
+    assert model_file.with_name("model.joblib.stats.npz").exists()
+
+    # Rewritten history cannot be folded in; the update falls back to a refit.
+    write_stats(stats_file, make_stats_rows(players=20, games=18, seed=99))
+    train("model.joblib", True)
+    train("refit.joblib", False)
+    assert _predictions(tmp_path / "model.joblib.predictions.csv") == _predictions(
+        tmp_path / "refit.joblib.predictions.csv"
+    )
@@ -0,0 +1,64 @@
+import pytest
+
+from plays_store import PlaysArchive, read_plays
+
+
+def _rows(game_id, count):
+    return [[game_id, str(play), f"{game_id}{play:03d}", "Jump Shot"] for play in range(count)]
+
+
+def test_reader_leaves_unindexed_tail(tmp_path):
+    archive_file = tmp_path / "plays.archive"
+    with PlaysArchive(archive_file, writer=True) as archive:
+        archive.append_game("401", _rows("401", 3))
+    # An interrupted writer: a block on disk with no index row.
+    with open(archive_file, "ab") as file:
+        file.write(b"partial block")
+    size = archive_file.stat().st_size
+
+    assert read_plays(archive_file, "401") == _rows("401", 3)
+    reader = PlaysArchive(archive_file)
+    assert list(reader.iter_plays()) == _rows("401", 3)
+    assert archive_file.stat().st_size == size
+    with pytest.raises(ValueError):
+        reader.append_game("402", _rows("402", 2))
+
+    with PlaysArchive(archive_file, writer=True) as archive:
+        archive.append_game("402", _rows("402", 2))
+    assert read_plays(archive_file, "402") == _rows("402", 2)
+    assert list(PlaysArchive(archive_file).iter_plays()) == _rows("401", 3) + _rows("402", 2)
+
+
+@pytest.mark.parametrize("torn", [b"402,1", b"402,120,3", b"402,120,30,3,2,gzip\r"])
+def test_torn_index_row_is_skipped_and_repaired(tmp_path, torn):
+    archive_file = tmp_path / "plays.archive"
+    with PlaysArchive(archive_file, writer=True) as archive:
+        archive.append_game("401", _rows("401", 3))
+    # Crash mid-append: the block is written but its index row is cut short.
+    with open(archive_file, "ab") as file:
+        file.write(b"block for 402")
+    index_file = tmp_path / "plays.archive.idx"
+    index_size = index_file.stat().st_size
+    with open(index_file, "ab") as file:
+        file.write(torn)
+
+    reader = PlaysArchive(archive_file)
+    assert reader.game_ids() == {"401"}
+    assert reader.read_plays("401") == _rows("401", 3)
+    assert index_file.stat().st_size == index_size + len(torn)
+
+    with PlaysArchive(archive_file, writer=True) as archive:
+        assert archive.game_ids() == {"401"}
+        archive.append_game("402", _rows("402", 2))
+    reopened = PlaysArchive(archive_file)
+    assert reopened.game_ids() == {"401", "402"}
+    assert list(reopened.iter_plays()) == _rows("401", 3) + _rows("402", 2)
+
+
+def test_empty_index_file(tmp_path):
+    archive_file = tmp_path / "plays.archive"
+    (tmp_path / "plays.archive.idx").write_bytes(b"")
+    assert PlaysArchive(archive_file).game_ids() == set()
+    with PlaysArchive(archive_file, writer=True) as archive:
+        archive.append_game("401", _rows("401", 1))
+    assert read_plays(archive_file, "401") == _rows("401", 1)
@@ -0,0 +1,31 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from points_scorer import PointsScorer, save_model_artifact
+
+
+def test_matches_sklearn_pipeline(tmp_path):
+    rng = np.random.default_rng(5)
+    x = rng.normal(size=(200, 4)) * [1.0, 10.0, 0.01, 1.0]
+    x[:, 3] = 2.5  # constant feature: scale 1, no division by zero
+    y = x @ [1.0, -0.2, 40.0, 0.0] + rng.normal(size=200)
+    model = Pipeline([("scaler", StandardScaler()), ("ridge", Ridge(alpha=1.0))]).fit(x, y)
+
+    artifact = tmp_path / "model.scorer.json"
+    save_model_artifact(model, ["a", "b", "c", "d"], artifact)
+    scorer = PointsScorer.load(artifact)
+    assert scorer.n_features_in_ == 4
+    assert np.allclose(scorer.predict(x), model.predict(x), rtol=1e-12, atol=1e-9)
+    assert scorer.predict(np.zeros((0, 4))).shape == (0,)
+
+
+def test_rejects_other_versions(tmp_path):
+    artifact = tmp_path / "model.scorer.json"
+    artifact.write_text(json.dumps({"version": -1}))
+    with pytest.raises(ValueError):
+        PointsScorer.load(artifact)
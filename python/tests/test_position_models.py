@@ -0,0 +1,55 @@
+import csv
+
+import numpy as np
+
+from helpers import make_stats_rows, write_stats
+from position_models import ALL_POSITIONS, PositionModelBundle, train_position_models
+from team_roster import ROSTER_HEADER
+
+
+def _write_roster(path, players):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=ROSTER_HEADER, restval="")
+        writer.writeheader()
+        for player in range(players):
+            writer.writerow({"Player ID": str(1000 + player), "Player Position": "CFG"[player % 3]})
+    return path
+
+
+def _train(tmp_path, **kwargs):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=8))
+    roster = _write_roster(tmp_path / "roster.csv", 10)
+    return train_position_models(
+        stats,
+        roster,
+        tmp_path / "features.csv",
+        tmp_path / "dataset.csv",
+        tmp_path / "bundle.json",
+        targets=["PTS", "REB"],
+        min_minutes=0,
+        **kwargs,
+    )
+
+
+def test_small_data_still_fits_all_model(tmp_path):
+    bundle = _train(tmp_path)
+    assert list(bundle["models"]) == [ALL_POSITIONS]
+    assert sorted(bundle["models"][ALL_POSITIONS]) == ["PTS", "REB"]
+
+    loaded = PositionModelBundle.load(tmp_path / "bundle.json")
+    features = np.zeros((2, len(loaded.feature_names)))
+    assert loaded.predict(features, ["C", ""], target="PTS").shape == (2,)
+
+
+def test_min_samples_parameter(tmp_path):
+    bundle = _train(tmp_path, min_samples=1)
+    assert set(bundle["models"]) == {ALL_POSITIONS, "C", "F", "G"}
+
+
+def test_workers_match_single_process(tmp_path):
+    for name in ("single", "pooled"):
+        (tmp_path / name).mkdir()
+    single = _train(tmp_path / "single", min_samples=5)
+    pooled = _train(tmp_path / "pooled", min_samples=5, workers=2)
+    assert len(single["models"]) > 1
+    assert pooled == single
@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+from http_utils import HTTP_STATS, fetch_json
+from progress import ProgressReporter
+
+
+class _Response:
+    def __init__(self, status_code, content=b"{}"):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return {}
+
+
+class _Client:
+    def __init__(self, *codes):
+        self.codes = list(codes)
+        self.in_flight_seen = []
+
+    def get(self, url, timeout):
+        self.in_flight_seen.append(HTTP_STATS["in_flight"])
+        return _Response(self.codes.pop(0))
+
+
+def test_error_responses_count_as_http_errors(monkeypatch):
+    monkeypatch.setattr("http_utils.DEFAULT_BACKOFF_SECONDS", 0)
+    errors = HTTP_STATS["errors"]
+    client = _Client(503, 404, 200)
+    assert fetch_json("http://example.test", session=client) == {}
+    assert HTTP_STATS["errors"] - errors == 2
+    assert client.in_flight_seen == [1, 1, 1]
+    assert HTTP_STATS["in_flight"] == 0
+
+    with pytest.raises(RuntimeError):
+        fetch_json("http://example.test", session=_Client(500), retries=1)
+    assert HTTP_STATS["errors"] - errors == 3
+
+
+def test_in_flight_column():
+    progress = ProgressReporter("Games", total=4, stream=io.StringIO())
+    assert "in-flight 0" in progress.render()
+    progress.update(advance=0, in_flight=3)
+    assert "in-flight 3" in progress.render()
+    progress.update(advance=4, in_flight=0)
+    assert "in-flight 0" in progress.render()
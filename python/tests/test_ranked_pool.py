@@ -0,0 +1,38 @@
+import random
+
+from ranked_pool import RankedPool
+
+
+def test_matches_sorted_entries_under_churn():
+    rnd = random.Random(7)
+    pool = RankedPool()
+    entries = {}
+    for step in range(3000):
+        player_id = rnd.randint(0, 120)
+        if rnd.random() < 0.3:
+            pool.remove(player_id)
+            entries.pop(player_id, None)
+        else:
+            position = rnd.choice("CFG")
+            value = float(rnd.randint(0, 40))
+            pool.add(player_id, position, value)
+            entries[player_id] = (position, value)
+        if step % 50 == 0:
+            for position in "CFGX":
+                expected = sorted(
+                    ((player_id, value) for player_id, (pos, value) in entries.items() if pos == position),
+                    key=lambda item: (-item[1], item[0]),
+                )
+                assert pool.count(position) == len(expected)
+                assert pool.top(position, 5) == expected[:5]
+                assert pool.best(position) == (expected[0] if expected else None)
+    assert len(pool) == len(entries)
+
+
+def test_empty_pool():
+    pool = RankedPool()
+    assert pool.top("C", 3) == []
+    assert pool.best("C") is None
+    assert pool.remove(1) is None
+    pool.add(1, "C", 2.0)
+    assert pool.top("C", 0) == []
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from rolling_features import RollingFeatureSet
+
+
+def _reference(history, windows, half_lives):
+    """Recompute every feature from the full game history of one player."""
+    features = []
+    for stat in range(len(history[0]) if history else 3):
+        values = [game[stat] for game in history]
+        for size in windows:
+            recent = values[-size:]
+            features.append(sum(recent) / len(recent) if recent else 0.0)
+        for half_life in half_lives:
+            alpha = 1 - 0.5 ** (1 / half_life)
+            mean = None
+            for value in values:
+                mean = value if mean is None else mean + alpha * (value - mean)
+            features.append(0.0 if mean is None else mean)
+    return features
+
+
+@pytest.mark.parametrize("windows,half_lives", [((1, 3, 10), (2.0, 5.0)), ((), (1.0,)), ((4,), ())])
+def test_matches_recomputed_history(windows, half_lives):
+    rnd = random.Random(3)
+    rolling = RollingFeatureSet(windows, half_lives)
+    histories = {}
+    for _game in range(200):
+        player_id = str(rnd.randint(0, 4))
+        history = histories.setdefault(player_id, [])
+        assert rolling.features(player_id) == pytest.approx(_reference(history, windows, half_lives))
+        values = [rnd.randint(0, 30), rnd.choice([0, 12.5, 31]), rnd.random() * 20]
+        rolling.update(player_id, values)
+        history.append(values)
+    assert rolling.features("never-played") == [0.0] * len(rolling.header())
+
+
+def test_state_round_trip_matches_continuous_updates():
+    rnd = random.Random(4)
+    games = [(str(rnd.randint(0, 6)), [rnd.random() * 30, rnd.random() * 40, rnd.random() * 10]) for _ in range(120)]
+    continuous = RollingFeatureSet((3, 5), (2.0,))
+    for player_id, values in games:
+        continuous.update(player_id, values)
+
+    first = RollingFeatureSet((3, 5), (2.0,))
+    for player_id, values in games[:50]:
+        first.update(player_id, values)
+    resumed = RollingFeatureSet((3, 5), (2.0,))
+    assert resumed.load_state(first.to_state())
+    for player_id, values in games[50:]:
+        resumed.update(player_id, values)
+    for player_id in continuous.players:
+        assert resumed.features(player_id) == pytest.approx(continuous.features(player_id), rel=1e-12)
+
+    assert not RollingFeatureSet((3,), (2.0,)).load_state(first.to_state())
+
+
+def test_rejects_non_positive_windows():
+    with pytest.raises(ValueError):
+        RollingFeatureSet((0,), (2.0,))
@@ -0,0 +1,126 @@
+import csv
+
+import numpy as np
+import pytest
+
+from helpers import make_stats_rows, write_stats
+from ml_model import (
+    _iter_dataset_input_rows,
+    _sort_key,
+    build_player_pts_dataset,
+    dataset_samples_path,
+    estimate_sample_count,
+)
+from rolling_features import RollingFeatureSet
+from sample_store import SampleStore
+
+
+def test_pts_dataset_keeps_minutes_out_of_targets(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=8))
+    samples_file = tmp_path / "samples.npz"
+    store = build_player_pts_dataset(
+        stats, tmp_path / "dataset.csv", min_minutes=5, as_arrays=True, samples_file=samples_file
+    )
+    assert store.target_names == ["PTS"]
+    assert store.targets.shape == (len(store), 1)
+    assert store.aux_names == ["MIN"]
+    assert (store.aux_column("MIN") >= 5).all()
+
+    loaded = SampleStore.load(np, samples_file)
+    assert loaded.target_names == ["PTS"]
+    assert np.array_equal(loaded.targets, store.targets)
+    assert np.array_equal(loaded.aux_column("MIN"), store.aux_column("MIN"))
+
+
+def test_growth_keeps_earlier_views_valid():
+    store = SampleStore(np, ["a", "b"], ["y"], capacity=1, aux_names=["MIN"])
+    views = []
+    for row in range(100):
+        store.append(row, [str(row)] * 6, [row, -row], [row * 2], aux=[row + 0.5])
+        views.append(store.features[row])
+    store.finish()
+    assert len(store.days) == 100
+    assert np.array_equal(store.features[:, 0], np.arange(100))
+    assert np.array_equal(store.target("y"), np.arange(100) * 2)
+    assert np.array_equal(store.aux_column("MIN"), np.arange(100) + 0.5)
+    assert [float(view[1]) for view in views] == [-float(row) for row in range(100)]
+
+
+def test_empty_store_finishes():
+    store = SampleStore(np, ["a"], ["y"]).finish()
+    assert len(store) == 0
+    assert store.features.shape == (0, 1)
+    assert store.meta_rows(np.arange(0)) == []
+
+
+def test_capacity_estimate_is_exact_for_sorted_rows(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=8))
+    store = build_player_pts_dataset(stats, tmp_path / "dataset.csv", min_minutes=5, min_games=3, as_arrays=True)
+    with open(stats, newline="", encoding="utf-8") as file:
+        rows = sorted(_iter_dataset_input_rows(csv.DictReader(file)), key=_sort_key)
+    assert estimate_sample_count(rows, 5, 3) == len(store)
+
+
+def _assert_same_store(got, expected):
+    assert len(got) == len(expected)
+    for name in ("features", "targets", "aux", "days"):
+        assert np.array_equal(getattr(got, name), getattr(expected, name))
+    assert got.meta_rows(np.arange(len(got))) == expected.meta_rows(np.arange(len(expected)))
+
+
+def _sorted_lines(path):
+    with open(path, encoding="utf-8") as file:
+        return sorted(file.read().splitlines())
+
+
+@pytest.mark.parametrize("rolling", [None, (3,)])
+def test_incremental_dataset_matches_full(tmp_path, capsys, rolling):
+    def features():
+        return RollingFeatureSet(rolling, (2.0,)) if rolling else None
+
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=15, games=6))
+    dataset = tmp_path / "dataset.csv"
+    build_player_pts_dataset(stats, dataset, rolling=features(), as_arrays=True, incremental=True)
+    for game in (6, 7, 9):
+        write_stats(stats, make_stats_rows(players=15, games=1 if game < 9 else 2, start_game=game, seed=game), mode="a")
+        capsys.readouterr()
+        store = build_player_pts_dataset(stats, dataset, rolling=features(), as_arrays=True, incremental=True)
+        assert "Appended" in capsys.readouterr().out
+        full = build_player_pts_dataset(stats, tmp_path / "full.csv", rolling=features(), as_arrays=True)
+        # Same split, same sample order once sorted by day, as a full build.
+        order = np.argsort(store.days, kind="stable")
+        full_order = np.argsort(full.days, kind="stable")
+        assert np.array_equal(store.features[order], full.features[full_order])
+        assert store.meta_rows(order) == full.meta_rows(full_order)
+        assert _sorted_lines(dataset) == _sorted_lines(tmp_path / "full.csv")
+    _assert_same_store(SampleStore.load(np, dataset_samples_path(dataset)), store)
+
+    # No new rows: the saved store comes back as is.
+    capsys.readouterr()
+    _assert_same_store(build_player_pts_dataset(stats, dataset, rolling=features(), as_arrays=True, incremental=True), store)
+    assert "No new stats rows" in capsys.readouterr().out
+
+
+def test_incremental_dataset_rebuilds_for_late_games(tmp_path, capsys):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=6))
+    dataset = tmp_path / "dataset.csv"
+    build_player_pts_dataset(stats, dataset, as_arrays=True, incremental=True)
+    # A game dated inside the stored days cannot be appended after them.
+    write_stats(stats, make_stats_rows(players=10, games=1, start_game=3, seed=7), mode="a")
+    capsys.readouterr()
+    store = build_player_pts_dataset(stats, dataset, as_arrays=True, incremental=True)
+    assert "Rebuilding the points dataset" in capsys.readouterr().out
+    _assert_same_store(store, build_player_pts_dataset(stats, tmp_path / "full.csv", as_arrays=True))
+
+
+def test_extend_matches_one_store():
+    first = SampleStore(np, ["a"], ["y"], aux_names=["MIN"])
+    second = SampleStore(np, ["a"], ["y"], aux_names=["MIN"])
+    both = SampleStore(np, ["a"], ["y"], aux_names=["MIN"])
+    for idx in range(6):
+        meta = [f"d{idx % 2}", f"g{idx}", f"p{idx % 3}", "n", "t", "team"]
+        (first if idx < 4 else second).append(idx, meta, [idx], [idx * 2], aux=[idx])
+        both.append(idx, meta, [idx], [idx * 2], aux=[idx])
+    _assert_same_store(first.finish().extend(second.finish()), both.finish())
+    empty = SampleStore(np, ["a"], ["y"], aux_names=["MIN"]).finish()
+    _assert_same_store(empty.extend(SampleStore(np, ["a"], ["y"], aux_names=["MIN"]).finish()), empty)
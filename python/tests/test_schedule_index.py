@@ -0,0 +1,116 @@
+import csv
+from datetime import date, timedelta
+
+import main
+from game_information import PLAYER_STATS_HEADER
+from schedule_index import ScheduleIndex
+from team_schedule import SCHEDULE_HEADER
+
+
+def _write_schedule(path, games):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(SCHEDULE_HEADER)
+        for game_id, game_date in games:
+            writer.writerow([game_id, game_date, "7:00 PM", "2", "Home", "5", "Away", "false"])
+    return str(path)
+
+
+def test_game_ids_include_rows_with_bad_dates(tmp_path):
+    schedule = _write_schedule(tmp_path / "schedule.csv", [("401", "2023/11/06"), ("402", "TBD")])
+    index = ScheduleIndex.from_csv(schedule)
+    assert len(index) == 1
+    assert index.skipped_rows == 1
+    assert index.game_ids() == {"401", "402"}
+
+
+def test_empty_game_stops_pinning_the_window(tmp_path, monkeypatch):
+    past = date.today() - timedelta(days=30)
+    games = [(str(401 + day), (past + timedelta(days=day)).strftime("%Y/%m/%d")) for day in range(3)]
+    schedule = _write_schedule(tmp_path / "schedule.csv", games)
+    stats = tmp_path / "stats.csv"
+    fetched = []
+
+    def fake_game_information(game_id, player_stats_filename=None, **_kwargs):
+        fetched.append(game_id)
+        if game_id == "401":
+            # Cancelled game: never produces a box score.
+            return {"status": "incomplete"}
+        with open(player_stats_filename, "a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerow(["11/06/23", game_id, "1"] + [""] * (len(PLAYER_STATS_HEADER) - 3))
+        return {"status": "written"}
+
+    monkeypatch.setattr(main, "game_information", fake_game_information)
+    main.ensure_csv_header(stats, PLAYER_STATS_HEADER)
+    for _run in range(main.MAX_GAME_ATTEMPTS + 1):
+        fetched.clear()
+        status = main.collect_completed_games_from_schedule(
+            schedule, str(stats), schedule_index=ScheduleIndex.from_csv(schedule)
+        )
+    assert fetched == []
+    assert status["skipped_existing"] == 3
+    assert main.game_attempts_path(schedule).exists()
+
+
+def test_first_pending_date_starts_at_start_date(tmp_path):
+    assert ScheduleIndex().first_pending_date(lambda game_id: True) is None
+    schedule = _write_schedule(
+        tmp_path / "schedule.csv", [("401", "2023/11/06"), ("402", "2023/11/08"), ("403", "2023/11/08")]
+    )
+    index = ScheduleIndex.from_csv(schedule)
+    checked = []
+
+    def is_pending(game_id):
+        checked.append(game_id)
+        return game_id == "403"
+
+    assert index.first_pending_date(is_pending, date(2023, 11, 7)) == date(2023, 11, 8)
+    assert checked == ["402", "403"]
+    assert index.first_pending_date(lambda game_id: True, date(2023, 11, 9)) is None
+    assert index.count_before(date(2023, 11, 8)) == 1
+
+
+def test_saved_window_skips_finished_games(tmp_path, monkeypatch):
+    past = date.today() - timedelta(days=30)
+    games = [(str(401 + day), (past + timedelta(days=day)).strftime("%Y/%m/%d")) for day in range(6)]
+    schedule = _write_schedule(tmp_path / "schedule.csv", games)
+    stats = tmp_path / "stats.csv"
+
+    def fake_game_information(game_id, player_stats_filename=None, **_kwargs):
+        with open(player_stats_filename, "a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerow(["11/06/23", game_id, "1"] + [""] * (len(PLAYER_STATS_HEADER) - 3))
+        return {"status": "incomplete" if game_id == "404" else "written"}
+
+    monkeypatch.setattr(main, "game_information", fake_game_information)
+    main.ensure_csv_header(stats, PLAYER_STATS_HEADER)
+    checked = []
+
+    def collect():
+        checked.clear()
+        index = ScheduleIndex.from_csv(schedule)
+        first_pending_date = index.first_pending_date
+
+        def recording(is_pending, start_date=None):
+            return first_pending_date(lambda game_id: checked.append(game_id) or is_pending(game_id), start_date)
+
+        index.first_pending_date = recording
+        return main.collect_completed_games_from_schedule(schedule, str(stats), schedule_index=index)
+
+    collect()
+    assert main.game_window_path(schedule).exists()
+    # Every game has output now; the next scan starts after the saved window.
+    collect()
+    assert "401" not in checked
+
+    # A game added in the past invalidates the saved window and is fetched.
+    games.insert(0, ("400", (past - timedelta(days=1)).strftime("%Y/%m/%d")))
+    _write_schedule(schedule, games)
+    status = collect()
+    assert status["written"] == 1
+    assert "401" in checked
+
+    # Wiping the outputs invalidates it too: every game is fetched again.
+    stats.unlink()
+    main.ensure_csv_header(stats, PLAYER_STATS_HEADER)
+    status = collect()
+    assert status["written"] + status["incomplete"] == len(games)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from feature_builder import build_player_features
+from helpers import make_stats_rows, write_stats
+from similarity_index import SimilarityIndex, update_similarity_index
+
+
+def _assert_same_index(index, fresh):
+    assert sorted(index.rows) == sorted(fresh.rows)
+    rows = sorted(index.rows)
+    assert np.array_equal(
+        index.raw[[index.rows[key] for key in rows]],
+        fresh.raw[[fresh.rows[key] for key in rows]],
+    )
+    for player_id in ("1003", "1050", "1117"):
+        assert index.most_similar(player_id, k=5) == fresh.most_similar(player_id, k=5)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_update_matches_fresh_build(tmp_path, incremental):
+    stats = write_stats(tmp_path / "stats.csv", sorted(make_stats_rows(players=120, games=6), key=lambda row: row[1]))
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, min_minutes=0, incremental=incremental)
+    update_similarity_index([features], tmp_path / "index.npz")
+
+    # Two more games for players 1100+ only: a full rebuild puts them
+    # mid-file while the first 64 KB stays byte-identical.
+    new_rows = [
+        row
+        for row in make_stats_rows(players=120, games=2, start_game=6, seed=7)
+        if int(row[2]) >= 1100
+    ]
+    write_stats(stats, sorted(new_rows, key=lambda row: row[1]), mode="a")
+    build_player_features(stats, features, min_minutes=0, incremental=incremental)
+    index = update_similarity_index([features], tmp_path / "index.npz")
+
+    fresh = update_similarity_index([features], tmp_path / "fresh.npz")
+    _assert_same_index(index, fresh)
+    _assert_same_index(SimilarityIndex.load(tmp_path / "index.npz"), fresh)
+
+
+def test_unchanged_file_is_not_reread(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=3))
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, min_minutes=0)
+    update_similarity_index([features], tmp_path / "index.npz")
+    index = update_similarity_index([features], tmp_path / "index.npz")
+    assert len(index) == 10
+
+
+def test_most_similar_matches_brute_force(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=40, games=5))
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features, min_minutes=0)
+    index = update_similarity_index([features], tmp_path / "index.npz")
+    for player_id in ("1000", "1021"):
+        row = index.rows[(player_id, 2025)]
+        scores = index.unit @ index.unit[row]
+        scores[index.player_array == player_id] = -np.inf
+        expected = np.sort(scores)[::-1][:7]
+        got = [similarity for _pid, _season, _name, similarity in index.most_similar(player_id, k=7)]
+        assert np.allclose(got, expected, atol=1e-6)
+    assert index.most_similar("999") == []
+
+
+def test_empty_features_file(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", [])
+    features = tmp_path / "features.csv"
+    build_player_features(stats, features)
+    index = update_similarity_index([features], tmp_path / "index.npz")
+    assert len(index) == 0
+    assert index.most_similar("1000") == []
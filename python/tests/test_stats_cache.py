@@ -0,0 +1,37 @@
+import shutil
+
+from helpers import make_stats_rows, write_stats
+from stats_cache import _load_manifest, load_player_stats, stats_cache_dir
+
+
+def _builds(stats):
+    return sorted(path.name for path in stats_cache_dir(stats).iterdir() if path.name.startswith("build-"))
+
+
+def test_open_columns_survive_rebuilds(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=4))
+    first = load_player_stats(stats)
+    first_points = first.values("PTS").copy()
+    first_ids = first.text("Player ID")
+
+    for game in (4, 5, 6):
+        write_stats(stats, make_stats_rows(players=10, games=1, start_game=game), mode="a")
+        latest = load_player_stats(stats)
+        assert len(latest) == len(first) + 10 * (game - 3)
+        assert len({len(latest.values(field)) for field in latest.manifest["columns"]}) == 1
+
+    # Two later builds were swapped in and the first pruned; its open columns are unchanged.
+    assert len(_builds(stats)) == 2
+    assert len(first.values("MIN")) == len(first)
+    assert (first.values("PTS") == first_points).all()
+    assert first.text("Player ID") == first_ids
+
+
+def test_missing_build_is_rebuilt(tmp_path):
+    stats = write_stats(tmp_path / "stats.csv", make_stats_rows(players=10, games=2))
+    columns = load_player_stats(stats)
+    shutil.rmtree(stats_cache_dir(stats) / columns.manifest["build"])
+    assert load_player_stats(stats, rebuild=False) is None
+    rebuilt = load_player_stats(stats)
+    assert len(rebuilt) == len(columns)
+    assert _load_manifest(stats_cache_dir(stats))["build"] == rebuilt.manifest["build"]
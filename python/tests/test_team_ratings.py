@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+
+from team_ratings import solve_ratings, update_team_ratings
+
+
+def _observations(seed=3, teams=12, games=60, seasons=(2024, 2025)):
+    rnd = random.Random(seed)
+    observations = []
+    for season in seasons:
+        for _game in range(games):
+            home, away = rnd.sample(range(teams), 2)
+            location = rnd.choice([1, 0])
+            for team, opponent, side in ((home, away, location), (away, home, -location)):
+                observations.append((season, str(team), str(opponent), rnd.uniform(80, 125), side))
+    return observations
+
+
+def _dense_solution(observations, columns, ridge):
+    """Normal-equation solve of the same ridge-augmented least-squares problem."""
+    design = np.zeros((len(observations), len(columns)))
+    for row, (season, team, opponent, _efficiency, location) in enumerate(observations):
+        design[row, columns[f"{season}:avg"]] = 1.0
+        design[row, columns[f"{season}:{team}:off"]] = 1.0
+        design[row, columns[f"{season}:{opponent}:def"]] = -1.0
+        if location:
+            design[row, columns[f"{season}:home"]] = location
+    penalty = np.diag([ridge if key.endswith((":off", ":def")) else 0.0 for key in columns])
+    targets = np.array([observation[3] for observation in observations])
+    return np.linalg.solve(design.T @ design + penalty, design.T @ targets)
+
+
+@pytest.mark.parametrize("ridge", [0.5, 5.0])
+def test_matches_dense_solve_and_warm_start(ridge):
+    observations = _observations()
+    cold, _iterations = solve_ratings(np, sparse, lsqr, observations, ridge=ridge, tolerance=1e-12)
+    columns = {key: index for index, key in enumerate(cold)}
+    dense = _dense_solution(observations, columns, ridge)
+    assert np.allclose([cold[key] for key in columns], dense, atol=1e-6)
+
+    # A warm start from last night's solution plus a few new games lands on the same answer.
+    more = observations + _observations(seed=4, games=3, seasons=(2025,))
+    previous, _ = solve_ratings(np, sparse, lsqr, observations, ridge=ridge)
+    warm, _ = solve_ratings(np, sparse, lsqr, more, ridge=ridge, previous=previous)
+    fresh, _ = solve_ratings(np, sparse, lsqr, more, ridge=ridge)
+    assert warm.keys() == fresh.keys()
+    assert max(abs(warm[key] - fresh[key]) for key in fresh) < 1e-4
+
+
+def test_single_game_season():
+    observations = [(2025, "1", "2", 110.0, 1), (2025, "2", "1", 90.0, -1)]
+    solution, _ = solve_ratings(np, sparse, lsqr, observations, ridge=1.0, tolerance=1e-12)
+    columns = {key: index for index, key in enumerate(solution)}
+    assert np.allclose([solution[key] for key in columns], _dense_solution(observations, columns, 1.0), atol=1e-6)
+
+
+def test_no_games_writes_nothing(tmp_path):
+    assert update_team_ratings({2025: (str(tmp_path / "missing.csv"), "")}, tmp_path / "ratings.csv") == 0
+    assert not (tmp_path / "ratings.csv").exists()